@@ -0,0 +1 @@
+"""GBCE benchmark suite package."""
@@ -0,0 +1,146 @@
+"""Benchmark suite command line.
+
+Runs a sweep, prints its results and compares them to a baseline, exiting
+with status 1 if any metric has regressed past the threshold. Regressed
+cases are run again, keeping their best metrics, before failing, so one
+noisy measurement doesn't fail the run::
+
+    python -m benchmarks --profile quick --baseline benchmarks/baseline.json
+
+Baselines are machine specific, so they should be saved with
+--save-baseline on the machine they're compared on, and a missing baseline
+fails the run instead of being saved. Saving a baseline runs every case as
+many times as a regressed case can be, keeping its best metrics too, so
+baselines and results are measured alike.
+"""
+
+
+import argparse
+import os
+import sys
+
+from .baseline import compare, load, merge, save
+from .suite import PROFILES, Profile, Result, run, run_case
+
+
+def report(result: Result, label: str = "") -> None:
+    """Print a benchmark result.
+
+    Args:
+        result (Result): benchmark result.
+        label (str): label printed before the result.
+    """
+    metrics = "  ".join(
+        f"{metric}={value:.4g}" for metric, value in result.metrics.items()
+    )
+    print(f"{label:<5} {result.key:<45} {metrics}", flush=True)
+
+
+def rerun(result: Result, profile: Profile) -> Result:
+    """Run a benchmark again, keeping its best metrics.
+
+    Args:
+        result (Result): benchmark result.
+        profile (Profile): sweep profile.
+
+    Returns:
+        Result: best metrics of both runs.
+    """
+    result = merge(result, run_case(result.case, result.params, profile))
+    report(result, "rerun")
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments.
+
+    Returns:
+        argparse.Namespace: arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--profile", choices=PROFILES, default="quick")
+    parser.add_argument("--output", help="path to save the results to")
+    parser.add_argument("--baseline", help="path of the baseline")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="save the results as the baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="relative regression that fails the run (default: 0.5)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="times regressed cases are run again (default: 2)",
+    )
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline needs --baseline")
+    if (
+        args.baseline
+        and not args.save_baseline
+        and not os.path.exists(args.baseline)
+    ):
+        parser.error(
+            f"baseline {args.baseline} doesn't exist, "
+            "save it with --save-baseline"
+        )
+    return args
+
+
+def main() -> int:
+    """Run the benchmark suite.
+
+    Returns:
+        int: exit status.
+    """
+    args = parse_args()
+    profile = PROFILES[args.profile]
+    results = {}
+    for result in run(profile):
+        results[result.key] = result
+        report(result)
+
+    if args.output:
+        save(args.output, args.profile, results.values())
+
+    if not args.baseline:
+        return 0
+
+    if args.save_baseline:
+        for _ in range(args.retries):
+            for key, result in results.items():
+                results[key] = rerun(result, profile)
+        save(args.baseline, args.profile, results.values())
+        print(f"Saved baseline to {args.baseline}.")
+        return 0
+
+    baseline = load(args.baseline)
+    regressions = compare(baseline, results.values(), args.threshold)
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        for key in {regression.key for regression in regressions}:
+            results[key] = rerun(results[key], profile)
+        regressions = compare(baseline, results.values(), args.threshold)
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.key} {regression.metric}: "
+            f"{regression.baseline:.4g} -> {regression.current:.4g} "
+            f"({regression.change:+.0%})"
+        )
+    if regressions:
+        return 1
+
+    print(f"No regressions past {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Benchmark baselines."""
+
+
+import json
+import platform
+from typing import Any, Iterable, NamedTuple
+
+from .suite import Result
+
+# Metrics where a higher value is better. Lower is better for the rest.
+HIGHER_IS_BETTER = frozenset(["trades_per_second"])
+
+# Metrics that depend on the machine speed.
+TIMED = frozenset(["trades_per_second", "seconds", "full_seconds"])
+
+
+class Regression(NamedTuple):
+    """Benchmark regression class."""
+
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def rescale(result: Result, reference: float) -> Result:
+    """Scale the timings of a result to another speed of the machine.
+
+    Args:
+        result (Result): benchmark result.
+        reference (float): seconds the reference workload takes at the
+            other speed.
+
+    Returns:
+        Result: result as if measured at the other speed.
+    """
+    speed = reference / result.reference
+    return result._replace(
+        metrics={
+            metric: value
+            if metric not in TIMED
+            else value / speed
+            if metric in HIGHER_IS_BETTER
+            else value * speed
+            for metric, value in result.metrics.items()
+        },
+        reference=reference,
+    )
+
+
+def merge(first: Result, second: Result) -> Result:
+    """Merge two runs of a benchmark, keeping its best metrics.
+
+    Args:
+        first (Result): first run.
+        second (Result): second run.
+
+    Returns:
+        Result: best metrics, at the speed of the faster run.
+    """
+    reference = min(first.reference, second.reference)
+    first = rescale(first, reference)
+    second = rescale(second, reference)
+    return first._replace(
+        metrics={
+            metric: (max if metric in HIGHER_IS_BETTER else min)(
+                value, second.metrics[metric]
+            )
+            for metric, value in first.metrics.items()
+        }
+    )
+
+
+def save(path: str, profile: str, results: Iterable[Result]) -> None:
+    """Save benchmark results as JSON.
+
+    Args:
+        path (str): results path.
+        profile (str): name of the sweep profile.
+        results (Iterable[Result]): benchmark results.
+    """
+    document = {
+        "profile": profile,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "results": [result._asdict() for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(document, output, indent=2)
+        output.write("\n")
+
+
+def load(path: str) -> dict[str, Any]:
+    """Load benchmark results saved as JSON.
+
+    Args:
+        path (str): results path.
+
+    Returns:
+        dict[str, Any]: saved document.
+    """
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def compare(
+    baseline: dict[str, Any], results: Iterable[Result], threshold: float
+) -> list[Regression]:
+    """Find the metrics that have regressed past a threshold.
+
+    Timings are scaled by how much faster or slower the machine ran the
+    reference workload than for the baseline, so a machine that is busier
+    or throttled doesn't fail the comparison. Results without a baseline
+    are not compared.
+
+    Args:
+        baseline (dict[str, Any]): saved baseline document.
+        results (Iterable[Result]): benchmark results.
+        threshold (float): relative change tolerated, e.g. 0.25 for 25%.
+
+    Returns:
+        list[Regression]: regressed metrics.
+    """
+    previous = {
+        result.key: result
+        for result in (Result(**result) for result in baseline["results"])
+    }
+
+    regressions = []
+    for result in results:
+        old_result = previous.get(result.key)
+        if old_result is None:
+            continue
+
+        result = rescale(result, old_result.reference)
+        for metric, current in result.metrics.items():
+            old = old_result.metrics.get(metric)
+            if not old or not current:
+                continue
+
+            change = (
+                old / current - 1
+                if metric in HIGHER_IS_BETTER
+                else current / old - 1
+            )
+            if change > threshold:
+                regressions.append(
+                    Regression(result.key, metric, old, current, change)
+                )
+    return regressions
@@ -0,0 +1,362 @@
+"""Benchmark cases and sweeps."""
+
+
+import gc
+import itertools
+import logging
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, NamedTuple, cast
+
+from gbce import Gbce
+from gbce.clock import SimulatedClock
+from gbce.models.stock import Stock, StockType
+from gbce.models.trade import TradeType
+from gbce.models.window import WINDOW_LENGTH
+from tests.factories import CommonStockFactory
+
+# Timestamp benchmarks are run at.
+NOW = 1_000_000.0
+
+# Number of trades recorded at a time when filling a stock.
+CHUNK = 100_000
+
+# Number of trades of every listing in the index benchmarks.
+TRADES_PER_LISTING = 100
+
+
+class Profile(NamedTuple):
+    """Benchmark sweep profile class."""
+
+    trades: tuple[int, ...]
+    object_trades: int
+    listings: tuple[int, ...]
+    min_time: float
+    repeat: int
+
+
+PROFILES = {
+    "quick": Profile(
+        (1_000, 10_000, 100_000), 100_000, (10, 100, 1_000), 0.05, 5
+    ),
+    "full": Profile(
+        (1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+        1_000_000,
+        (10, 100, 1_000, 10_000),
+        0.1,
+        5,
+    ),
+}
+
+STORES = {"objects": False, "columnar": True}
+
+
+class Result(NamedTuple):
+    """Benchmark result class."""
+
+    case: str
+    params: dict[str, Any]
+    metrics: dict[str, float]
+    reference: float
+
+    @property
+    def key(self) -> str:
+        """Get the key the result is compared to its baseline by.
+
+        Returns:
+            str: case name and parameters.
+        """
+        params = ",".join(
+            f"{name}={value}" for name, value in self.params.items()
+        )
+        return f"{self.case}[{params}]"
+
+
+def measure(func: Callable[[], object], min_time: float, repeat: int) -> float:
+    """Measure the time a call takes.
+
+    Calls are timed in loops long enough to take at least the minimum time,
+    and the fastest loop is taken, as the least disturbed by the rest of
+    the machine. The garbage collector is disabled while timing, as timeit
+    does, so collections of earlier benchmarks' garbage aren't timed.
+
+    Args:
+        func (Callable[[], object]): function to call.
+        min_time (float): minimum seconds a loop takes.
+        repeat (int): number of loops.
+
+    Returns:
+        float: seconds per call.
+    """
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            elapsed = time_loop(func, number)
+            if elapsed >= min_time:
+                break
+            number *= 10 if elapsed < min_time / 10 else 2
+
+        best = min(
+            [elapsed] + [time_loop(func, number) for _ in range(repeat - 1)]
+        )
+    finally:
+        if enabled:
+            gc.enable()
+    return best / number
+
+
+def time_loop(func: Callable[[], object], number: int) -> float:
+    """Time a loop of calls.
+
+    Args:
+        func (Callable[[], object]): function to call.
+        number (int): number of calls.
+
+    Returns:
+        float: seconds the loop takes.
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def reference_work() -> None:
+    """Run the reference workload the machine speed is measured with.
+
+    It does the kind of interpreter work the benchmarks do, so the time it
+    takes follows the speed of the machine for them.
+    """
+    prices: dict[int, float] = {}
+    total = 0.0
+    for index in range(100):
+        total += index * 0.5
+        prices[index % 10] = total / (index + 1)
+    sorted(prices.values())
+
+
+def filled_stock(trades: int, columnar: bool) -> Stock:
+    """Create a stock with trades spread over the last window.
+
+    Args:
+        trades (int): number of trades.
+        columnar (bool): whether the stock keeps its trades in typed arrays.
+
+    Returns:
+        Stock: stock.
+    """
+    stock = cast(
+        Stock,
+        CommonStockFactory(
+            name="TEA",
+            columnar=columnar,
+            clock=SimulatedClock(NOW),
+            logger_level=logging.WARNING,
+        ),
+    )
+    step = WINDOW_LENGTH / trades
+    start = NOW - WINDOW_LENGTH
+    for offset in range(0, trades, CHUNK):
+        count = min(CHUNK, trades - offset)
+        stock.record_trade_columns(
+            [TradeType.BUY, TradeType.SELL] * (count // 2)
+            + [TradeType.BUY] * (count % 2),
+            [1.0 + (offset + i) % 7 for i in range(count)],
+            [10.0 + (offset + i) % 13 for i in range(count)],
+            [start + (offset + i) * step for i in range(count)],
+        )
+    return stock
+
+
+def listed_gbce(listings: int) -> Gbce:
+    """Create an exchange with some listings that have traded.
+
+    Args:
+        listings (int): number of listed stocks.
+
+    Returns:
+        Gbce: exchange.
+    """
+    gbce = Gbce(
+        logger_level=logging.WARNING,
+        columnar=True,
+        clock=SimulatedClock(NOW),
+    )
+    names = [f"S{listing:05d}" for listing in range(listings)]
+    for name in names:
+        gbce.add_stock(name, StockType.COMMON, 8, None, 100)
+
+    rows = [
+        (name, TradeType.BUY, 1.0, 1.0 + listing % 17 + trade % 5, NOW - trade)
+        for listing, name in enumerate(names)
+        for trade in range(TRADES_PER_LISTING)
+    ]
+    gbce.ingest_trades(rows)
+    return gbce
+
+
+def bench_record_trade(trades: int, columnar: bool, profile: Profile) -> dict:
+    """Benchmark recording trades into a stock that has traded.
+
+    Args:
+        trades (int): number of trades of the stock.
+        columnar (bool): whether the stock keeps its trades in typed arrays.
+        profile (Profile): sweep profile.
+
+    Returns:
+        dict: trades recorded per second.
+    """
+    stock = filled_stock(trades, columnar)
+    timestamps = itertools.count(NOW, 1e-6)
+
+    def record() -> None:
+        stock.record_trade(TradeType.BUY, 1.0, 10.0, next(timestamps))
+
+    seconds = measure(record, profile.min_time, profile.repeat)
+    return {"trades_per_second": 1 / seconds}
+
+
+def bench_vwsp(trades: int, columnar: bool, profile: Profile) -> dict:
+    """Benchmark the volume weighted price of a stock.
+
+    Args:
+        trades (int): number of recent trades of the stock.
+        columnar (bool): whether the stock keeps its trades in typed arrays.
+        profile (Profile): sweep profile.
+
+    Returns:
+        dict: seconds per calculation.
+    """
+    stock = filled_stock(trades, columnar)
+
+    def calculate() -> None:
+        stock.calculate_volume_weighted_stock_price(NOW)
+
+    return {"seconds": measure(calculate, profile.min_time, profile.repeat)}
+
+
+def bench_memory(trades: int, columnar: bool, profile: Profile) -> dict:
+    """Benchmark the memory a stock takes per trade.
+
+    Args:
+        trades (int): number of trades of the stock.
+        columnar (bool): whether the stock keeps its trades in typed arrays.
+        profile (Profile): sweep profile.
+
+    Returns:
+        dict: bytes per trade.
+    """
+    # pylint: disable=unused-argument
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stock = filled_stock(trades, columnar)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del stock
+    return {"bytes_per_trade": size / trades}
+
+
+def bench_index(listings: int, profile: Profile) -> dict:
+    """Benchmark the all share index of an exchange.
+
+    The incremental index is read after a trade, so one stock is
+    re-evaluated, and the index of every stock given by name, which isn't
+    maintained incrementally, is calculated from every stock.
+
+    Args:
+        listings (int): number of listed stocks.
+        profile (Profile): sweep profile.
+
+    Returns:
+        dict: seconds per incremental and full calculation.
+    """
+    gbce = listed_gbce(listings)
+    names = list(gbce.stocks)
+    stocks = itertools.cycle(list(gbce.stocks.values()))
+    timestamps = itertools.count(NOW, 1e-6)
+    gbce.calculate_all_share_index()
+
+    def incremental() -> None:
+        next(stocks).record_trade(TradeType.BUY, 1.0, 10.0, next(timestamps))
+        gbce.calculate_all_share_index()
+
+    def full() -> None:
+        gbce.calculate_all_share_index(names)
+
+    return {
+        "seconds": measure(incremental, profile.min_time, profile.repeat),
+        "full_seconds": measure(full, profile.min_time, profile.repeat),
+    }
+
+
+STOCK_CASES = {
+    "record_trade": bench_record_trade,
+    "vwsp": bench_vwsp,
+    "memory": bench_memory,
+}
+
+
+def sweep(profile: Profile) -> Iterator[tuple[str, dict[str, Any]]]:
+    """List the benchmarks of a sweep.
+
+    Stocks that keep their trades as objects are only benchmarked up to the
+    profile object trades, since larger ones take more memory than most
+    machines have.
+
+    Args:
+        profile (Profile): sweep profile.
+
+    Yields:
+        tuple[str, dict[str, Any]]: case name and parameters.
+    """
+    for case in STOCK_CASES:
+        for store, columnar in STORES.items():
+            for trades in profile.trades:
+                if columnar or trades <= profile.object_trades:
+                    yield case, {"store": store, "trades": trades}
+
+    for listings in profile.listings:
+        yield "index", {"listings": listings}
+
+
+def run_case(case: str, params: dict[str, Any], profile: Profile) -> Result:
+    """Run a benchmark.
+
+    The reference workload is timed right before it, to tell how fast the
+    machine was running.
+
+    Args:
+        case (str): case name.
+        params (dict[str, Any]): case parameters.
+        profile (Profile): sweep profile.
+
+    Returns:
+        Result: benchmark result.
+    """
+    reference = measure(reference_work, profile.min_time, profile.repeat)
+    if case == "index":
+        metrics = bench_index(params["listings"], profile)
+    else:
+        metrics = STOCK_CASES[case](
+            params["trades"], STORES[params["store"]], profile
+        )
+    return Result(case, params, metrics, reference)
+
+
+def run(profile: Profile) -> Iterator[Result]:
+    """Run every benchmark of a sweep.
+
+    Args:
+        profile (Profile): sweep profile.
+
+    Yields:
+        Result: result of every benchmark.
+    """
+    for case, params in sweep(profile):
+        yield run_case(case, params, profile)
@@ -6,34 +6,110 @@ __email__ = "luis.munoz.villarreal@gmail.com"
 __version__ = "0.1"
 
 import logging
-from typing import Union
+import math
+import threading
+import time
+from array import array
+from contextlib import nullcontext
+from typing import Iterable, Mapping, Optional, Sequence, Union
 
+from .clock import Clock, WallClock
+from .index import IncrementalIndex, Universe, geometric_mean, sub_indices
+from .ingest import (
+    UNKNOWN_STOCK,
+    IngestSummary,
+    check_columns,
+    split_rows,
+)
+from .journal import Journal, read_journal
+from .listings import Listing
 from .logger import LoggerMixin
+from .metrics import ExchangeMetrics, Metrics
+from .models.retention import Retention
 from .models.stock import Stock, StockType
 from .models.stock.common import CommonStock
 from .models.stock.preferred import PreferredStock
+from .models.trade import TradeType
+from .models.window import WINDOW_LENGTH
+from .quotes import Prices, QuoteTable, StockParameters
+from .snapshot import read_snapshot, write_snapshot
+from .subscribe import Callback, Notifier, Subscription
+from .tape import Path, name_fits
+from .view import ExchangeView, ViewCache
+
+STOCK_CLASSES: dict[StockType, type[Union[PreferredStock, CommonStock]]] = {
+    StockType.COMMON: CommonStock,
+    StockType.PREFERRED: PreferredStock,
+}
 
 
 class Gbce(LoggerMixin):
     """Global Beverage Corporation Exchange class.
 
+    The exchange can be used from several threads. Stocks are added and
+    removed copying the stock dictionaries, so readers never see them
+    change, and trades are recorded under per-stock locks.
+
     Args:
-        logger_level (int): logger level
+        logger_level (Optional[int]): logger level. None leaves it as
+            configured.
+        columnar (bool): whether stocks keep their trades in typed arrays.
+        clock (Optional[Clock]): clock shared by the exchange and its stocks.
+            None means the wall clock.
+        window (float): seconds a trade is taken as recent for.
+        retention (Optional[Retention]): policy to compact the old trades of
+            every stock into bars. None keeps every trade.
+        bar_resolutions (Iterable[float]): seconds every bar spans, per
+            series of bars aggregated for every stock.
+        journal (Optional[Journal]): journal the trades of every stock are
+            appended to. None doesn't journal trades.
+        metrics (bool): whether to count and time trades, volume weighted
+            stock prices and all share indices.
     """
 
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+
     __stocks: dict[str, Union[PreferredStock, CommonStock]]
+    __by_type: dict[StockType, dict[str, Union[PreferredStock, CommonStock]]]
 
-    def __init__(self, logger_level: int = logging.INFO):
+    def __init__(
+        self,
+        logger_level: Optional[int] = None,
+        columnar: bool = False,
+        clock: Optional[Clock] = None,
+        window: float = WINDOW_LENGTH,
+        retention: Optional[Retention] = None,
+        bar_resolutions: Iterable[float] = (),
+        journal: Optional[Journal] = None,
+        metrics: bool = False,
+    ):
+        # pylint: disable=too-many-arguments
         super().__init__(logger_level)
+        self.__clock = clock if clock is not None else WallClock()
         self.__logger_level = logger_level
+        self.__columnar = columnar
+        self.__window = window
+        self.__retention = retention
+        self.__bar_resolutions = tuple(bar_resolutions)
+        self.__journal = journal
+        self.__metrics = Metrics() if metrics else None
         self.__stocks = {}
+        self.__by_type = {stock_type: {} for stock_type in STOCK_CLASSES}
+        self.__lock = threading.Lock()
+        self.__index = IncrementalIndex()
+        self.__type_indices = {
+            stock_type: IncrementalIndex() for stock_type in STOCK_CLASSES
+        }
+        self.__views = ViewCache()
+        self.__parameters = (self.__stocks, StockParameters(()))
+        self.__notifier = Notifier(self.__clock, logger_level)
 
     def add_stock(
         self,
         name: str,
         stock_type: StockType,
         last_dividend: float,
-        fixed_dividend: float,
+        fixed_dividend: Optional[float],
         par_value: float,
     ) -> Union[Stock, None]:
         """Add a stock.
@@ -42,54 +118,789 @@ class Gbce(LoggerMixin):
             name (str): stock name.
             stock_type (str): stock type.
             last_dividend (float): stock last dividend.
-            fixed_dividend (float): stock fixed dividend.
+            fixed_dividend (Optional[float]): stock fixed dividend, if any.
             par_value (float): stock par value.
 
         Returns:
             Stock: added stock.
-            None: if there is already a stock with that name.
+            None: if there is already a stock with that name, or if the
+                name is too long to be journaled.
         """
         # pylint: disable=too-many-arguments
 
-        if name in self.__stocks:
-            self._log.warning("Stock with name %s already exists.", name)
+        if stock_type not in STOCK_CLASSES:
+            self._log.warning("Unknown stock type %s.", stock_type)
             return None
 
-        values = {
-            "name": name,
-            "last_dividend": last_dividend,
-            "fixed_dividend": fixed_dividend,
-            "par_value": par_value,
-            "logger_level": self.__logger_level,
-        }
+        if self.__journal is not None and not name_fits(name):
+            self._log.warning("Stock name %s is too long to journal.", name)
+            return None
 
-        if stock_type == StockType.COMMON:
-            self.__stocks[name] = CommonStock(**values)  # type: ignore
-        elif stock_type == StockType.PREFERRED:
-            self.__stocks[name] = PreferredStock(**values)  # type: ignore
-        else:
-            self._log.warning("Unknown stock type %s.", stock_type)
+        with self.__lock:
+            if name in self.__stocks:
+                self._log.warning("Stock with name %s already exists.", name)
+                return None
+
+            stock = self.__new_stock(
+                name, stock_type, last_dividend, fixed_dividend, par_value
+            )
+            self.__list({name: stock})
+
+        return stock
+
+    def add_stocks(
+        self,
+        listings: Iterable[Listing],
+    ) -> list[Union[PreferredStock, CommonStock]]:
+        """Add several stocks at once, e.g. the listings of a file.
+
+        The stock dictionaries are copied once for all the stocks, instead
+        of once per stock. Listings of stocks that are already listed are
+        skipped unless they have changed, so a whole universe can be loaded
+        again to pick up the new and changed listings. Changed stocks keep
+        their trades: they are updated, or replaced by a stock of the new
+        type, which cancels their subscriptions. The changed stocks are
+        logged, and listings of unknown stock types, or with names too long
+        to journal, are skipped with a single warning.
+
+        Args:
+            listings (Iterable[Listing]): name, stock type, last dividend,
+                fixed dividend and par value of every stock, e.g. read
+                with read_listings.
+
+        Returns:
+            list[Union[PreferredStock, CommonStock]]: added stocks, followed
+                by the changed ones.
+        """
+        # pylint: disable=too-many-branches,too-many-locals
+        unknown = []
+        too_long = []
+        with self.__lock:
+            stocks = self.__stocks
+            added: dict[str, Union[PreferredStock, CommonStock]] = {}
+            changed: dict[str, Listing] = {}
+            for listing in listings:
+                name, stock_type, *_ = listing
+                stock = stocks.get(name)
+                if stock_type not in STOCK_CLASSES:
+                    unknown.append(name)
+                elif self.__journal is not None and not name_fits(name):
+                    too_long.append(name)
+                elif name in added or name in changed:
+                    continue
+                elif stock is None:
+                    added[name] = self.__new_stock(*listing)
+                elif tuple(listing) != (
+                    name,
+                    stock.type,
+                    stock.last_dividend,
+                    stock.fixed_dividend,
+                    stock.par_value,
+                ):
+                    changed[name] = listing
+                    if stock_type != stock.type:
+                        added[name] = self.__new_stock(*listing)
+
+            replaced = {
+                name: stocks[name] for name in changed if name in added
+            }
+            relisted = {
+                name: stocks[name] for name in changed if name not in added
+            }
+            for name, stock in relisted.items():
+                _, _, last_dividend, fixed_dividend, par_value = changed[name]
+                stock.relist(
+                    last_dividend,
+                    fixed_dividend,  # type: ignore
+                    par_value,
+                )
+            listed = {**added, **relisted}
+            if replaced:
+                self.__delist(replaced)
+            if listed:
+                self.__list(listed)
+
+        for name, stock in replaced.items():
+            self.__detach(stock)
+            # Marked for the index of its former type to leave it out.
+            self.__on_trades(stock)
+            listed[name].restore_trades(stock.trade_columns)
+        for name in changed:
+            self.__on_trades(listed[name])
+
+        if changed:
+            self._log.info("Updated listings: %s", ", ".join(changed))
+        if unknown:
+            self._log.warning(
+                "Skipped stocks of unknown types: %s", ", ".join(unknown)
+            )
+        if too_long:
+            self._log.warning(
+                "Skipped stocks with names too long to journal: %s",
+                ", ".join(too_long),
+            )
+        return [
+            *(stock for name, stock in added.items() if name not in changed),
+            *(listed[name] for name in changed),
+        ]
+
+    def __list(
+        self, added: Mapping[str, Union[PreferredStock, CommonStock]]
+    ) -> None:
+        """Replace the stock dictionaries with copies holding new stocks.
+
+        The lock must be held.
+
+        Args:
+            added (Mapping[str, Union[PreferredStock, CommonStock]]): new
+                stocks by name.
+        """
+        self.__stocks = {**self.__stocks, **added}
+        by_type = dict(self.__by_type)
+        for stock_type in {stock.type for stock in added.values()}:
+            by_type[stock_type] = {
+                **by_type[stock_type],
+                **{
+                    name: stock
+                    for name, stock in added.items()
+                    if stock.type == stock_type
+                },
+            }
+        self.__by_type = by_type
+
+    def remove_stock(
+        self, name: str
+    ) -> Union[PreferredStock, CommonStock, None]:
+        """Delist a stock.
+
+        Args:
+            name (str): stock name.
+
+        Returns:
+            Union[PreferredStock, CommonStock]: removed stock.
+            None: if there isn't a stock with that name.
+        """
+        removed = self.remove_stocks([name])
+        if not removed:
+            self._log.warning("Stock with name %s isn't listed.", name)
             return None
 
-        return self.__stocks[name]
+        return removed[0]
+
+    def remove_stocks(
+        self, names: Iterable[str]
+    ) -> list[Union[PreferredStock, CommonStock]]:
+        """Delist several stocks at once.
+
+        The stock dictionaries are copied once for all the stocks, and the
+        removed stocks are left out of the indices and views the next time
+        they are calculated. Their trades are no longer journaled and their
+        subscriptions are cancelled. Unknown stock names are ignored.
+
+        Args:
+            names (Iterable[str]): stock names.
+
+        Returns:
+            list[Union[PreferredStock, CommonStock]]: removed stocks.
+        """
+        with self.__lock:
+            stocks = self.__stocks
+            removed = {name: stocks[name] for name in names if name in stocks}
+            if removed:
+                self.__delist(removed)
+
+        for stock in removed.values():
+            self.__detach(stock)
+            self.__on_trades(stock)
+        return list(removed.values())
+
+    def __delist(
+        self, removed: Mapping[str, Union[PreferredStock, CommonStock]]
+    ) -> None:
+        """Replace the stock dictionaries with copies without some stocks.
+
+        The lock must be held.
+
+        Args:
+            removed (Mapping[str, Union[PreferredStock, CommonStock]]):
+                listed stocks by name.
+        """
+        self.__stocks = {
+            name: stock
+            for name, stock in self.__stocks.items()
+            if name not in removed
+        }
+        by_type = dict(self.__by_type)
+        for stock_type in {stock.type for stock in removed.values()}:
+            by_type[stock_type] = {
+                name: stock
+                for name, stock in by_type[stock_type].items()
+                if name not in removed
+            }
+        self.__by_type = by_type
+
+    def __detach(self, stock: Stock) -> None:
+        """Detach a delisted stock from the exchange.
+
+        Its trades are no longer marked or journaled, and its subscriptions
+        are cancelled.
+
+        Args:
+            stock (Stock): delisted stock.
+        """
+        stock.remove_trade_listener(self.__on_trades)
+        if self.__journal is not None:
+            stock.remove_trade_listener(self.__journal)
+        stock.cancel_subscriptions()
+
+    def __new_stock(
+        self,
+        name: str,
+        stock_type: StockType,
+        last_dividend: float,
+        fixed_dividend: Optional[float],
+        par_value: float,
+    ) -> Union[PreferredStock, CommonStock]:
+        """Create a stock with the exchange settings and listeners.
+
+        Args:
+            name (str): stock name.
+            stock_type (StockType): stock type.
+            last_dividend (float): stock last dividend.
+            fixed_dividend (Optional[float]): stock fixed dividend, if any.
+            par_value (float): stock par value.
+
+        Returns:
+            Union[PreferredStock, CommonStock]: created stock.
+        """
+        # pylint: disable=too-many-arguments
+        stock = STOCK_CLASSES[stock_type](
+            name=name,
+            last_dividend=last_dividend,
+            fixed_dividend=fixed_dividend,  # type: ignore
+            par_value=par_value,
+            logger_level=self.__logger_level,
+            columnar=self.__columnar,
+            clock=self.__clock,
+            window=self.__window,
+            retention=self.__retention,
+            metrics=self.__metrics,
+        )
+
+        stock.add_trade_listener(self.__on_trades)
+        if self.__bar_resolutions:
+            stock.aggregate_bars(self.__bar_resolutions)
+        if self.__journal is not None:
+            stock.add_trade_listener(self.__journal)
+        return stock
+
+    def __on_trades(self, stock: Stock, *_: Sequence) -> None:
+        """Mark a stock that has changed to be re-evaluated and viewed again.
+
+        Stocks are marked when they trade, and when they are restored or
+        removed.
+
+        Args:
+            stock (Stock): stock that has traded.
+            _ (Sequence): recorded trades.
+        """
+        self.__index.mark(stock.name)
+        self.__type_indices[stock.type].mark(stock.name)
+        self.__views.mark(stock.name)
+
+    @property
+    def clock(self) -> Clock:
+        """Get clock.
+
+        Returns:
+            Clock: clock shared by the exchange and its stocks.
+        """
+        return self.__clock
+
+    @property
+    def retention(self) -> Optional[Retention]:
+        """Get retention policy.
+
+        Returns:
+            Retention: policy the old trades of every stock are compacted
+                by.
+            None: if every trade is kept.
+        """
+        return self.__retention
 
     @property
     def stocks(self) -> dict[str, Union[PreferredStock, CommonStock]]:
         """Get stocks.
 
+        Adding stocks replaces the dictionary instead of changing it, so it
+        can be iterated while other threads add stocks. It must not be
+        changed.
+
         Returns:
             dict[str, Union[PreferredStock, CommonStock]]: GBCE stocks.
         """
         return self.__stocks
 
-    def calculate_all_share_index(self) -> float:
+    def stocks_of_type(
+        self, stock_type: StockType
+    ) -> dict[str, Union[PreferredStock, CommonStock]]:
+        """Get the stocks of a type.
+
+        Stocks are kept by type as well as by name, so this doesn't go
+        through every stock. Like the stocks dictionary, it must not be
+        changed.
+
+        Args:
+            stock_type (StockType): stock type.
+
+        Returns:
+            dict[str, Union[PreferredStock, CommonStock]]: stocks of the
+                type by name.
+        """
+        return self.__by_type[stock_type]
+
+    @property
+    def notifier(self) -> Notifier:
+        """Get notifier.
+
+        Returns:
+            Notifier: notifier of the subscriptions to the exchange, to
+                dispatch or start.
+        """
+        return self.__notifier
+
+    def subscribe(
+        self,
+        callback: Callback,
+        subject: Union[str, StockType, None] = None,
+        threshold: float = 0.0,
+        interval: float = 0.0,
+    ) -> Subscription:
+        """Subscribe to the changes of a price or an index.
+
+        Changes are notified when the notifier is dispatched, or from its
+        thread once started. Indices are maintained incrementally, so
+        checking them costs time proportional to what has changed.
+
+        Args:
+            callback (Callback): callable the changes are notified to.
+            subject (Union[str, StockType, None]): stock name to follow
+                its volume weighted price, stock type to follow its index,
+                or None to follow the all share index.
+            threshold (float): change notifications need to exceed.
+            interval (float): seconds between notifications.
+
+        Returns:
+            Subscription: subscription.
+
+        Raises:
+            KeyError: if there isn't a stock with that name.
+        """
+        if isinstance(subject, str):
+            subscription = self.__stocks[subject].subscribe(
+                callback, threshold, interval
+            )
+        else:
+
+            def read(_: float) -> tuple[float, Optional[float]]:
+                """Read the index as of the exchange clock.
+
+                Returns:
+                    tuple[float, Optional[float]]: index, which may change
+                        any time.
+                """
+                return self.calculate_all_share_index(subject), -math.inf
+
+            subscription = Subscription(
+                subject, read, callback, threshold, interval
+            )
+
+        return self.__notifier.add(subscription)
+
+    def view(self) -> ExchangeView:
+        """Take an immutable point-in-time view of the stocks.
+
+        The view holds the parameters of every stock and the state of its
+        recent trades, and can be read from any thread without blocking
+        trading. Views share the stock views of the stocks that haven't
+        changed, so only the stocks that have traded or whose recent trades
+        have expired are viewed again.
+
+        Returns:
+            ExchangeView: exchange view.
+        """
+        return self.__views.view(self.__stocks, self.__clock.now())
+
+    def metrics(self) -> ExchangeMetrics:
+        """Take a snapshot of the metrics of the exchange and its stocks.
+
+        Histograms stay empty and trades aren't counted unless the exchange
+        was created with metrics on. The size of every stock is always
+        given.
+
+        Returns:
+            ExchangeMetrics: metrics snapshot.
+        """
+        metrics = self.__metrics if self.__metrics is not None else Metrics()
+        return metrics.snapshot(
+            {name: stock.metrics() for name, stock in self.__stocks.items()}
+        )
+
+    def quote_table(self, prices: Prices) -> QuoteTable:
+        """Quote every stock at some prices in one go.
+
+        Dividend yields and P/E ratios are taken column-wise from a copy of
+        the stock parameters as typed arrays, which is only made again
+        after stocks are added, changed or removed, and volume weighted
+        stock prices from a view of the exchange.
+
+        Args:
+            prices (Prices): price by stock name, or price of every stock
+                in the order of the stocks dictionary. Stocks without a
+                price get NaN.
+
+        Returns:
+            QuoteTable: quote table in the order of the stocks dictionary.
+
+        Raises:
+            ValueError: if prices in order aren't as many as the stocks.
+        """
+        stocks, parameters = self.__parameters
+        if stocks is not self.__stocks:
+            stocks = self.__stocks
+            parameters = StockParameters(stocks.values())
+            self.__parameters = (stocks, parameters)
+
+        view = self.__views.view(stocks, self.__clock.now())
+        return parameters.quote(
+            prices,
+            [view[name].volume_weighted_stock_price for name in view],
+        )
+
+    def compact(self) -> int:
+        """Roll the trades the retention policy doesn't keep up into bars.
+
+        Stocks compact themselves as they trade. This also compacts the
+        ones that have stopped trading.
+
+        Returns:
+            int: number of compacted trades.
+        """
+        now = self.__clock.now()
+        return sum(stock.compact(now) for stock in self.__stocks.values())
+
+    def snapshot(self, path: Path) -> int:
+        """Write the stocks and their trades to a snapshot.
+
+        Args:
+            path (Path): snapshot path.
+
+        Returns:
+            int: number of written stocks.
+        """
+        return write_snapshot(path, self.__stocks.values())
+
+    def restore(self, path: Path, lazy: bool = False) -> int:
+        """Add the stocks of a snapshot and restore their trades.
+
+        Restored trades aren't passed to the trade listeners, so they
+        aren't journaled or aggregated into bars again.
+
+        Args:
+            path (Path): snapshot path.
+            lazy (bool): whether to wait until the trades of every stock are
+                first needed to load them.
+
+        Returns:
+            int: number of restored stocks.
+        """
+        entries = read_snapshot(path)
+        restored = []
+        with self.__lock:
+            added: dict[str, Union[PreferredStock, CommonStock]] = {}
+            for entry in entries:
+                if entry.name in self.__stocks or entry.name in added:
+                    self._log.warning(
+                        "Stock with name %s already exists.", entry.name
+                    )
+                    continue
+
+                stock = self.__new_stock(
+                    entry.name,
+                    entry.stock_type,
+                    entry.last_dividend,
+                    entry.fixed_dividend,
+                    entry.par_value,
+                )
+                added[entry.name] = stock
+                restored.append((entry, stock))
+            self.__list(added)
+
+        for entry, stock in restored:
+            if entry.trade_count:
+                stock.restore_trades(entry.load, lazy)
+                self.__on_trades(stock)
+
+        return len(restored)
+
+    def recover(
+        self, path: Path, since: Optional[float] = None
+    ) -> IngestSummary:
+        """Record the trades of a journal again, e.g. after a restart.
+
+        Only the tail of the journal is read, from the trades that are
+        still recent by default, and the recovered trades aren't journaled
+        again, while the trades other threads record meanwhile are. The
+        stocks need to be added before.
+
+        Args:
+            path (Path): journal path.
+            since (Optional[float]): timestamp of the oldest trade to
+                recover. None means the oldest trade that is still recent.
+
+        Returns:
+            IngestSummary: number of recovered trades and rejected rows.
+        """
+        if since is None:
+            since = self.__clock.now() - self.__window
+
+        suspended = (
+            self.__journal.suspended()
+            if self.__journal is not None
+            else nullcontext()
+        )
+        summary = IngestSummary()
+        with suspended:
+            for batch in read_journal(path, since):
+                offset = summary.accepted + len(summary.rejected)
+                summary.merge(
+                    self.ingest_trade_columns(*batch),
+                    range(offset, offset + len(batch.names)),
+                )
+        return summary
+
+    def calculate_all_share_index(
+        self, universe: Optional[Universe] = None
+    ) -> float:
         """Calculate all share index.
 
+        The index of the whole exchange, and the one of every stock type,
+        is maintained incrementally: only the stocks that have traded, or
+        whose oldest recent trade has expired, or that have been removed,
+        since the last call are re-evaluated. Stocks without
+        recent trades, or with a volume weighted stock price that isn't
+        positive, are left out of the index, and the index is 0 when no
+        stock is left.
+
+        Args:
+            universe (Optional[Universe]): stock type or stock names to
+                calculate the index of. None means every stock.
+
+        Returns:
+            float: share index.
+        """
+        metrics = self.__metrics
+        start = time.perf_counter() if metrics is not None else 0.0
+        if isinstance(universe, StockType):
+            value = self.__type_indices[universe].value(
+                self.__by_type[universe], self.__clock.now()
+            )
+        elif universe is not None:
+            value = self.calculate_sub_indices({"": universe})[""]
+        else:
+            value = self.__index.value(self.__stocks, self.__clock.now())
+
+        if metrics is not None:
+            metrics.all_share_index.observe(time.perf_counter() - start)
+        return value
+
+    def calculate_all_share_index_log_sum(self) -> tuple[float, int]:
+        """Calculate the partial all share index of the exchange stocks.
+
+        Partials of exchanges listing different stocks can be combined
+        into the index of all of them with combine_log_sums.
+
+        Returns:
+            tuple[float, int]: sum of the logs of the positive volume
+                weighted stock prices and number of stocks in the index.
+        """
+        now = self.__clock.now()
+        return self.__index.log_sum(self.__stocks, now)
+
+    def calculate_volume_weighted_stock_prices(
+        self, windows: Iterable[float]
+    ) -> dict[str, dict[float, float]]:
+        """Calculate every stock's volume weighted price over several windows.
+
+        Args:
+            windows (Iterable[float]): window lengths in seconds.
+
+        Returns:
+            dict[str, dict[float, float]]: volume weighted stock price by
+                window length by stock name.
+        """
+        lengths = list(windows)
+        now = self.__clock.now()
+        return {
+            name: stock.calculate_volume_weighted_stock_prices(lengths, now)
+            for name, stock in self.__stocks.items()
+        }
+
+    def all_share_index_at(self, timestamp: float) -> float:
+        """Calculate all share index as of a past instant.
+
+        Every stock's volume weighted stock price is taken from its prefix
+        sum index, so no trades are scanned.
+
+        Args:
+            timestamp (float): instant.
+
         Returns:
             float: share index.
         """
-        index = len(self.__stocks)
-        vwsp = 1.0
-        for stock in self.__stocks.values():
-            vwsp *= stock.calculate_volume_weighted_stock_price()
-        return vwsp ** (1 / index)
+        return geometric_mean(
+            stock.vwsp_at(timestamp) for stock in self.__stocks.values()
+        )
+
+    def all_share_index_at_many(self, timestamps: Iterable[float]) -> array:
+        """Calculate all share index as of several instants.
+
+        Args:
+            timestamps (Iterable[float]): instants.
+
+        Returns:
+            array: share index as of every instant.
+        """
+        times = list(timestamps)
+        columns = [
+            stock.vwsp_at_many(times) for stock in self.__stocks.values()
+        ]
+        if not columns:
+            return array("d", [0.0] * len(times))
+
+        return array("d", map(geometric_mean, zip(*columns)))
+
+    def calculate_sub_indices(
+        self, universes: Mapping[str, Universe]
+    ) -> dict[str, float]:
+        """Calculate the index of several universes of stocks in one pass.
+
+        The volume weighted stock price of every stock is calculated once
+        and the geometric mean of every universe is taken in log space.
+        Unknown stock names are ignored.
+
+        Args:
+            universes (Mapping[str, Universe]): stock type or stock names of
+                every universe.
+
+        Returns:
+            dict[str, float]: index of every universe.
+        """
+        members = {
+            key: self.__members(universe)
+            for key, universe in universes.items()
+        }
+
+        now = self.__clock.now()
+        prices = {
+            name: self.__stocks[name].calculate_volume_weighted_stock_price(
+                now
+            )
+            for name in set().union(*members.values())
+        }
+
+        return sub_indices(prices, members)
+
+    def __members(self, universe: Universe) -> list[str]:
+        """Get the names of the listed stocks of a universe.
+
+        Args:
+            universe (Universe): stock type or stock names.
+
+        Returns:
+            list[str]: names of the listed stocks in the universe.
+        """
+        if isinstance(universe, StockType):
+            return list(self.__by_type[universe])
+
+        return [name for name in universe if name in self.__stocks]
+
+    def ingest_trades(
+        self,
+        trades: Iterable[tuple[str, TradeType, float, float, Optional[float]]],
+    ) -> IngestSummary:
+        """Record trades of several stocks at once.
+
+        Args:
+            trades (Iterable[tuple]): stock name, trade type, quantity,
+                price and timestamp of every trade. A None timestamp means
+                now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+        """
+        return self.ingest_trade_columns(*split_rows(trades, 5))
+
+    def ingest_trade_columns(
+        self,
+        names: Sequence[str],
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Optional[Sequence[Optional[float]]] = None,
+    ) -> IngestSummary:
+        """Record trades of several stocks given as parallel columns.
+
+        The rows are grouped per stock and every group is recorded in bulk.
+        Rows of unknown stocks are reported in the summary with a single
+        warning.
+
+        Args:
+            names (Sequence[str]): stock name of every trade.
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Optional[Sequence[Optional[float]]]): timestamp of
+                every trade. None, or a None timestamp, means now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+
+        Raises:
+            ValueError: if the columns don't have the same length.
+        """
+        # pylint: disable=too-many-arguments
+        check_columns(names, trade_types, quantities, prices, timestamps)
+        rows_by_stock: dict[str, list[int]] = {}
+        for index, name in enumerate(names):
+            rows_by_stock.setdefault(name, []).append(index)
+
+        summary = IngestSummary()
+        unknown = []
+        for name, rows in rows_by_stock.items():
+            stock = self.__stocks.get(name)
+            if stock is None:
+                unknown.append(name)
+                summary.rejected.extend((row, UNKNOWN_STOCK) for row in rows)
+                continue
+
+            stock_summary = stock.record_trade_columns(
+                [trade_types[row] for row in rows],
+                [quantities[row] for row in rows],
+                [prices[row] for row in rows],
+                None
+                if timestamps is None
+                else [timestamps[row] for row in rows],
+            )
+            summary.merge(stock_summary, rows)
+
+        summary.rejected.sort()
+        if unknown:
+            self._log_limited(
+                logging.WARNING,
+                "",
+                "Rejected trades of unknown stocks: %s",
+                ", ".join(unknown),
+            )
+
+        return summary
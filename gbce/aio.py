@@ -0,0 +1,288 @@
+"""Asyncio exchange front-end module."""
+
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from types import TracebackType
+from typing import AsyncIterable, Optional, Type, Union
+
+from . import Gbce
+from .index import Universe
+from .ingest import IngestSummary, split_rows
+from .models.stock import StockType
+from .models.trade import TradeType
+from .subscribe import Change, Subscription, queue_callback
+
+TradeRow = tuple[str, TradeType, float, float, Optional[float]]
+
+
+class AsyncGbce:
+    """Asyncio front-end of an exchange.
+
+    Trades submitted from the event loop are queued and recorded in
+    micro-batches by a background task, which hands every batch to a worker
+    thread so bursts don't stall the loop. The queue is bounded: submitting
+    waits while it is full, which passes backpressure on to the producers.
+    Queries run in a worker thread too.
+
+    Use it as an async context manager, or call start and close.
+
+    Args:
+        gbce (Gbce): exchange to record the trades in.
+        max_pending (int): number of queued trades submitting waits at.
+        batch_size (int): maximum number of trades recorded at a time.
+        executor (Optional[Executor]): executor batches are recorded and
+            queries run in. None means the event loop default executor.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        gbce: Gbce,
+        max_pending: int = 10000,
+        batch_size: int = 1024,
+        executor: Optional[Executor] = None,
+    ):
+        self.__gbce = gbce
+        self.__max_pending = max_pending
+        self.__batch_size = batch_size
+        self.__executor = executor
+        self.__queue: Optional[asyncio.Queue[TradeRow]] = None
+        self.__task: Optional[asyncio.Task] = None
+        self.__error: Optional[BaseException] = None
+        self.__submitted = 0
+        self.summary = IngestSummary()
+
+    async def __aenter__(self) -> "AsyncGbce":
+        """Start recording trades when entering the context.
+
+        Returns:
+            AsyncGbce: the front-end itself.
+        """
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Record the queued trades and stop when leaving the context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        await self.close()
+
+    @property
+    def gbce(self) -> Gbce:
+        """Get exchange.
+
+        Returns:
+            Gbce: exchange the trades are recorded in.
+        """
+        return self.__gbce
+
+    @property
+    def pending(self) -> int:
+        """Get number of queued trades.
+
+        Returns:
+            int: number of trades waiting to be recorded.
+        """
+        return self.__queue.qsize() if self.__queue is not None else 0
+
+    def start(self) -> None:
+        """Start the task recording the queued trades.
+
+        It needs to be called from the event loop.
+        """
+        if self.__task is None:
+            self.__queue = asyncio.Queue(self.__max_pending)
+            self.__task = asyncio.create_task(self.__record(self.__queue))
+
+    async def close(self) -> None:
+        """Record the queued trades and stop the recording task."""
+        if self.__task is None:
+            return
+
+        try:
+            await self.flush()
+        finally:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+            self.__queue = None
+
+    async def submit(
+        self,
+        name: str,
+        trade_type: TradeType,
+        quantity: float,
+        price: float,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Queue a trade, waiting while the queue is full.
+
+        Trades are validated when recorded, and the rejected ones are
+        reported in the summary by submission order.
+
+        Args:
+            name (str): stock name.
+            trade_type (TradeType): trade type.
+            quantity (float): trade quantity.
+            price (float): trade price.
+            timestamp (Optional[float]): trade timestamp. None means the
+                time of submission.
+
+        Raises:
+            RuntimeError: if the front-end hasn't been started.
+        """
+        # pylint: disable=too-many-arguments
+        if self.__queue is None:
+            raise RuntimeError("AsyncGbce needs to be started first.")
+        self.__raise_error()
+
+        if timestamp is None:
+            timestamp = self.__gbce.clock.now()
+        await self.__queue.put((name, trade_type, quantity, price, timestamp))
+
+    async def submit_all(self, trades: AsyncIterable[TradeRow]) -> int:
+        """Queue every trade of an async iterable.
+
+        Args:
+            trades (AsyncIterable[TradeRow]): stock name, trade type,
+                quantity, price and timestamp of every trade. A None
+                timestamp means the time of submission.
+
+        Returns:
+            int: number of submitted trades.
+        """
+        count = 0
+        async for trade in trades:
+            await self.submit(*trade)
+            count += 1
+        return count
+
+    async def flush(self) -> None:
+        """Wait until the queued trades are recorded."""
+        if self.__queue is not None:
+            await self.__queue.join()
+        self.__raise_error()
+
+    async def calculate_all_share_index(
+        self, universe: Optional[Universe] = None
+    ) -> float:
+        """Calculate all share index in a worker thread.
+
+        Queued trades that haven't been recorded yet aren't taken into
+        account, unless flush is awaited first.
+
+        Args:
+            universe (Optional[Universe]): stock type or stock names to
+                calculate the index of. None means every stock.
+
+        Returns:
+            float: share index.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, self.__gbce.calculate_all_share_index, universe
+        )
+
+    async def calculate_volume_weighted_stock_price(self, name: str) -> float:
+        """Calculate the volume weighted price of a stock in a worker thread.
+
+        Args:
+            name (str): stock name.
+
+        Returns:
+            float: volume weighted stock price.
+
+        Raises:
+            KeyError: if there isn't a stock with that name.
+        """
+        stock = self.__gbce.stocks[name]
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, stock.calculate_volume_weighted_stock_price
+        )
+
+    def subscribe(
+        self,
+        subject: Union[str, StockType, None] = None,
+        threshold: float = 0.0,
+        interval: float = 0.0,
+    ) -> "tuple[asyncio.Queue[Change], Subscription]":
+        """Subscribe to the changes of a price or an index through a queue.
+
+        It needs to be called from the event loop. Changes are put in the
+        queue when the exchange notifier is dispatched, or from its thread
+        once started.
+
+        Args:
+            subject (Union[str, StockType, None]): stock name to follow
+                its volume weighted price, stock type to follow its index,
+                or None to follow the all share index.
+            threshold (float): change notifications need to exceed.
+            interval (float): seconds between notifications.
+
+        Returns:
+            tuple[asyncio.Queue[Change], Subscription]: queue of the
+                changes and subscription, to cancel it.
+
+        Raises:
+            KeyError: if there isn't a stock with that name.
+        """
+        queue: asyncio.Queue[Change] = asyncio.Queue()
+        callback = queue_callback(queue, asyncio.get_running_loop())
+        subscription = self.__gbce.subscribe(
+            callback, subject, threshold, interval
+        )
+        return queue, subscription
+
+    async def __record(self, queue: "asyncio.Queue[TradeRow]") -> None:
+        """Record the queued trades in batches until cancelled.
+
+        Args:
+            queue (asyncio.Queue[TradeRow]): queue of submitted trades.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.__batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            offset = self.__submitted
+            self.__submitted += len(batch)
+            try:
+                summary = await loop.run_in_executor(
+                    self.__executor,
+                    partial(
+                        self.__gbce.ingest_trade_columns,
+                        *split_rows(batch, 5),
+                    ),
+                )
+                self.summary.merge(summary, range(offset, offset + len(batch)))
+            except Exception as error:  # pylint: disable=broad-except
+                self.__error = error
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def __raise_error(self) -> None:
+        """Raise the error a batch failed with, if any.
+
+        Raises:
+            BaseException: error a batch failed with.
+        """
+        if self.__error is not None:
+            error, self.__error = self.__error, None
+            raise error
@@ -0,0 +1,122 @@
+"""Clock module."""
+
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+
+class Clock(ABC):
+    """Clock base class.
+
+    Gives the timestamps used to record trades and to tell which trades are
+    recent.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    @abstractmethod
+    def now(self) -> float:
+        """Get current timestamp.
+
+        Returns:
+            float: current timestamp.
+        """
+
+
+class WallClock(Clock):
+    """Wall clock class.
+
+    Reads the system time every time it's asked.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def now(self) -> float:
+        """Get current timestamp.
+
+        Returns:
+            float: current timestamp.
+        """
+        return datetime.timestamp(datetime.utcnow())
+
+
+class CoarseClock(Clock):
+    """Coarse clock class.
+
+    Caches the system time and only reads it again once the resolution has
+    passed or when it's refreshed, so a burst of trades or a query over many
+    stocks reads the time once.
+
+    Args:
+        resolution (float): seconds the cached time is used for.
+    """
+
+    def __init__(self, resolution: float = 0.001):
+        self.__resolution = resolution
+        self.__read_at = 0.0
+        self.__now = 0.0
+        self.refresh()
+
+    def refresh(self) -> float:
+        """Read the system time.
+
+        Returns:
+            float: current timestamp.
+        """
+        self.__read_at = time.monotonic()
+        self.__now = datetime.timestamp(datetime.utcnow())
+        return self.__now
+
+    def now(self) -> float:
+        """Get current timestamp.
+
+        Returns:
+            float: cached timestamp.
+        """
+        if time.monotonic() - self.__read_at >= self.__resolution:
+            return self.refresh()
+
+        return self.__now
+
+
+class SimulatedClock(Clock):
+    """Simulated clock class.
+
+    Only moves when it's told to, so trades can be replayed as fast as
+    possible with reproducible results.
+
+    Args:
+        start (float): initial timestamp.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.__now = start
+
+    def now(self) -> float:
+        """Get current timestamp.
+
+        Returns:
+            float: simulated timestamp.
+        """
+        return self.__now
+
+    def set(self, timestamp: float) -> None:
+        """Move the clock to a timestamp.
+
+        Args:
+            timestamp (float): new timestamp.
+        """
+        self.__now = timestamp
+
+    def advance(self, seconds: float) -> float:
+        """Move the clock forward.
+
+        Args:
+            seconds (float): seconds to move forward.
+
+        Returns:
+            float: new timestamp.
+        """
+        self.__now += seconds
+        return self.__now
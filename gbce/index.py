@@ -0,0 +1,233 @@
+"""All share index module."""
+
+
+import heapq
+import math
+import threading
+from array import array
+from typing import Iterable, Mapping, Union
+
+from .models.stock import Stock, StockType
+
+Universe = Union[StockType, Iterable[str]]
+
+
+def geometric_mean(values: Iterable[float]) -> float:
+    """Calculate the geometric mean of the positive values.
+
+    The mean is taken in log space, so it neither overflows nor underflows
+    however many values there are.
+
+    Args:
+        values (Iterable[float]): values to average.
+
+    Returns:
+        float: geometric mean or 0 if there are no positive values.
+    """
+    logs = array("d", map(math.log, filter((0.0).__lt__, values)))
+    if not logs:
+        return 0.0
+
+    return math.exp(math.fsum(logs) / len(logs))
+
+
+def combine_log_sums(partials: Iterable[tuple[float, int]]) -> float:
+    """Combine partial log sums into their geometric mean.
+
+    Args:
+        partials (Iterable[tuple[float, int]]): sum of the logs of some
+            positive values and number of values, per part.
+
+    Returns:
+        float: geometric mean of all the values or 0 if there are none.
+    """
+    total, count = 0.0, 0
+    for log_sum, values in partials:
+        total += log_sum
+        count += values
+    if not count:
+        return 0.0
+
+    return math.exp(total / count)
+
+
+def sub_indices(
+    prices: Mapping[str, float], universes: Mapping[str, Iterable[str]]
+) -> dict[str, float]:
+    """Calculate the index of several universes of stocks.
+
+    Args:
+        prices (Mapping[str, float]): volume weighted stock price by stock
+            name.
+        universes (Mapping[str, Iterable[str]]): stock names by universe.
+
+    Returns:
+        dict[str, float]: index by universe.
+    """
+    return {
+        key: geometric_mean(map(prices.__getitem__, names))
+        for key, names in universes.items()
+    }
+
+
+class DirtySet:
+    """Set of stock names marked to be re-evaluated.
+
+    Names can be added from any thread while the set is taken: adding only
+    holds a lock long enough to add the name.
+    """
+
+    __names: set[str]
+
+    def __init__(self) -> None:
+        self.__names = set()
+        self.__lock = threading.Lock()
+
+    def add(self, name: str) -> None:
+        """Mark a stock.
+
+        Args:
+            name (str): stock name.
+        """
+        with self.__lock:
+            self.__names.add(name)
+
+    def take(self) -> set[str]:
+        """Take the marked stocks, leaving none marked.
+
+        Returns:
+            set[str]: names of the marked stocks.
+        """
+        with self.__lock:
+            names, self.__names = self.__names, set()
+        return names
+
+
+class IncrementalIndex:
+    """Incrementally maintained all share index.
+
+    Keeps the log of the volume weighted stock price of every stock and
+    their running sum, so the geometric mean can be read in O(1). Stocks
+    are only re-evaluated after they trade or when their oldest recent
+    trade expires.
+
+    Stocks without recent trades, or with a volume weighted stock price
+    that isn't positive, are left out of the index. The index is 0 when no
+    stock has a positive volume weighted stock price.
+
+    Stocks can be marked from any thread while the index is read. Marked
+    stocks that are no longer listed are dropped from the index.
+    """
+
+    __logs: dict[str, float]
+    __expiries: list[tuple[float, str]]
+    __scheduled: dict[str, float]
+
+    # Number of updates after which the running sum is recomputed exactly.
+    RESUM_INTERVAL = 100000
+
+    def __init__(self) -> None:
+        self.__logs = {}
+        self.__log_sum = 0.0
+        self.__updates = 0
+        self.__dirty = DirtySet()
+        self.__expiries = []
+        self.__scheduled = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get number of stocks in the index.
+
+        Returns:
+            int: number of stocks with a positive volume weighted price.
+        """
+        return len(self.__logs)
+
+    def mark(self, name: str) -> None:
+        """Mark a stock to be re-evaluated on the next read.
+
+        Args:
+            name (str): stock name.
+        """
+        self.__dirty.add(name)
+
+    def value(self, stocks: Mapping[str, Stock], now: float) -> float:
+        """Get the all share index.
+
+        Args:
+            stocks (Mapping[str, Stock]): stocks by name.
+            now (float): current timestamp.
+
+        Returns:
+            float: all share index.
+        """
+        return combine_log_sums([self.log_sum(stocks, now)])
+
+    def log_sum(
+        self, stocks: Mapping[str, Stock], now: float
+    ) -> tuple[float, int]:
+        """Get the sum of the logs of the volume weighted stock prices.
+
+        Args:
+            stocks (Mapping[str, Stock]): stocks by name.
+            now (float): current timestamp.
+
+        Returns:
+            tuple[float, int]: sum of the logs and number of stocks in the
+                index.
+        """
+        with self.__lock:
+            dirty = self.__dirty.take()
+            expiries = self.__expiries
+            scheduled = self.__scheduled
+            while expiries and expiries[0][0] < now:
+                expiry, name = heapq.heappop(expiries)
+                if scheduled.get(name) == expiry:
+                    del scheduled[name]
+                    dirty.add(name)
+
+            for name in dirty:
+                stock = stocks.get(name)
+                if stock is None:
+                    self.__drop(name)
+                    self.__scheduled.pop(name, None)
+                else:
+                    self.__refresh(name, stock, now)
+
+            return self.__log_sum, len(self.__logs)
+
+    def __drop(self, name: str) -> None:
+        """Leave a stock out of the index.
+
+        Args:
+            name (str): stock name.
+        """
+        old = self.__logs.pop(name, None)
+        if old is not None:
+            self.__log_sum -= old
+
+    def __refresh(self, name: str, stock: Stock, now: float) -> None:
+        """Re-evaluate a stock.
+
+        Args:
+            name (str): stock name.
+            stock (Stock): stock.
+            now (float): current timestamp.
+        """
+        self.__drop(name)
+
+        vwsp = stock.calculate_volume_weighted_stock_price(now)
+        if vwsp > 0:
+            log = math.log(vwsp)
+            self.__logs[name] = log
+            self.__log_sum += log
+
+        self.__updates += 1
+        if self.__updates >= self.RESUM_INTERVAL:
+            self.__updates = 0
+            self.__log_sum = math.fsum(self.__logs.values())
+
+        expiry = stock.next_expiry(now)
+        if expiry is not None and self.__scheduled.get(name) != expiry:
+            self.__scheduled[name] = expiry
+            heapq.heappush(self.__expiries, (expiry, name))
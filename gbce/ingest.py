@@ -0,0 +1,157 @@
+"""Bulk trade ingestion module."""
+
+
+import math
+from typing import Iterable, Optional, Sequence
+
+from .models.trade import TradeType
+
+TRADE_TYPE_SET = frozenset(TradeType)
+
+UNKNOWN_STOCK = "Unknown stock"
+UNKNOWN_TRADE_TYPE = "Unknown trade type"
+NON_POSITIVE_QUANTITY = "Quantity needs to be bigger than 0"
+NON_FINITE_VALUE = "Quantity and price need to be finite"
+
+
+class IngestSummary:
+    """Bulk ingestion summary class.
+
+    Args:
+        accepted (int): number of recorded trades.
+        rejected (list[tuple[int, str]]): position and reason of every
+            rejected row.
+    """
+
+    def __init__(
+        self,
+        accepted: int = 0,
+        rejected: Optional[list[tuple[int, str]]] = None,
+    ):
+        self.accepted = accepted
+        self.rejected = rejected if rejected is not None else []
+
+    def __repr__(self) -> str:
+        """Get representation of an IngestSummary object.
+
+        Returns:
+            str: representation of an IngestSummary object.
+        """
+        return (
+            f"<{self.__class__.__qualname__} accepted={self.accepted} "
+            f"rejected={len(self.rejected)}>"
+        )
+
+    def merge(self, other: "IngestSummary", rows: Sequence[int]) -> None:
+        """Merge the summary of a subset of the rows into this one.
+
+        Args:
+            other (IngestSummary): summary of the subset.
+            rows (Sequence[int]): position in this summary of every row of
+                the subset.
+        """
+        self.accepted += other.accepted
+        self.rejected.extend(
+            (rows[index], reason) for index, reason in other.rejected
+        )
+
+    def reasons(self) -> dict[str, int]:
+        """Count the rejected rows per reason.
+
+        Returns:
+            dict[str, int]: number of rejected rows per reason.
+        """
+        counts: dict[str, int] = {}
+        for _, reason in self.rejected:
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+
+def invalid_trade(
+    trade_type: TradeType, quantity: float, price: float
+) -> Optional[str]:
+    """Tell why a trade can't be recorded.
+
+    Infinite or NaN quantities and prices would spoil every running sum
+    they enter, so they are rejected.
+
+    Args:
+        trade_type (TradeType): trade type.
+        quantity (float): trade quantity.
+        price (float): trade price.
+
+    Returns:
+        str: reason the trade is rejected for.
+        None: if the trade is valid.
+    """
+    if trade_type not in TRADE_TYPE_SET:
+        return UNKNOWN_TRADE_TYPE
+    if not math.isfinite(quantity) or not math.isfinite(price):
+        return NON_FINITE_VALUE
+    if quantity <= 0:
+        return NON_POSITIVE_QUANTITY
+    return None
+
+
+def validate_trades(
+    trade_types: Sequence[TradeType],
+    quantities: Sequence[float],
+    prices: Sequence[float],
+) -> list[tuple[int, str]]:
+    """Find the trades that can't be recorded.
+
+    Args:
+        trade_types (Sequence[TradeType]): trade type of every trade.
+        quantities (Sequence[float]): quantity of every trade.
+        prices (Sequence[float]): price of every trade.
+
+    Returns:
+        list[tuple[int, str]]: position and reason of every invalid trade.
+    """
+    inf = math.inf
+    return [
+        (index, str(invalid_trade(trade_type, quantity, price)))
+        for index, (trade_type, quantity, price) in enumerate(
+            zip(trade_types, quantities, prices)
+        )
+        if trade_type not in TRADE_TYPE_SET
+        or not 0 < quantity < inf
+        or not -inf < price < inf
+    ]
+
+
+def check_columns(*columns: Optional[Sequence]) -> None:
+    """Check that parallel columns have the same length.
+
+    Args:
+        columns (Optional[Sequence]): columns to check. None columns are
+            left out.
+
+    Raises:
+        ValueError: if the columns don't have the same length.
+    """
+    if len({len(column) for column in columns if column is not None}) > 1:
+        raise ValueError("Trade columns need the same length.")
+
+
+def split_rows(rows: Iterable[tuple], width: int) -> list[Sequence]:
+    """Turn an iterable of rows into parallel columns.
+
+    Args:
+        rows (Iterable[tuple]): rows to split.
+        width (int): number of columns.
+
+    Returns:
+        list[Sequence]: columns.
+
+    Raises:
+        ValueError: if the rows don't have the expected number of values.
+    """
+    columns: list[Sequence] = list(zip(*rows))
+    if not columns:
+        return [()] * width
+
+    if len(columns) != width:
+        raise ValueError(f"Trade rows need {width} values.")
+
+    return columns
@@ -0,0 +1,368 @@
+"""Trade journal module."""
+
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from types import TracebackType
+from typing import Any, Iterator, NamedTuple, Optional, Sequence, Type
+
+from .models.store.columnar import TRADE_TYPE_CODES, TRADE_TYPES
+from .models.trade import TradeType
+from .tape import RECORD, Path, encode_name
+
+# Latest timestamp of the records committed so far, and journal size after
+# the commit.
+SEEK_ENTRY = struct.Struct("<dQ")
+
+
+class JournalBatch(NamedTuple):
+    """Batch of journaled trades as parallel columns."""
+
+    names: list[str]
+    trade_types: list[TradeType]
+    quantities: list[float]
+    prices: list[float]
+    timestamps: list[float]
+
+
+class Journal:
+    """Append-only trade journal class.
+
+    Trade listener that appends the recorded trades to a file of fixed size
+    binary records, in the same format as binary tapes. It can be shared by
+    stocks recording trades from several threads. Records are
+    committed in groups: they are written and synced once enough of them
+    are pending or enough time has passed since the last commit, so the
+    trades of the last group can be lost on a crash unless committed.
+
+    Records are in recording order, which isn't timestamp order when
+    trades are backfilled. Every commit also appends the latest timestamp
+    journaled so far to a seek index next to the journal, which stays
+    sorted however the trades are timestamped, so the tail of the journal
+    can be found without reading it all.
+
+    A record or seek index entry left partly written by a crash is
+    truncated when the journal is opened, so appended records stay
+    aligned.
+
+    Args:
+        path (Path): journal path. Records are appended to it if it exists.
+        group_size (int): number of pending records that triggers a commit.
+        interval (float): seconds since the last commit that trigger a
+            commit when trades are recorded.
+        sync (bool): whether commits sync the journal to disk.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        path: Path,
+        group_size: int = 1024,
+        interval: float = 0.01,
+        sync: bool = True,
+    ):
+        self.path = path
+        self.__group_size = group_size
+        self.__interval = interval
+        self.__sync = sync
+        truncate_torn_tail(path)
+        self.__file = open(path, "ab")  # pylint: disable=consider-using-with
+        self.__latest = latest_timestamp(path)
+        # pylint: disable-next=consider-using-with
+        self.__index = open(seek_index_path(path), "ab")
+        self.__buffer = bytearray()
+        self.__pending = 0
+        self.__last_commit = time.monotonic()
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def __enter__(self) -> "Journal":
+        """Enter the journal context.
+
+        Returns:
+            Journal: the journal itself.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the journal when leaving its context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        self.close()
+
+    def __call__(
+        self,
+        stock: Any,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Append recorded trades to the journal.
+
+        Args:
+            stock (Any): stock that has traded.
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Sequence[float]): timestamp of every trade.
+        """
+        # pylint: disable=too-many-arguments
+        if getattr(self.__local, "suspended", False):
+            return
+
+        name = encode_name(stock.name)
+        records = b"".join(
+            RECORD.pack(
+                timestamp, name, TRADE_TYPE_CODES[trade_type], quantity, price
+            )
+            for trade_type, quantity, price, timestamp in zip(
+                trade_types, quantities, prices, timestamps
+            )
+        )
+
+        with self.__lock:
+            self.__buffer += records
+            self.__pending += len(quantities)
+            self.__latest = max([self.__latest, *timestamps])
+
+            if (
+                self.__pending >= self.__group_size
+                or time.monotonic() - self.__last_commit >= self.__interval
+            ):
+                self.__commit()
+
+    @property
+    def pending(self) -> int:
+        """Get number of records waiting to be committed.
+
+        Returns:
+            int: number of pending records.
+        """
+        return self.__pending
+
+    def commit(self) -> None:
+        """Write and sync the pending records."""
+        with self.__lock:
+            self.__commit()
+
+    def __commit(self) -> None:
+        """Write and sync the pending records while holding the lock."""
+        if self.__buffer:
+            self.__file.write(self.__buffer)
+            self.__file.flush()
+            if self.__sync:
+                os.fsync(self.__file.fileno())
+            # Written after the records, so it never covers lost ones.
+            self.__index.write(
+                SEEK_ENTRY.pack(self.__latest, self.__file.tell())
+            )
+            self.__index.flush()
+            self.__buffer.clear()
+            self.__pending = 0
+        self.__last_commit = time.monotonic()
+
+    def close(self) -> None:
+        """Commit the pending records and close the journal."""
+        if not self.__file.closed:
+            self.commit()
+            self.__file.close()
+            self.__index.close()
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Stop journaling the trades recorded by the calling thread.
+
+        Trades recorded by other threads meanwhile are still journaled, so
+        trades can be recovered while the market is open.
+
+        Yields:
+            None: nothing.
+        """
+        self.__local.suspended = True
+        try:
+            yield
+        finally:
+            self.__local.suspended = False
+
+
+def seek_index_path(path: Path) -> str:
+    """Get the path of the seek index of a journal.
+
+    Args:
+        path (Path): journal path.
+
+    Returns:
+        str: seek index path.
+    """
+    return f"{os.fspath(path)}.idx"
+
+
+def truncate_torn_tail(path: Path) -> None:
+    """Truncate the records and seek index entries partly written to a journal.
+
+    Seek index entries covering records past the truncated journal are
+    truncated too.
+
+    Args:
+        path (Path): journal path. Nothing is done if it doesn't exist.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+
+    size -= size % RECORD.size
+    os.truncate(path, size)
+    entries = read_seek_index(path)
+    kept = sum(1 for _, offset in entries if offset <= size)
+    with open(seek_index_path(path), "ab") as index:
+        index.truncate(kept * SEEK_ENTRY.size)
+
+
+def read_seek_index(path: Path) -> list[tuple[float, int]]:
+    """Read the seek index of a journal.
+
+    A partly written last entry is ignored.
+
+    Args:
+        path (Path): journal path.
+
+    Returns:
+        list[tuple[float, int]]: latest timestamp journaled and journal
+            size after every commit. Empty if there isn't a seek index.
+    """
+    try:
+        with open(seek_index_path(path), "rb") as index:
+            data = index.read()
+    except FileNotFoundError:
+        return []
+
+    end = len(data) - len(data) % SEEK_ENTRY.size
+    return list(SEEK_ENTRY.iter_unpack(data[:end]))
+
+
+def latest_timestamp(path: Path) -> float:
+    """Find the latest timestamp journaled, e.g. to append to a journal.
+
+    Only the records the seek index doesn't cover yet are read.
+
+    Args:
+        path (Path): journal path.
+
+    Returns:
+        float: latest timestamp, or -inf if nothing has been journaled.
+    """
+    entries = read_seek_index(path)
+    latest, offset = entries[-1] if entries else (-math.inf, 0)
+    for batch in read_records(path, offset):
+        latest = max(latest, *batch.timestamps)
+    return latest
+
+
+def read_journal(
+    path: Path, since: float = -math.inf, batch_size: int = 65536
+) -> Iterator[JournalBatch]:
+    """Read the tail of a journal by memory-mapping it.
+
+    The journal prefix whose latest timestamp is older than the given one
+    is found by binary search on the seek index and skipped, and only the
+    records of the rest done at or after the timestamp are given, so
+    backfilled trades never hide the recent ones. A partly written last
+    record is ignored.
+
+    Args:
+        path (Path): journal path.
+        since (float): timestamp of the oldest trade to read.
+        batch_size (int): number of records decoded at a time.
+
+    Yields:
+        JournalBatch: journaled trades.
+    """
+    entries = read_seek_index(path)
+    position = bisect_left([latest for latest, _ in entries], since)
+    offset = entries[position - 1][1] if position else 0
+
+    for batch in read_records(path, offset, batch_size):
+        if min(batch.timestamps) >= since:
+            yield batch
+            continue
+
+        rows = [
+            row
+            for row, timestamp in enumerate(batch.timestamps)
+            if timestamp >= since
+        ]
+        if rows:
+            yield JournalBatch._make(
+                [column[row] for row in rows] for column in batch
+            )
+
+
+def read_records(
+    path: Path, offset: int = 0, batch_size: int = 65536
+) -> Iterator[JournalBatch]:
+    """Read the records of a journal from an offset by memory-mapping it.
+
+    Args:
+        path (Path): journal path.
+        offset (int): offset of the first record to read.
+        batch_size (int): number of records decoded at a time.
+
+    Yields:
+        JournalBatch: journaled trades.
+    """
+    with open(path, "rb") as journal:
+        end = os.fstat(journal.fileno()).st_size
+        end -= end % RECORD.size
+        if offset >= end:
+            return
+
+        with mmap.mmap(journal.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            names: dict[bytes, str] = {}
+            step = batch_size * RECORD.size
+            for start in range(offset, end, step):
+                yield unpack_batch(
+                    data[slice(start, min(start + step, end))], names
+                )
+
+
+def unpack_batch(data: bytes, names: dict[bytes, str]) -> JournalBatch:
+    """Unpack consecutive binary records into parallel columns.
+
+    Args:
+        data (bytes): packed records.
+        names (dict[bytes, str]): stock names decoded so far by raw name.
+            Names that aren't in it yet are added.
+
+    Returns:
+        JournalBatch: unpacked trades.
+    """
+    timestamps, raw_names, codes, quantities, prices = zip(
+        *RECORD.iter_unpack(data)
+    )
+    for raw in set(raw_names).difference(names):
+        names[raw] = raw.rstrip(b"\0").decode()
+    return JournalBatch(
+        [names[raw] for raw in raw_names],
+        [TRADE_TYPES[code] for code in codes],
+        list(quantities),
+        list(prices),
+        list(timestamps),
+    )
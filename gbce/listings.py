@@ -0,0 +1,61 @@
+"""Stock listings module."""
+
+
+import csv
+from typing import Iterator, Optional
+
+from .models.stock import StockType
+from .tape import Path
+
+# Name, stock type, last dividend, fixed dividend and par value.
+Listing = tuple[str, StockType, float, Optional[float], float]
+
+
+def parse_fixed_dividend(value: str) -> Optional[float]:
+    """Parse a fixed dividend, e.g. "2" or "2%".
+
+    Args:
+        value (str): fixed dividend. Blank for stocks without one.
+
+    Returns:
+        float: fixed dividend as a percentage of the par value.
+        None: if the stock doesn't have a fixed dividend.
+    """
+    value = value.strip().rstrip("%")
+    return float(value) if value else None
+
+
+def read_listings(path: Path) -> Iterator[Listing]:
+    """Stream the stock listings of a CSV file.
+
+    Every row holds the name, type, last dividend, fixed dividend and par
+    value of a stock, like the GBCE sample data. A first row whose last
+    dividend isn't a number is taken as a header and skipped.
+
+    Args:
+        path (Path): listings path.
+
+    Yields:
+        Listing: name, stock type, last dividend, fixed dividend and par
+            value of a stock.
+
+    Raises:
+        ValueError: if a row other than the first one is invalid.
+    """
+    with open(path, newline="", encoding="utf-8") as listings:
+        rows = csv.reader(listings)
+        for number, (name, stock_type, last, fixed, par) in enumerate(rows):
+            try:
+                last_dividend = float(last)
+            except ValueError:
+                if number:
+                    raise
+                continue
+
+            yield (
+                name.strip(),
+                StockType(stock_type.strip().capitalize()),
+                last_dividend,
+                parse_fixed_dividend(fixed),
+                float(par),
+            )
@@ -0,0 +1,315 @@
+"""Synthetic load test module.
+
+Drives an exchange with trades arriving as a Poisson process across a
+universe of stocks whose activity follows a Zipf distribution, with volume
+weighted stock price and all share index queries interleaved, and reports
+the throughput and latency percentiles of every operation::
+
+    python -m gbce.loadtest --rate 20000 --duration 10 --listings 1000
+"""
+
+
+import argparse
+import itertools
+import logging
+import random
+import sys
+import time
+from array import array
+from typing import Callable, NamedTuple, Optional, Sequence
+
+from . import Gbce
+from .models.stock import StockType
+from .models.trade import TradeType
+
+RECORD_TRADE = "record_trade"
+VWSP = "calculate_volume_weighted_stock_price"
+ALL_SHARE_INDEX = "calculate_all_share_index"
+OPERATIONS = (RECORD_TRADE, VWSP, ALL_SHARE_INDEX)
+
+
+class LatencyStats(NamedTuple):
+    """Latency statistics class.
+
+    Latencies are in seconds.
+    """
+
+    samples: int
+    p50: float
+    p99: float
+    p999: float
+    maximum: float
+
+
+class LoadReport(NamedTuple):
+    """Load test report class."""
+
+    operations: int
+    elapsed: float
+    lag: float
+    latencies: dict[str, LatencyStats]
+
+    @property
+    def throughput(self) -> float:
+        """Get the operations run per second.
+
+        Returns:
+            float: operations per second.
+        """
+        return self.operations / self.elapsed
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Get a percentile of sorted values by the nearest rank.
+
+    Args:
+        values (Sequence[float]): sorted values.
+        fraction (float): percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: percentile value, 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+
+    rank = max(0, min(len(values) - 1, int(fraction * len(values) + 0.5) - 1))
+    return values[rank]
+
+
+def latency_stats(latencies: Sequence[float]) -> LatencyStats:
+    """Summarize latencies.
+
+    Args:
+        latencies (Sequence[float]): latencies in seconds.
+
+    Returns:
+        LatencyStats: latency statistics.
+    """
+    values = sorted(latencies)
+    return LatencyStats(
+        len(values),
+        percentile(values, 0.5),
+        percentile(values, 0.99),
+        percentile(values, 0.999),
+        values[-1] if values else 0.0,
+    )
+
+
+def add_listings(
+    gbce: Gbce, listings: int, seed: Optional[int] = None
+) -> dict[str, float]:
+    """List a universe of stocks like the sample ones, scaled up.
+
+    One in five stocks is preferred, as in the sample stocks, and every
+    stock gets a random price it trades around.
+
+    Args:
+        gbce (Gbce): exchange to list the stocks on.
+        listings (int): number of stocks.
+        seed (Optional[int]): random seed. None seeds from the system.
+
+    Returns:
+        dict[str, float]: price every stock trades around, by name.
+    """
+    rng = random.Random(seed)
+    prices = {}
+    for listing in range(listings):
+        name = f"S{listing:05d}"
+        if listing % 5 == 4:
+            gbce.add_stock(
+                name,
+                StockType.PREFERRED,
+                rng.randint(0, 25),
+                rng.randint(1, 5),
+                100,
+            )
+        else:
+            gbce.add_stock(
+                name,
+                StockType.COMMON,
+                rng.randint(0, 25),
+                None,
+                rng.choice([60, 100, 250]),
+            )
+        prices[name] = rng.uniform(1, 200)
+    return prices
+
+
+class LoadGenerator:
+    """Synthetic load generator class.
+
+    Operations arrive at exponentially distributed intervals, so they form
+    a Poisson process at the target rate, and are run on arrival. The
+    stock of every operation is drawn from a Zipf distribution, so a few
+    stocks take most of the load. The latency of an operation is measured
+    from its scheduled arrival to its end, so when the exchange can't keep
+    up with the rate, the time operations wait behind the previous ones
+    counts too instead of being hidden by a generator that has fallen
+    behind. The most the generator has fallen behind is reported as lag,
+    and the arrivals still due at the end of the run are dropped.
+
+    Args:
+        gbce (Gbce): exchange to drive.
+        prices (dict[str, float]): price every stock trades around, by
+            name. Stocks are ranked by their order.
+        rate (float): target operations per second.
+        zipf (float): Zipf exponent of the stock activity.
+        query_ratio (float): fraction of operations that are queries,
+            split evenly between volume weighted stock prices and the all
+            share index. The rest are trades.
+        seed (Optional[int]): random seed. None seeds from the system.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self,
+        gbce: Gbce,
+        prices: dict[str, float],
+        rate: float,
+        zipf: float = 1.0,
+        query_ratio: float = 0.1,
+        seed: Optional[int] = None,
+    ):
+        # pylint: disable=too-many-arguments
+        self.__gbce = gbce
+        self.__prices = list(prices.values())
+        self.__stocks = [gbce.stocks[name] for name in prices]
+        self.__rate = rate
+        self.__query_ratio = query_ratio
+        self.__weights = list(
+            itertools.accumulate(
+                1 / rank**zipf for rank in range(1, len(prices) + 1)
+            )
+        )
+        self.__rng = random.Random(seed)
+
+    def __operation(self) -> tuple[str, Callable[[], object]]:
+        """Draw the next operation.
+
+        Returns:
+            tuple[str, Callable[[], object]]: operation name and call.
+        """
+        rng = self.__rng
+        draw = rng.random()
+        if draw < self.__query_ratio / 2:
+            return ALL_SHARE_INDEX, self.__gbce.calculate_all_share_index
+
+        index = rng.choices(
+            range(len(self.__stocks)), cum_weights=self.__weights
+        )[0]
+        stock = self.__stocks[index]
+        if draw < self.__query_ratio:
+            return VWSP, stock.calculate_volume_weighted_stock_price
+
+        trade_type = TradeType.BUY if rng.random() < 0.5 else TradeType.SELL
+        quantity = rng.randint(1, 100)
+        price = self.__prices[index] * rng.uniform(0.99, 1.01)
+        return RECORD_TRADE, lambda: stock.record_trade(
+            trade_type, quantity, price
+        )
+
+    def run(self, duration: float) -> LoadReport:
+        """Drive the exchange for a while.
+
+        Args:
+            duration (float): seconds operations arrive for.
+
+        Returns:
+            LoadReport: throughput and latencies.
+        """
+        latencies = {operation: array("d") for operation in OPERATIONS}
+        operations = 0
+        lag = 0.0
+        start = due = time.perf_counter()
+        end = start + duration
+        while True:
+            due += self.__rng.expovariate(self.__rate)
+            now = time.perf_counter()
+            if due >= end or now >= end:
+                break
+
+            if due > now:
+                time.sleep(due - now)
+            else:
+                lag = max(lag, now - due)
+
+            operation, call = self.__operation()
+            call()
+            latencies[operation].append(time.perf_counter() - due)
+            operations += 1
+
+        return LoadReport(
+            operations,
+            time.perf_counter() - start,
+            lag,
+            {
+                operation: latency_stats(values)
+                for operation, values in latencies.items()
+            },
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a load test and print its report.
+
+    Args:
+        argv (Optional[Sequence[str]]): command line arguments. None reads
+            them from sys.argv.
+
+    Returns:
+        int: exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m gbce.loadtest")
+    parser.add_argument(
+        "--rate", type=float, default=10000, help="operations per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="seconds to run for"
+    )
+    parser.add_argument(
+        "--listings", type=int, default=1000, help="number of stocks"
+    )
+    parser.add_argument(
+        "--zipf", type=float, default=1.0, help="Zipf exponent"
+    )
+    parser.add_argument(
+        "--query-ratio",
+        type=float,
+        default=0.1,
+        help="fraction of operations that are queries",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="keep trades in typed arrays",
+    )
+    parser.add_argument("--seed", type=int, help="random seed")
+    args = parser.parse_args(argv)
+
+    gbce = Gbce(logger_level=logging.WARNING, columnar=args.columnar)
+    prices = add_listings(gbce, args.listings, args.seed)
+    report = LoadGenerator(
+        gbce, prices, args.rate, args.zipf, args.query_ratio, args.seed
+    ).run(args.duration)
+
+    print(
+        f"{report.operations} operations in {report.elapsed:.2f}s: "
+        f"{report.throughput:.0f}/s (target {args.rate:.0f}/s), "
+        f"max lag {report.lag * 1e3:.1f}ms"
+    )
+    print(
+        f"{'operation':<38} {'samples':>8} {'p50 µs':>9} {'p99 µs':>9} "
+        f"{'p999 µs':>9} {'max µs':>9}"
+    )
+    for operation, stats in report.latencies.items():
+        print(
+            f"{operation:<38} {stats.samples:>8} {stats.p50 * 1e6:>9.1f} "
+            f"{stats.p99 * 1e6:>9.1f} {stats.p999 * 1e6:>9.1f} "
+            f"{stats.maximum * 1e6:>9.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
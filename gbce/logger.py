@@ -2,23 +2,249 @@
 
 
 import logging
+import threading
+import time
+from typing import Any, Optional
+
+
+class ThrottledRecord:
+    """Throttled log record class.
+
+    Args:
+        log (logging.Logger): logger the record goes to.
+        level (int): record level.
+        args (tuple): arguments of the latest occurrence.
+        start (float): monotonic time the interval started at.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self, log: logging.Logger, level: int, args: tuple, start: float
+    ):
+        self.log = log
+        self.level = level
+        self.args = args
+        self.start = start
+        self.suppressed = 0
+
+
+class LogThrottle:
+    """Log throttle class.
+
+    Logs the first record with a given key and message in every interval
+    and only counts the rest, so a misbehaving feed can't flood the logs.
+    The count is summarized in the next record logged after the interval,
+    or when the throttle is flushed, e.g. every interval from a timer once
+    started, so a feed that stops misbehaving still gets its summary.
+
+    Args:
+        interval (float): seconds between records with the same key and
+            message.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        self.__interval = interval
+        self.__records: dict[tuple[str, str], ThrottledRecord] = {}
+        self.__lock = threading.Lock()
+        self.__timer: Optional[threading.Timer] = None
+
+    @property
+    def interval(self) -> float:
+        """Get interval.
+
+        Returns:
+            float: seconds between records with the same key and message.
+        """
+        return self.__interval
+
+    def log(
+        self, log: logging.Logger, level: int, key: str, msg: str, *args: Any
+    ) -> bool:
+        """Log a record unless one like it was logged within the interval.
+
+        Args:
+            log (logging.Logger): logger.
+            level (int): record level.
+            key (str): what the record is about, e.g. a stock name.
+            msg (str): record message format.
+            args (Any): record message arguments.
+
+        Returns:
+            bool: whether the record was logged.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            record = self.__records.get((key, msg))
+            if record is not None and now - record.start < self.__interval:
+                record.suppressed += 1
+                record.args = args
+                return False
+
+            suppressed = record.suppressed if record is not None else 0
+            self.__records[key, msg] = ThrottledRecord(log, level, args, now)
+
+        if suppressed:
+            log.log(level, f"{msg} (%d more suppressed)", *args, suppressed)
+        else:
+            log.log(level, msg, *args)
+        return True
+
+    def flush(self) -> int:
+        """Summarize the records suppressed so far.
+
+        Returns:
+            int: number of summarized records.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            pending = [
+                (msg, record.log, record.level, record.args, record.suppressed)
+                for (_, msg), record in self.__records.items()
+                if record.suppressed
+            ]
+            for record in self.__records.values():
+                record.start = now
+                record.suppressed = 0
+
+        for msg, log, level, args, suppressed in pending:
+            log.log(level, f"{msg} (repeated %d times)", *args, suppressed)
+        return len(pending)
+
+    def start(self, period: Optional[float] = None) -> None:
+        """Flush every period from a timer.
+
+        Args:
+            period (Optional[float]): seconds between flushes. None means
+                the interval.
+        """
+        with self.__lock:
+            if self.__timer is None:
+                self.__schedule(
+                    period if period is not None else self.__interval
+                )
+
+    def close(self) -> None:
+        """Stop flushing from the timer, if started."""
+        with self.__lock:
+            timer, self.__timer = self.__timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def __schedule(self, period: float) -> None:
+        """Start a timer for the next flush.
+
+        The lock must be held.
+
+        Args:
+            period (float): seconds until the flush.
+        """
+        self.__timer = threading.Timer(period, self.__tick, (period,))
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __tick(self, period: float) -> None:
+        """Flush and schedule the next flush, unless closed meanwhile.
+
+        Args:
+            period (float): seconds between flushes.
+        """
+        self.flush()
+        with self.__lock:
+            if self.__timer is not None:
+                self.__schedule(period)
+
+
+# Logger of every class, so instances don't fetch it again.
+LOGGERS: dict[type, logging.Logger] = {}
+
+
+def class_logger(cls: type) -> logging.Logger:
+    """Get the logger of a class.
+
+    Args:
+        cls (type): class.
+
+    Returns:
+        logging.Logger: class logger.
+    """
+    log = LOGGERS.get(cls)
+    if log is None:
+        log = logging.getLogger(f"{cls.__module__}.{cls.__qualname__}")
+        LOGGERS[cls] = log
+    return log
 
 
 class LoggerMixin:
     """Logger Mixin class.
 
+    Loggers are fetched once per class and their level is only set when
+    given and it changes, since setting it clears the caches of every
+    logger, and so instances don't undo the level configured for their
+    class.
+
     Args:
-        level (int): logging level.
+        level (Optional[int]): logging level. None leaves the level of the
+            class logger as it is.
         args (tuple): arguments.
         kwargs (dict): keyword arguments.
     """
 
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, level: int, *args: tuple, **kwargs: dict):
-        name = f"{self.__module__}.{self.__class__.__qualname__}"
+    _log_throttle: Optional[LogThrottle] = None
 
-        self._log = logging.getLogger(name)
-        self._log.setLevel(level)
+    def __init__(
+        self, level: Optional[int] = None, *args: tuple, **kwargs: dict
+    ):
+        # pylint: disable=keyword-arg-before-vararg
+        self._log = class_logger(type(self))
+        if level is not None and self._log.level != level:
+            self._log.setLevel(level)
 
         super().__init__(*args, **kwargs)
+
+    @classmethod
+    def configure_logging(
+        cls, level: int, interval: Optional[float] = None
+    ) -> Optional[LogThrottle]:
+        """Configure the logging of a class and its subclasses.
+
+        Args:
+            level (int): logging level.
+            interval (Optional[float]): seconds between repeated hot path
+                records about the same object. None logs all of them.
+
+        Returns:
+            LogThrottle: throttle of the hot path records, to flush them or
+                start flushing them every interval.
+            None: if hot path records aren't throttled.
+        """
+        classes = [cls]
+        while classes:
+            klass = classes.pop()
+            class_logger(klass).setLevel(level)
+            classes.extend(klass.__subclasses__())
+
+        cls._log_throttle = (
+            LogThrottle(interval) if interval is not None else None
+        )
+        return cls._log_throttle
+
+    def _log_limited(self, level: int, key: str, msg: str, *args: Any) -> None:
+        """Log a hot path record, throttled if so configured.
+
+        Args:
+            level (int): record level.
+            key (str): what the record is about, e.g. a stock name.
+            msg (str): record message format.
+            args (Any): record message arguments.
+        """
+        if not self._log.isEnabledFor(level):
+            return
+
+        throttle = self._log_throttle
+        if throttle is None:
+            self._log.log(level, msg, *args)
+        else:
+            throttle.log(self._log, level, key, msg, *args)
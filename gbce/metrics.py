@@ -0,0 +1,380 @@
+"""Metrics module.
+
+Counts and times the hot paths of the exchange, and exports the metrics in
+the Prometheus text format, e.g. over HTTP for a local scraper.
+"""
+
+
+import math
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import accumulate
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (
+    1e-6,
+    2.5e-6,
+    5e-6,
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    0.1,
+    1.0,
+)
+
+# Upper bounds of the trade count histogram buckets.
+TRADE_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HistogramSnapshot(NamedTuple):
+    """Histogram snapshot class.
+
+    Counts are cumulative, as in Prometheus: every bucket counts the
+    observations up to its bound, and the last one, without a bound, counts
+    them all.
+    """
+
+    buckets: tuple[float, ...]
+    counts: tuple[int, ...]
+    sum: float
+
+    @property
+    def samples(self) -> int:
+        """Get number of observations.
+
+        Returns:
+            int: number of observations.
+        """
+        return self.counts[-1]
+
+
+class Histogram:
+    """Histogram class.
+
+    Every thread counts its observations in its own buckets, followed by
+    their sum, so observing takes no lock and threads don't contend. The
+    buckets of every thread are merged when a snapshot is taken.
+
+    Args:
+        buckets (Sequence[float]): sorted upper bounds of the buckets.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.__buckets = tuple(buckets)
+        self.__shards: list[list[float]] = []
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """Count an observation.
+
+        Args:
+            value (float): observed value.
+        """
+        try:
+            shard = self.__local.shard
+        except AttributeError:
+            shard = self.__local.shard = self.__add_shard()
+        shard[bisect_left(self.__buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Take a snapshot of the histogram.
+
+        Returns:
+            HistogramSnapshot: histogram snapshot.
+        """
+        with self.__lock:
+            shards = [shard[:] for shard in self.__shards]
+        merged = [sum(column) for column in zip(self.__new_shard(), *shards)]
+        counts = tuple(accumulate(merged[:-1]))
+        return HistogramSnapshot(self.__buckets, counts, merged[-1])
+
+    def __add_shard(self) -> list[float]:
+        """Add the buckets of the calling thread.
+
+        Returns:
+            list[float]: bucket counts followed by the sum of the values.
+        """
+        shard = self.__new_shard()
+        with self.__lock:
+            self.__shards.append(shard)
+        return shard
+
+    def __new_shard(self) -> list[float]:
+        """Get empty buckets.
+
+        Returns:
+            list[float]: zero counts followed by a zero sum.
+        """
+        return [0] * (len(self.__buckets) + 1) + [0.0]
+
+
+class StockMetrics(NamedTuple):
+    """Stock metrics class."""
+
+    trades_accepted: int
+    trades_rejected: int
+    trades: int
+    memory_bytes: int
+
+
+class ExchangeMetrics(NamedTuple):
+    """Exchange metrics class."""
+
+    record_trade_seconds: HistogramSnapshot
+    vwsp_seconds: HistogramSnapshot
+    vwsp_trades: HistogramSnapshot
+    all_share_index_seconds: HistogramSnapshot
+    stocks: dict[str, StockMetrics]
+
+
+class Metrics:
+    """Hot path metrics class.
+
+    Holds the histograms shared by the stocks of an exchange, so their
+    number doesn't grow with the number of stocks. Stocks count their own
+    trades.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self) -> None:
+        self.record_trade = Histogram(LATENCY_BUCKETS)
+        self.vwsp = Histogram(LATENCY_BUCKETS)
+        self.vwsp_trades = Histogram(TRADE_BUCKETS)
+        self.all_share_index = Histogram(LATENCY_BUCKETS)
+
+    def snapshot(self, stocks: dict[str, StockMetrics]) -> ExchangeMetrics:
+        """Take a snapshot of the metrics.
+
+        Args:
+            stocks (dict[str, StockMetrics]): metrics of every stock.
+
+        Returns:
+            ExchangeMetrics: metrics snapshot.
+        """
+        return ExchangeMetrics(
+            self.record_trade.snapshot(),
+            self.vwsp.snapshot(),
+            self.vwsp_trades.snapshot(),
+            self.all_share_index.snapshot(),
+            stocks,
+        )
+
+
+def escape(value: str) -> str:
+    """Escape a Prometheus label value.
+
+    Args:
+        value (str): label value.
+
+    Returns:
+        str: escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def number(value: float) -> str:
+    """Format a Prometheus sample value.
+
+    Args:
+        value (float): sample value.
+
+    Returns:
+        str: formatted value.
+    """
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def histogram_lines(
+    name: str, help_text: str, histogram: HistogramSnapshot
+) -> list[str]:
+    """Format a histogram in the Prometheus text format.
+
+    Args:
+        name (str): metric name.
+        help_text (str): metric description.
+        histogram (HistogramSnapshot): histogram snapshot.
+
+    Returns:
+        list[str]: exposition lines.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+        lines.append(f'{name}_bucket{{le="{number(float(bound))}"}} {count}')
+    lines.append(f"{name}_sum {number(histogram.sum)}")
+    lines.append(f"{name}_count {histogram.samples}")
+    return lines
+
+
+STOCK_SERIES = (
+    (
+        "gbce_trades_accepted_total",
+        "counter",
+        "Trades recorded.",
+        "trades_accepted",
+    ),
+    (
+        "gbce_trades_rejected_total",
+        "counter",
+        "Trades rejected.",
+        "trades_rejected",
+    ),
+    ("gbce_stock_trades", "gauge", "Trades held by the stock.", "trades"),
+    (
+        "gbce_stock_memory_bytes",
+        "gauge",
+        "Estimated memory taken by the trades of the stock.",
+        "memory_bytes",
+    ),
+)
+
+
+def prometheus_text(metrics: ExchangeMetrics) -> str:
+    """Format exchange metrics in the Prometheus text format.
+
+    Args:
+        metrics (ExchangeMetrics): metrics snapshot.
+
+    Returns:
+        str: exposition text.
+    """
+    lines = [
+        *histogram_lines(
+            "gbce_record_trade_seconds",
+            "Time taken to record a trade.",
+            metrics.record_trade_seconds,
+        ),
+        *histogram_lines(
+            "gbce_vwsp_seconds",
+            "Time taken to calculate a volume weighted stock price.",
+            metrics.vwsp_seconds,
+        ),
+        *histogram_lines(
+            "gbce_vwsp_trades",
+            "Recent trades covered by a volume weighted stock price.",
+            metrics.vwsp_trades,
+        ),
+        *histogram_lines(
+            "gbce_all_share_index_seconds",
+            "Time taken to calculate the all share index.",
+            metrics.all_share_index_seconds,
+        ),
+    ]
+    for name, kind, help_text, field in STOCK_SERIES:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stock, stock_metrics in metrics.stocks.items():
+            value = getattr(stock_metrics, field)
+            lines.append(f'{name}{{stock="{escape(stock)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Prometheus scrape request handler class."""
+
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Answer a scrape with the current metrics."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = prometheus_text(self.server.snapshot()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Leave scrapes out of the logs.
+
+        Args:
+            args (Any): log message format and arguments.
+        """
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Prometheus metrics server class.
+
+    Serves the metrics at /metrics from a background thread.
+
+    Args:
+        snapshot (Callable[[], ExchangeMetrics]): callable that takes a
+            metrics snapshot, e.g. Gbce.metrics.
+        host (str): address to listen on.
+        port (int): port to listen on. 0 picks a free one.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        snapshot: Callable[[], ExchangeMetrics],
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__((host, port), MetricsHandler)
+        self.snapshot = snapshot
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "MetricsServer":
+        """Start serving.
+
+        Returns:
+            MetricsServer: the server.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop serving.
+
+        Args:
+            args (Any): exception type, value and traceback, if any.
+        """
+        self.close()
+
+    @property
+    def url(self) -> str:
+        """Get the URL the metrics are served at.
+
+        Returns:
+            str: metrics URL.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/metrics"
+
+    def start(self) -> None:
+        """Start serving from a background thread."""
+        if self.__thread is None:
+            self.__thread = threading.Thread(
+                target=self.serve_forever, name="gbce-metrics", daemon=True
+            )
+            self.__thread.start()
+
+    def close(self) -> None:
+        """Stop serving and close the socket."""
+        if self.__thread is not None:
+            self.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.server_close()
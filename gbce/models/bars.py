@@ -0,0 +1,323 @@
+"""Bars module."""
+
+
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from .trade import TradeType
+
+COLUMNS = (
+    "starts",
+    "opens",
+    "highs",
+    "lows",
+    "closes",
+    "volumes",
+    "price_x_qty",
+    "buy_volumes",
+    "sell_volumes",
+)
+
+
+class Bar(NamedTuple):
+    """Open, high, low, close and volume bar class."""
+
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    vwap: float
+    buy_volume: float = 0.0
+    sell_volume: float = 0.0
+
+
+class BarSeries(Sequence[Bar]):
+    """Series of bars of a fixed interval kept in typed arrays.
+
+    Volume is also split into buy and sell volume for the trades whose type
+    is known. The last bar is the current one and the rest are completed.
+
+    The columns are preallocated, so only their first len(series) items are
+    bars. They never resize in place: they are copied into larger arrays
+    when full, so views of them can be held while bars are added.
+
+    Args:
+        interval (float): seconds every bar spans.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, interval: float, capacity: int = 16):
+        self.interval = interval
+        self.__count = 0
+        self.starts = array("d", bytes(8 * capacity))
+        self.opens = array("d", bytes(8 * capacity))
+        self.highs = array("d", bytes(8 * capacity))
+        self.lows = array("d", bytes(8 * capacity))
+        self.closes = array("d", bytes(8 * capacity))
+        self.volumes = array("d", bytes(8 * capacity))
+        self.price_x_qty = array("d", bytes(8 * capacity))
+        self.buy_volumes = array("d", bytes(8 * capacity))
+        self.sell_volumes = array("d", bytes(8 * capacity))
+
+    def __len__(self) -> int:
+        """Get number of bars.
+
+        Returns:
+            int: number of bars.
+        """
+        return self.__count
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get a bar or a list of them.
+
+        Args:
+            index (Any): bar position or slice.
+
+        Returns:
+            Bar: bar at the given position.
+            list[Bar]: bars in the given slice.
+        """
+        if isinstance(index, slice):
+            return [self.__bar(i) for i in range(len(self))[index]]
+
+        return self.__bar(range(len(self))[index])
+
+    def __bar(self, index: int) -> Bar:
+        """Build the bar at a given position.
+
+        Args:
+            index (int): bar position.
+
+        Returns:
+            Bar: bar at the given position.
+        """
+        volume = self.volumes[index]
+        return Bar(
+            self.starts[index],
+            self.opens[index],
+            self.highs[index],
+            self.lows[index],
+            self.closes[index],
+            volume,
+            self.price_x_qty[index] / volume if volume else 0,
+            self.buy_volumes[index],
+            self.sell_volumes[index],
+        )
+
+    @contextmanager
+    def view(self, completed: bool = True) -> Iterator[dict[str, memoryview]]:
+        """Get zero-copy read-only views of the bar columns.
+
+        Trades keep adding to the series while the views are held, e.g.
+        from the trade listeners. The views span the bars of the moment
+        they are taken, and show the late trades added to those bars until
+        the columns are full and copied. They are only valid inside the
+        with block and are released when it ends.
+
+        Args:
+            completed (bool): whether to leave out the current bar.
+
+        Yields:
+            dict[str, memoryview]: view of every column by column name.
+        """
+        count = max(len(self) - 1, 0) if completed else len(self)
+        exports = [memoryview(getattr(self, name)) for name in COLUMNS]
+        sliced = [export[:count] for export in exports]
+        views = {
+            name: view.toreadonly() for name, view in zip(COLUMNS, sliced)
+        }
+        try:
+            yield views
+        finally:
+            for view in (*views.values(), *sliced, *exports):
+                view.release()
+
+    def add(
+        self,
+        timestamp: float,
+        price: float,
+        quantity: float,
+        trade_type: Optional[TradeType] = None,
+    ) -> None:
+        """Add a trade to its bar.
+
+        Trades are expected in timestamp order. A late trade that falls into
+        an existing bar updates its high, low and volume but not its open
+        and close.
+
+        Args:
+            timestamp (float): timestamp of the trade.
+            price (float): trade price.
+            quantity (float): trade quantity.
+            trade_type (Optional[TradeType]): trade type, if known.
+        """
+        start = timestamp - timestamp % self.interval
+        starts = self.starts
+        count = self.__count
+        sides = (
+            quantity if trade_type == TradeType.BUY else 0.0,
+            quantity if trade_type == TradeType.SELL else 0.0,
+        )
+
+        if count and start == starts[count - 1]:
+            self.__update(count - 1, price, quantity, sides)
+            self.closes[count - 1] = price
+        elif not count or start > starts[count - 1]:
+            self.__insert(count, start, price, quantity, sides)
+        else:
+            index = bisect_left(starts, start, 0, count)
+            if starts[index] == start:
+                self.__update(index, price, quantity, sides)
+            else:
+                self.__insert(index, start, price, quantity, sides)
+
+    def extend(
+        self,
+        timestamps: Sequence[float],
+        prices: Sequence[float],
+        quantities: Sequence[float],
+        trade_types: Optional[Sequence[TradeType]] = None,
+    ) -> None:
+        """Add several trades to their bars.
+
+        Args:
+            timestamps (Sequence[float]): timestamp of every trade.
+            prices (Sequence[float]): price of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            trade_types (Optional[Sequence[TradeType]]): trade type of every
+                trade, if known.
+        """
+        types: Iterable[Optional[TradeType]] = (
+            trade_types if trade_types is not None else [None] * len(prices)
+        )
+        for timestamp, price, quantity, trade_type in zip(
+            timestamps, prices, quantities, types
+        ):
+            self.add(timestamp, price, quantity, trade_type)
+
+    def __update(
+        self,
+        index: int,
+        price: float,
+        quantity: float,
+        sides: tuple[float, float],
+    ) -> None:
+        """Update a bar with a trade.
+
+        Args:
+            index (int): bar position.
+            price (float): trade price.
+            quantity (float): trade quantity.
+            sides (tuple[float, float]): bought and sold quantity.
+        """
+        if price > self.highs[index]:
+            self.highs[index] = price
+        if price < self.lows[index]:
+            self.lows[index] = price
+        self.volumes[index] += quantity
+        self.price_x_qty[index] += price * quantity
+        self.buy_volumes[index] += sides[0]
+        self.sell_volumes[index] += sides[1]
+
+    def __insert(
+        self,
+        index: int,
+        start: float,
+        price: float,
+        quantity: float,
+        sides: tuple[float, float],
+    ) -> None:
+        """Insert a bar opened by a trade.
+
+        Args:
+            index (int): bar position.
+            start (float): bar start.
+            price (float): trade price.
+            quantity (float): trade quantity.
+            sides (tuple[float, float]): bought and sold quantity.
+        """
+        # pylint: disable=too-many-arguments
+        count = self.__count
+        if count == len(self.starts):
+            self.__grow()
+
+        later = slice(index + 1, count + 1)
+        values = (start, *[price] * 4, quantity, price * quantity, *sides)
+        for name, value in zip(COLUMNS, values):
+            column = getattr(self, name)
+            if index < count:
+                column[later] = column[index:count]
+            column[index] = value
+        self.__count = count + 1
+
+    def __grow(self) -> None:
+        """Copy the columns into arrays twice as large."""
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = array("d", bytes(16 * len(column) or 8))
+            grown[: len(column)] = column
+            setattr(self, name, grown)
+
+
+class BarAggregator:
+    """Bar aggregator class.
+
+    Trade listener that keeps the bars of a stock up to date at several
+    resolutions as trades are recorded.
+
+    Args:
+        resolutions (Iterable[float]): seconds every bar spans, per series.
+    """
+
+    series: dict[float, BarSeries]
+
+    def __init__(self, resolutions: Iterable[float]):
+        self.series = {}
+        self.add_resolutions(resolutions)
+
+    def __getitem__(self, resolution: float) -> BarSeries:
+        """Get the bars of a resolution.
+
+        Args:
+            resolution (float): seconds every bar spans.
+
+        Returns:
+            BarSeries: bars of the resolution.
+        """
+        return self.series[resolution]
+
+    def __call__(
+        self,
+        stock: Any,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Add recorded trades to the bars of every resolution.
+
+        Args:
+            stock (Any): stock that has traded.
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Sequence[float]): timestamp of every trade.
+        """
+        # pylint: disable=too-many-arguments
+        for series in self.series.values():
+            series.extend(timestamps, prices, quantities, trade_types)
+
+    def add_resolutions(self, resolutions: Iterable[float]) -> None:
+        """Start aggregating bars at more resolutions.
+
+        Args:
+            resolutions (Iterable[float]): seconds every bar spans, per
+                series.
+        """
+        for resolution in resolutions:
+            self.series.setdefault(resolution, BarSeries(resolution))
@@ -0,0 +1,180 @@
+"""Prefix sum index module."""
+
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
+from operator import le, mul, sub
+from typing import Optional, Sequence
+
+
+class PrefixIndex:
+    """Time-sorted index of trades with cumulative sums.
+
+    Keeps the trade timestamps sorted together with the cumulative price x
+    quantity and quantity sums, so the sums over any time range take two
+    binary searches.
+    """
+
+    def __init__(self) -> None:
+        self.timestamps = array("d")
+        self.price_x_qty = array("d", [0.0])
+        self.quantity = array("d", [0.0])
+
+    def __len__(self) -> int:
+        """Get number of indexed trades.
+
+        Returns:
+            int: number of indexed trades.
+        """
+        return len(self.timestamps)
+
+    def memory_bytes(self) -> int:
+        """Get the memory taken by the index.
+
+        Returns:
+            int: size in bytes.
+        """
+        return (
+            sys.getsizeof(self.timestamps)
+            + sys.getsizeof(self.price_x_qty)
+            + sys.getsizeof(self.quantity)
+        )
+
+    def add(self, timestamp: float, price: float, quantity: float) -> int:
+        """Index a trade.
+
+        Args:
+            timestamp (float): timestamp of the trade.
+            price (float): trade price.
+            quantity (float): trade quantity.
+
+        Returns:
+            int: position of the trade in the index.
+        """
+        timestamps = self.timestamps
+
+        if not timestamps or timestamp >= timestamps[-1]:
+            timestamps.append(timestamp)
+            self.price_x_qty.append(self.price_x_qty[-1] + price * quantity)
+            self.quantity.append(self.quantity[-1] + quantity)
+            return len(timestamps) - 1
+
+        # Every later cumulative sum moves one position and grows by the
+        # trade values.
+        index = bisect_right(timestamps, timestamp)
+        timestamps.insert(index, timestamp)
+        later = slice(index + 1, None)
+        self.price_x_qty[later] = array(
+            "d", map(float(price * quantity).__add__, self.price_x_qty[index:])
+        )
+        self.quantity[later] = array(
+            "d", map(float(quantity).__add__, self.quantity[index:])
+        )
+        return index
+
+    def extend(
+        self,
+        timestamps: Sequence[float],
+        prices: Sequence[float],
+        quantities: Sequence[float],
+    ) -> tuple[int, Optional[list[int]]]:
+        """Index several trades at once.
+
+        Trades that continue the timestamp order are appended. Otherwise
+        they are sorted and merged with the indexed trades newer than the
+        oldest of them, and the cumulative sums from there are rebuilt in
+        one pass. Trades with the same timestamp keep their recording
+        order.
+
+        Args:
+            timestamps (Sequence[float]): timestamp of every trade.
+            prices (Sequence[float]): price of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+
+        Returns:
+            tuple[int, Optional[list[int]]]: position of the first merged
+                trade, and the positions the merged trades come from, as
+                positions in the indexed trades from there followed by the
+                given trades. None if the trades were appended.
+        """
+        start = len(self.timestamps)
+        if not timestamps or (
+            (not self.timestamps or timestamps[0] >= self.timestamps[-1])
+            and all(map(le, timestamps, timestamps[1:]))
+        ):
+            self.timestamps.extend(timestamps)
+            self.price_x_qty.extend(
+                islice(
+                    accumulate(
+                        map(mul, prices, quantities),
+                        initial=self.price_x_qty[-1],
+                    ),
+                    1,
+                    None,
+                )
+            )
+            self.quantity.extend(
+                islice(
+                    accumulate(quantities, initial=self.quantity[-1]), 1, None
+                )
+            )
+            return start, None
+
+        start = bisect_right(self.timestamps, min(timestamps))
+        merged = self.timestamps[start:] + array("d", timestamps)
+        order = sorted(range(len(merged)), key=merged.__getitem__)
+        self.timestamps[start:] = array("d", map(merged.__getitem__, order))
+
+        later = slice(start + 1, None)
+        for sums, values in (
+            (self.price_x_qty, list(map(mul, prices, quantities))),
+            (self.quantity, list(quantities)),
+        ):
+            values[:0] = map(sub, sums[later], sums[start:-1])
+            sums[later] = array(
+                "d",
+                islice(
+                    accumulate(
+                        map(values.__getitem__, order), initial=sums[start]
+                    ),
+                    1,
+                    None,
+                ),
+            )
+        return start, order
+
+    def drop(self, count: int) -> None:
+        """Drop the oldest trades from the index.
+
+        The cumulative sums of the remaining trades stay valid, since sums
+        are always taken as differences.
+
+        Args:
+            count (int): number of trades to drop.
+        """
+        del self.timestamps[:count]
+        del self.price_x_qty[:count]
+        del self.quantity[:count]
+
+    def sums(
+        self, start: float, end: float, include_end: bool = False
+    ) -> tuple[float, float]:
+        """Get the sums of the trades done in a time range.
+
+        Args:
+            start (float): range start, included.
+            end (float): range end, excluded unless include_end is set.
+            include_end (bool): whether the range end is included.
+
+        Returns:
+            tuple[float, float]: price x quantity and quantity sums.
+        """
+        search = bisect_right if include_end else bisect_left
+        low = bisect_left(self.timestamps, start)
+        high = max(low, search(self.timestamps, end))
+        return (
+            self.price_x_qty[high] - self.price_x_qty[low],
+            self.quantity[high] - self.quantity[low],
+        )
@@ -0,0 +1,107 @@
+"""Trade retention module."""
+
+
+import math
+from bisect import bisect_left
+from typing import Optional, Sequence
+
+
+class Retention:
+    """Trade retention policy class.
+
+    Limits the raw trades a stock keeps by age and/or count. Older trades
+    are rolled up into bars. Compaction only runs once the limits are
+    exceeded by the slack, so its cost is spread over many trades.
+
+    Args:
+        max_age (Optional[float]): seconds raw trades are kept for.
+        max_count (Optional[int]): number of raw trades kept.
+        bar_interval (float): seconds every roll-up bar spans.
+        slack (float): fraction the limits can be exceeded by before
+            compacting.
+
+    Raises:
+        ValueError: if there is neither an age nor a count limit.
+    """
+
+    def __init__(
+        self,
+        max_age: Optional[float] = None,
+        max_count: Optional[int] = None,
+        bar_interval: float = 60.0,
+        slack: float = 0.1,
+    ):
+        if max_age is None and max_count is None:
+            raise ValueError("Retention needs an age or a count limit.")
+
+        self.max_age = max_age
+        self.max_count = max_count
+        self.bar_interval = bar_interval
+        self.slack = slack
+
+    def __repr__(self) -> str:
+        """Get representation of a Retention object.
+
+        Returns:
+            str: representation of a Retention object.
+        """
+        return (
+            f"<{self.__class__.__qualname__} max_age={self.max_age} "
+            f"max_count={self.max_count}>"
+        )
+
+    def due(
+        self,
+        timestamps: Sequence[float],
+        now: float,
+        keep_after: float = math.inf,
+    ) -> bool:
+        """Check whether the trades need compacting.
+
+        Only the trades that compacting would remove count, so trades
+        that are kept anyway don't trigger compactions that do nothing.
+
+        Args:
+            timestamps (Sequence[float]): sorted timestamps of the kept
+                trades.
+            now (float): current timestamp.
+            keep_after (float): timestamp of the oldest trade that is
+                always kept, e.g. the oldest recent one.
+
+        Returns:
+            bool: whether a limit is exceeded by more than the slack.
+        """
+        if not timestamps:
+            return False
+
+        if self.max_count is not None and len(timestamps) > self.max_count:
+            cutoff = min(
+                timestamps[len(timestamps) - self.max_count], keep_after
+            )
+            if bisect_left(timestamps, cutoff) > self.max_count * self.slack:
+                return True
+
+        return self.max_age is not None and timestamps[0] < min(
+            now - self.max_age * (1 + self.slack), keep_after
+        )
+
+    def cutoff(self, timestamps: Sequence[float], now: float) -> float:
+        """Get the timestamp before which trades are compacted.
+
+        Args:
+            timestamps (Sequence[float]): sorted timestamps of the kept
+                trades.
+            now (float): current timestamp.
+
+        Returns:
+            float: timestamp of the oldest trade to keep.
+        """
+        cutoff = float("-inf")
+
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+
+        if self.max_count is not None and len(timestamps) > self.max_count:
+            cutoff = max(cutoff, timestamps[len(timestamps) - self.max_count])
+
+        return cutoff
@@ -2,14 +2,42 @@
 
 
 import logging
+import math
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
+from array import array
+from contextlib import contextmanager
 from enum import Enum
-from typing import Union
-
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from gbce.clock import Clock, WallClock
+from gbce.ingest import (
+    IngestSummary,
+    check_columns,
+    invalid_trade,
+    split_rows,
+    validate_trades,
+)
 from gbce.logger import LoggerMixin
-
+from gbce.metrics import Metrics, StockMetrics
+from gbce.subscribe import Callback, Subscription
+
+from ..bars import BarAggregator, BarSeries
+from ..retention import Retention
+from ..store import TradeStore
+from ..store.columnar import TRADE_TYPES, ColumnarTradeStore
+from ..store.objects import ObjectTradeStore
 from ..trade import Trade, TradeType
+from ..window import WINDOW_LENGTH
 
 
 class StockType(Enum):
@@ -19,18 +47,53 @@ class StockType(Enum):
     PREFERRED = "Preferred"
 
 
+TradeLoader = Callable[[], tuple[array, array, array, array]]
+
+TradeListener = Callable[
+    [
+        "Stock",
+        Sequence[TradeType],
+        Sequence[float],
+        Sequence[float],
+        Sequence[float],
+    ],
+    None,
+]
+
+
 class Stock(LoggerMixin, ABC):
     """Stock model class.
 
+    Stocks can be used from several threads. Writes take a per-stock lock,
+    so trades on different stocks never contend, and trade listeners are
+    called while it is held. Reads are optimistic: they run without the
+    lock and are only retried under it if a write was in progress or
+    happened meanwhile.
+
     Args:
         name (str): stock name.
         last_dividend (float): stock last dividend.
         fixed_dividend (float): stock fixed dividend.
         par_value (float): stock par value.
-        logger_level (int): logger level.
+        logger_level (Optional[int]): logger level. None leaves it as
+            configured.
+        columnar (bool): whether to keep the trades in typed arrays instead
+            of Trade objects.
+        clock (Optional[Clock]): clock to timestamp trades and tell which
+            trades are recent. None means the wall clock.
+        window (float): seconds a trade is taken as recent for.
+        retention (Optional[Retention]): policy to compact old trades into
+            bars. None keeps every trade.
+        metrics (Optional[Metrics]): metrics to time trades and volume
+            weighted stock prices into. The stock counts its trades too.
+            None leaves the stock uninstrumented.
     """
 
-    _trades: list[Trade]
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+
+    _type: StockType
+    __store: TradeStore
+    _listeners: list[TradeListener]
 
     def __init__(
         self,
@@ -38,17 +101,46 @@ class Stock(LoggerMixin, ABC):
         last_dividend: float,
         fixed_dividend: float,
         par_value: float,
-        logger_level: int = logging.INFO,
+        logger_level: Optional[int] = None,
+        columnar: bool = False,
+        clock: Optional[Clock] = None,
+        window: float = WINDOW_LENGTH,
+        retention: Optional[Retention] = None,
+        metrics: Optional[Metrics] = None,
     ):
         # pylint: disable=too-many-arguments
         super().__init__(logger_level)
 
+        self._clock = clock if clock is not None else WallClock()
+
         self._name = name
         self._last_dividend = last_dividend
         self._fixed_dividend = fixed_dividend
         self._par_value = par_value
 
-        self._trades = []
+        self._window = window
+        if columnar:
+            self.__store = ColumnarTradeStore(name, window)
+        else:
+            self.__store = ObjectTradeStore(name, window)
+        self.__loader: Optional[TradeLoader] = None
+
+        self._listeners = []
+        self._subscriptions: list[Subscription] = []
+        self._lock = threading.Lock()
+        self._version = 0
+
+        self._retention = retention
+        self._bars = (
+            BarSeries(retention.bar_interval)
+            if retention is not None
+            else None
+        )
+        self._aggregator: Optional[BarAggregator] = None
+
+        self._metrics = metrics
+        self._accepted = 0
+        self._rejected = 0
 
     def __repr__(self) -> str:
         """Get representation of a Stock object.
@@ -62,13 +154,321 @@ class Stock(LoggerMixin, ABC):
         )
 
     @property
-    def trades(self) -> list[Trade]:
+    def name(self) -> str:
+        """Get stock name.
+
+        Returns:
+            str: stock name.
+        """
+        return self._name
+
+    @property
+    def type(self) -> StockType:
+        """Get stock type.
+
+        Returns:
+            StockType: stock type.
+        """
+        return self._type
+
+    @property
+    def last_dividend(self) -> float:
+        """Get last dividend.
+
+        Returns:
+            float: stock last dividend.
+        """
+        return self._last_dividend
+
+    @property
+    def fixed_dividend(self) -> float:
+        """Get fixed dividend.
+
+        Returns:
+            float: stock fixed dividend.
+        """
+        return self._fixed_dividend
+
+    @property
+    def par_value(self) -> float:
+        """Get par value.
+
+        Returns:
+            float: stock par value.
+        """
+        return self._par_value
+
+    @property
+    def window(self) -> float:
+        """Get window length.
+
+        Returns:
+            float: seconds a trade is taken as recent for.
+        """
+        return self._window
+
+    @property
+    def bars(self) -> Optional[BarSeries]:
+        """Get the bars compacted trades have been rolled up into.
+
+        Returns:
+            BarSeries: roll-up bars.
+            None: if the stock keeps every trade.
+        """
+        return self._bars
+
+    @property
+    def aggregator(self) -> Optional[BarAggregator]:
+        """Get the bars recorded trades are aggregated into.
+
+        Returns:
+            BarAggregator: bars at every aggregated resolution.
+            None: if bars aren't aggregated.
+        """
+        return self._aggregator
+
+    @property
+    def _store(self) -> TradeStore:
+        """Get trade store, loading the restored trades if still pending.
+
+        Returns:
+            TradeStore: trade store.
+        """
+        if self.__loader is not None:
+            with self._writing():
+                pass
+        return self.__store
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """Hold the write lock and flag the write to optimistic readers.
+
+        Restored trades that are still pending are loaded first.
+
+        Yields:
+            None: nothing.
+        """
+        with self._lock:
+            self._version += 1
+            try:
+                if self.__loader is not None:
+                    loader, self.__loader = self.__loader, None
+                    self.__load(loader)
+                yield
+            finally:
+                self._version += 1
+
+    def _read(self, read: Callable[..., Any], *args: Any) -> Any:
+        """Read the trade store without blocking writers.
+
+        Args:
+            read (Callable[..., Any]): store method to call.
+            args (Any): arguments of the method.
+
+        Returns:
+            Any: result of the method.
+        """
+        version = self._version
+        if not version & 1:
+            try:
+                result = read(*args)
+            except IndexError:
+                # Torn read of a store that was being written.
+                pass
+            else:
+                if self._version == version:
+                    return result
+
+        with self._writing():
+            return read(*args)
+
+    def __load(self, loader: TradeLoader) -> None:
+        """Load restored trades into the trade store.
+
+        Args:
+            loader (TradeLoader): callable that gives the trade type codes,
+                quantities, prices and timestamps of the trades.
+        """
+        codes, quantities, prices, timestamps = loader()
+        self.__store.extend(
+            [TRADE_TYPES[code] for code in codes],
+            quantities,
+            prices,
+            timestamps,
+        )
+
+    @property
+    def trades(self) -> Sequence[Trade]:
         """Get stock trades.
 
         Returns:
-            list[Trade]: stock trades.
+            Sequence[Trade]: stock trades.
+        """
+        return self._store.trades
+
+    def metrics(self) -> StockMetrics:
+        """Get the trade counts and the size of the stock.
+
+        Trades are only counted while the stock is instrumented.
+
+        Returns:
+            StockMetrics: stock metrics.
+        """
+        return StockMetrics(
+            self._accepted,
+            self._rejected,
+            self._read(self._store.__len__),
+            self._read(self._store.memory_bytes),
+        )
+
+    def add_trade_listener(self, listener: TradeListener) -> None:
+        """Add a listener that is called after trades are recorded.
+
+        The listener gets the stock and the trade types, quantities, prices
+        and timestamps of the recorded trades as parallel columns.
+
+        Args:
+            listener (TradeListener): listener to call.
+        """
+        self._listeners = [*self._listeners, listener]
+
+    def remove_trade_listener(self, listener: TradeListener) -> None:
+        """Remove a trade listener.
+
+        Args:
+            listener (TradeListener): listener to remove.
+        """
+        self._listeners = [
+            added for added in self._listeners if added != listener
+        ]
+
+    def subscribe(
+        self, callback: Callback, threshold: float = 0.0, interval: float = 0.0
+    ) -> Subscription:
+        """Subscribe to the changes of the volume weighted stock price.
+
+        The price is only calculated again after the stock trades or its
+        oldest recent trade expires. Add the subscription to a notifier to
+        get the changes.
+
+        Args:
+            callback (Callback): callable the changes are notified to.
+            threshold (float): change notifications need to exceed.
+            interval (float): seconds between notifications.
+
+        Returns:
+            Subscription: subscription.
+        """
+
+        def read(now: float) -> tuple[float, Optional[float]]:
+            """Read the volume weighted stock price.
+
+            Args:
+                now (float): current timestamp.
+
+            Returns:
+                tuple[float, Optional[float]]: volume weighted stock price
+                    and timestamp after which the oldest recent trade
+                    expires, if any.
+            """
+            price_x_qty, quantity, expiry = self.window_state(now)
+            return (price_x_qty / quantity if quantity else 0.0), expiry
+
+        def unsubscribe() -> None:
+            """Stop marking the subscription when the stock trades."""
+            self.remove_trade_listener(subscription.mark)
+            self._subscriptions = [
+                added
+                for added in self._subscriptions
+                if added is not subscription
+            ]
+
+        subscription = Subscription(
+            self.name, read, callback, threshold, interval, unsubscribe
+        )
+        self.add_trade_listener(subscription.mark)
+        self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def cancel_subscriptions(self) -> int:
+        """Cancel every subscription to the stock, e.g. once delisted.
+
+        Returns:
+            int: number of cancelled subscriptions.
+        """
+        subscriptions = self._subscriptions
+        for subscription in subscriptions:
+            subscription.cancel()
+        return len(subscriptions)
+
+    def relist(
+        self,
+        last_dividend: float,
+        fixed_dividend: float,
+        par_value: float,
+    ) -> None:
+        """Update the listing of the stock, keeping its trades.
+
+        Args:
+            last_dividend (float): stock last dividend.
+            fixed_dividend (float): stock fixed dividend.
+            par_value (float): stock par value.
+        """
+        with self._writing():
+            self._last_dividend = last_dividend
+            self._fixed_dividend = fixed_dividend
+            self._par_value = par_value
+
+    def trade_columns(self) -> tuple[array, array, array, array]:
+        """Get a consistent copy of the trades as typed arrays.
+
+        The columns are copied under the write lock, so they match each
+        other and can be used while the stock trades.
+
+        Returns:
+            tuple[array, array, array, array]: trade type codes, quantities,
+                prices and timestamps of the trades in timestamp order.
+        """
+        with self._writing():
+            codes, quantities, prices, timestamps = self._store.columns()
+            return codes[:], quantities[:], prices[:], timestamps[:]
+
+    def restore_trades(self, loader: TradeLoader, lazy: bool = False) -> None:
+        """Restore trades, e.g. from a snapshot.
+
+        Restored trades aren't passed to the trade listeners.
+
+        Args:
+            loader (TradeLoader): callable that gives the trade type codes,
+                quantities, prices and timestamps of the trades.
+            lazy (bool): whether to wait until the trades are first needed
+                to load them.
+        """
+        if lazy:
+            self.__loader = loader
+        else:
+            with self._writing():
+                self.__load(loader)
+
+    def aggregate_bars(self, resolutions: Iterable[float]) -> BarAggregator:
+        """Aggregate the trades recorded from now on into bars.
+
+        Calling it again adds resolutions to the same aggregator.
+
+        Args:
+            resolutions (Iterable[float]): seconds every bar spans, per
+                series.
+
+        Returns:
+            BarAggregator: bars at every aggregated resolution.
         """
-        return self._trades
+        with self._writing():
+            if self._aggregator is None:
+                self._aggregator = BarAggregator(resolutions)
+                self.add_trade_listener(self._aggregator)
+            else:
+                self._aggregator.add_resolutions(resolutions)
+            return self._aggregator
 
     @abstractmethod
     def _calculate_dividend_yield(self, price: float) -> float:
@@ -97,8 +497,11 @@ class Stock(LoggerMixin, ABC):
             bool: if price is 0.
         """
         if not price:
-            self._log.warning(
-                "%s: No dividend yield for price zero.", self._name
+            self._log_limited(
+                logging.WARNING,
+                self._name,
+                "%s: No dividend yield for price zero.",
+                self._name,
             )
             return None
 
@@ -115,7 +518,9 @@ class Stock(LoggerMixin, ABC):
             None: if last dividend is zero.
         """
         if not self._last_dividend:
-            self._log.info(
+            self._log_limited(
+                logging.INFO,
+                self._name,
                 "%s: No P/E ratio since the last dividend is zero",
                 self._name,
             )
@@ -123,24 +528,137 @@ class Stock(LoggerMixin, ABC):
 
         return price / self._last_dividend
 
-    def calculate_volume_weighted_stock_price(self) -> float:
+    def calculate_volume_weighted_stock_price(
+        self, now: Optional[float] = None
+    ) -> float:
         """Calculate volume weighted stock price.
 
+        Args:
+            now (Optional[float]): current timestamp. None means now.
+
         Returns:
             float: volume weighted stock price.
         """
-        summation_price_x_qty = 0.0
-        summation_quantity = 0.0
+        if now is None:
+            now = self._clock.now()
+
+        metrics = self._metrics
+        if metrics is None:
+            return self._read(self._store.volume_weighted_price, now)
+
+        start = time.perf_counter()
+        price, count = self._read(self._store.recent_price_and_count, now)
+        metrics.vwsp.observe(time.perf_counter() - start)
+        metrics.vwsp_trades.observe(count)
+        return price
+
+    def calculate_volume_weighted_stock_prices(
+        self, windows: Iterable[float], now: Optional[float] = None
+    ) -> dict[float, float]:
+        """Calculate volume weighted stock price over several windows.
+
+        All the windows are answered from the prefix sum index, with one
+        binary search each and a single read of the clock.
+
+        Args:
+            windows (Iterable[float]): window lengths in seconds.
+            now (Optional[float]): current timestamp. None means now.
+
+        Returns:
+            dict[float, float]: volume weighted stock price by window
+                length, 0 for the windows without trades.
+        """
+        if now is None:
+            now = self._clock.now()
 
-        for trade in self._trades:
-            if trade.is_done_last_5_minutes:
-                summation_price_x_qty += trade.price * trade.quantity
-                summation_quantity += trade.quantity
+        prices = {}
+        for window in windows:
+            price_x_qty, quantity = self._read(
+                self._store.sums, now - window, math.inf, True
+            )
+            prices[window] = price_x_qty / quantity if quantity else 0
+
+        return prices
+
+    def window_state(
+        self, now: Optional[float] = None
+    ) -> tuple[float, float, Optional[float]]:
+        """Get a consistent state of the recent trades.
+
+        Args:
+            now (Optional[float]): current timestamp. None means now.
+
+        Returns:
+            tuple[float, float, Optional[float]]: price x quantity and
+                quantity sums of the recent trades, and timestamp after
+                which the oldest of them expires, if any.
+        """
+        if now is None:
+            now = self._clock.now()
+
+        return self._read(self._store.window_state, now)
 
-        if not summation_quantity:
+    def vwsp_between(self, start: float, end: float) -> float:
+        """Calculate volume weighted stock price over a time range.
+
+        Args:
+            start (float): range start, included.
+            end (float): range end, excluded.
+
+        Returns:
+            float: volume weighted stock price or 0 if there are no trades
+                in the range.
+        """
+        price_x_qty, quantity = self._read(self._store.sums, start, end)
+
+        if not quantity:
             return 0
 
-        return summation_price_x_qty / summation_quantity
+        return price_x_qty / quantity
+
+    def vwsp_at(self, timestamp: float) -> float:
+        """Calculate volume weighted stock price as of a past instant.
+
+        Takes into account the trades done in the window up to and
+        including the instant.
+
+        Args:
+            timestamp (float): instant.
+
+        Returns:
+            float: volume weighted stock price or 0 if there are no trades.
+        """
+        price_x_qty, quantity = self._read(
+            self._store.sums, timestamp - self._window, timestamp, True
+        )
+
+        if not quantity:
+            return 0
+
+        return price_x_qty / quantity
+
+    def vwsp_at_many(self, timestamps: Iterable[float]) -> array:
+        """Calculate volume weighted stock price as of several instants.
+
+        Args:
+            timestamps (Iterable[float]): instants.
+
+        Returns:
+            array: volume weighted stock price as of every instant.
+        """
+        return array("d", map(self.vwsp_at, timestamps))
+
+    def next_expiry(self, now: float) -> Optional[float]:
+        """Get when the volume weighted stock price next changes on its own.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            float: timestamp after which the oldest recent trade expires.
+            None: if there are no recent trades.
+        """
+        return self._read(self._store.next_expiry, now)
 
     def sell(self, quantity: float, price: float) -> Union[Trade, None]:
         """Sell stock.
@@ -173,7 +691,7 @@ class Stock(LoggerMixin, ABC):
         trade_type: TradeType,
         quantity: float,
         price: float,
-        timestamp: float = datetime.timestamp(datetime.utcnow()),
+        timestamp: Optional[float] = None,
     ) -> Union[Trade, None]:
         """Record trade.
 
@@ -181,19 +699,189 @@ class Stock(LoggerMixin, ABC):
             trade_type (TradeType): trade type
             quantity (float): quantity to trade.
             price (float): trade price.
-            timestamp (float): date and time of the trade.
+            timestamp (Optional[float]): date and time of the trade. None
+                means now.
 
         Returns:
             Trade: buying trade.
-            None: if quantity is equal or lower than 0.
+            None: if quantity is equal or lower than 0, or the quantity or
+                the price isn't finite.
         """
-        if quantity <= 0:
-            self._log.warning(
-                "%s: Quantity needs to be bigger than 0", self._name
+        metrics = self._metrics
+        if not 0 < quantity < math.inf or not -math.inf < price < math.inf:
+            if metrics is not None:
+                with self._lock:
+                    self._rejected += 1
+            self._log_limited(
+                logging.WARNING,
+                self._name,
+                "%s: %s",
+                self._name,
+                invalid_trade(trade_type, quantity, price),
             )
             return None
 
-        trade = Trade(self._name, trade_type, quantity, price, timestamp)
-        self._trades.append(trade)
-
+        start = time.perf_counter() if metrics is not None else 0.0
+        if timestamp is None:
+            timestamp = self._clock.now()
+
+        # Same as _writing(), inlined since this is the hot path.
+        with self._lock:
+            self._version += 1
+            try:
+                if self.__loader is not None:
+                    loader, self.__loader = self.__loader, None
+                    self.__load(loader)
+
+                trade = self.__store.append(
+                    trade_type, quantity, price, timestamp
+                )
+
+                for listener in self._listeners:
+                    listener(
+                        self,
+                        (trade_type,),
+                        (quantity,),
+                        (price,),
+                        (timestamp,),
+                    )
+
+                if self._retention is not None:
+                    now = self._clock.now()
+                    if self._retention.due(
+                        self.__store.timestamps, now, now - self._window
+                    ):
+                        self.__compact(now)
+
+                if metrics is not None:
+                    self._accepted += 1
+            finally:
+                self._version += 1
+
+        if metrics is not None:
+            metrics.record_trade.observe(time.perf_counter() - start)
         return trade
+
+    def record_trades(
+        self,
+        trades: Iterable[tuple[TradeType, float, float, Optional[float]]],
+    ) -> IngestSummary:
+        """Record several trades at once.
+
+        Args:
+            trades (Iterable[tuple]): trade type, quantity, price and
+                timestamp of every trade. A None timestamp means now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+        """
+        return self.record_trade_columns(*split_rows(trades, 4))
+
+    def record_trade_columns(
+        self,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Optional[Sequence[Optional[float]]] = None,
+    ) -> IngestSummary:
+        """Record several trades given as parallel columns.
+
+        All the trades are validated in one pass. Invalid trades are left
+        out and reported in the summary with a single warning.
+
+        Args:
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Optional[Sequence[Optional[float]]]): timestamp of
+                every trade. None, or a None timestamp, means now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+
+        Raises:
+            ValueError: if the columns don't have the same length.
+        """
+        check_columns(trade_types, quantities, prices, timestamps)
+        now = self._clock.now()
+        times: Sequence[float] = (
+            [now] * len(quantities)
+            if timestamps is None
+            else [now if ts is None else ts for ts in timestamps]
+        )
+
+        rejected = validate_trades(trade_types, quantities, prices)
+        if rejected:
+            skip = {index for index, _ in rejected}
+            keep = [i for i in range(len(quantities)) if i not in skip]
+            trade_types = [trade_types[i] for i in keep]
+            quantities = [quantities[i] for i in keep]
+            prices = [prices[i] for i in keep]
+            times = [times[i] for i in keep]
+
+        with self._writing():
+            self.__store.extend(trade_types, quantities, prices, times)
+            if quantities:
+                for listener in self._listeners:
+                    listener(self, trade_types, quantities, prices, times)
+
+                if self._retention is not None and self._retention.due(
+                    self.__store.timestamps, now, now - self._window
+                ):
+                    self.__compact(now)
+
+            if self._metrics is not None:
+                self._accepted += len(quantities)
+                self._rejected += len(rejected)
+
+        summary = IngestSummary(len(quantities), rejected)
+
+        if rejected:
+            self._log_limited(
+                logging.WARNING,
+                self._name,
+                "%s: Rejected %d of %d trades: %s",
+                self._name,
+                len(rejected),
+                len(rejected) + len(quantities),
+                summary.reasons(),
+            )
+
+        return summary
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Roll the trades the retention policy doesn't keep up into bars.
+
+        Trades that are still recent are always kept.
+
+        Args:
+            now (Optional[float]): current timestamp. None means now.
+
+        Returns:
+            int: number of compacted trades.
+        """
+        if now is None:
+            now = self._clock.now()
+
+        with self._writing():
+            return self.__compact(now)
+
+    def __compact(self, now: float) -> int:
+        """Roll old trades up into bars while holding the write lock.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            int: number of compacted trades.
+        """
+        if self._retention is None or self._bars is None:
+            return 0
+
+        cutoff = min(
+            self._retention.cutoff(self.__store.timestamps, now),
+            now - self._window,
+        )
+        timestamps, prices, quantities = self.__store.compact(cutoff)
+        self._bars.extend(timestamps, prices, quantities)
+        return len(timestamps)
@@ -1,7 +1,7 @@
 """Common Stock module."""
 
 
-from . import Stock
+from . import Stock, StockType
 
 
 class CommonStock(Stock):
@@ -10,6 +10,8 @@ class CommonStock(Stock):
     Specialised class for common stock.
     """
 
+    _type = StockType.COMMON
+
     def _calculate_dividend_yield(self, price: float) -> float:
         """Calculate the dividend yield of the stock.
 
@@ -1,7 +1,7 @@
 """Preferred Stock module."""
 
 
-from . import Stock
+from . import Stock, StockType
 
 
 class PreferredStock(Stock):
@@ -10,6 +10,8 @@ class PreferredStock(Stock):
     Specialised class for preferred stock.
     """
 
+    _type = StockType.PREFERRED
+
     def _calculate_dividend_yield(self, price: float) -> float:
         """Calculate the dividend yield of the stock.
 
@@ -0,0 +1,216 @@
+"""Trade store module."""
+
+
+import math
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from typing import Optional, Sequence
+
+from ..prefix import PrefixIndex
+from ..trade import Trade, TradeType
+from ..window import WINDOW_LENGTH
+
+
+class TradeStore(ABC):
+    """Trade store base class.
+
+    Holds the trades recorded for a stock and answers the aggregates that
+    the stock needs from them. Every store keeps a prefix sum index of its
+    trades, which answers both the recent trade aggregates and time range
+    queries without ever being updated by a read.
+
+    Args:
+        stock_name (str): name of the stock the trades belong to.
+        window (float): seconds a trade is taken as recent for.
+    """
+
+    def __init__(self, stock_name: str, window: float = WINDOW_LENGTH):
+        self._stock_name = stock_name
+        self._window_length = window
+        self._prefix = PrefixIndex()
+
+    def __len__(self) -> int:
+        """Get number of stored trades.
+
+        Returns:
+            int: number of stored trades.
+        """
+        return len(self.trades)
+
+    def memory_bytes(self) -> int:
+        """Estimate the memory taken by the stored trades.
+
+        Returns:
+            int: estimated size in bytes.
+        """
+        return self._prefix.memory_bytes()
+
+    def recent_price_and_count(self, now: float) -> tuple[float, int]:
+        """Calculate the volume weighted price and count the recent trades.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            tuple[float, int]: volume weighted price, or 0 if there are no
+                recent trades, and number of recent trades.
+        """
+        timestamps = self._prefix.timestamps
+        count = len(timestamps) - bisect_left(
+            timestamps, now - self._window_length
+        )
+        return self.volume_weighted_price(now), count
+
+    @property
+    def timestamps(self) -> Sequence[float]:
+        """Get timestamps of the stored trades in timestamp order.
+
+        Returns:
+            Sequence[float]: sorted timestamps.
+        """
+        return self._prefix.timestamps
+
+    def sums(
+        self, start: float, end: float, include_end: bool = False
+    ) -> tuple[float, float]:
+        """Get the sums of the trades done in a time range.
+
+        Args:
+            start (float): range start, included.
+            end (float): range end, excluded unless include_end is set.
+            include_end (bool): whether the range end is included.
+
+        Returns:
+            tuple[float, float]: price x quantity and quantity sums.
+        """
+        return self._prefix.sums(start, end, include_end)
+
+    def volume_weighted_price(self, now: float) -> float:
+        """Calculate the volume weighted price of the recent trades.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            float: volume weighted price or 0 if there are no recent trades.
+        """
+        price_x_qty, quantity = self._prefix.sums(
+            now - self._window_length, math.inf, include_end=True
+        )
+
+        if not quantity:
+            return 0
+
+        return price_x_qty / quantity
+
+    def next_expiry(self, now: float) -> Optional[float]:
+        """Get when the oldest recent trade expires.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            float: timestamp after which the oldest recent trade expires.
+            None: if there are no recent trades.
+        """
+        timestamps = self._prefix.timestamps
+        start = bisect_left(timestamps, now - self._window_length)
+        if start == len(timestamps):
+            return None
+
+        return timestamps[start] + self._window_length
+
+    def window_state(self, now: float) -> tuple[float, float, Optional[float]]:
+        """Get the state of the recent trades from the prefix sum index.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            tuple[float, float, Optional[float]]: price x quantity and
+                quantity sums of the recent trades, and timestamp after
+                which the oldest of them expires, if any.
+        """
+        start = now - self._window_length
+        timestamps = self._prefix.timestamps
+        oldest = bisect_left(timestamps, start)
+        price_x_qty, quantity = self._prefix.sums(
+            start, math.inf, include_end=True
+        )
+        expiry = (
+            timestamps[oldest] + self._window_length
+            if oldest < len(timestamps)
+            else None
+        )
+        return price_x_qty, quantity, expiry
+
+    @property
+    @abstractmethod
+    def trades(self) -> Sequence[Trade]:
+        """Get stored trades.
+
+        Returns:
+            Sequence[Trade]: stored trades.
+        """
+
+    @abstractmethod
+    def append(
+        self,
+        trade_type: TradeType,
+        quantity: float,
+        price: float,
+        timestamp: float,
+    ) -> Trade:
+        """Store a trade.
+
+        Args:
+            trade_type (TradeType): trade type.
+            quantity (float): traded quantity.
+            price (float): trade price.
+            timestamp (float): timestamp of the trade.
+
+        Returns:
+            Trade: stored trade.
+        """
+
+    @abstractmethod
+    def extend(
+        self,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Store several trades given as parallel columns.
+
+        Args:
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): traded quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Sequence[float]): timestamp of every trade.
+        """
+
+    @abstractmethod
+    def columns(self) -> tuple[array, array, array, array]:
+        """Get the stored trades as typed arrays in timestamp order.
+
+        Returns:
+            tuple[array, array, array, array]: trade type codes, quantities,
+                prices and timestamps of the stored trades.
+        """
+
+    @abstractmethod
+    def compact(
+        self, cutoff: float
+    ) -> tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """Remove the trades done before a timestamp.
+
+        Args:
+            cutoff (float): timestamp of the oldest trade to keep.
+
+        Returns:
+            tuple[Sequence[float], Sequence[float], Sequence[float]]:
+                timestamps, prices and quantities of the removed trades in
+                timestamp order.
+        """
@@ -0,0 +1,232 @@
+"""Columnar trade store module."""
+
+
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Sequence
+
+from ..trade import Trade, TradeType
+from ..window import WINDOW_LENGTH
+from . import TradeStore
+
+TRADE_TYPES = tuple(TradeType)
+TRADE_TYPE_CODES = {trade_type: i for i, trade_type in enumerate(TRADE_TYPES)}
+
+
+class TradeColumns(Sequence[Trade]):
+    """Lazy sequence of Trade views over a columnar trade store.
+
+    Trade objects are only built when an item is accessed.
+
+    Args:
+        store (ColumnarTradeStore): store to read the trades from.
+    """
+
+    def __init__(self, store: "ColumnarTradeStore"):
+        self.__store = store
+
+    def __len__(self) -> int:
+        """Get number of trades.
+
+        Returns:
+            int: number of trades.
+        """
+        return len(self.__store.timestamps)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get a trade view or a list of them.
+
+        Args:
+            index (Union[int, slice]): trade position or slice.
+
+        Returns:
+            Trade: trade at the given position.
+            list[Trade]: trades in the given slice.
+        """
+        if isinstance(index, slice):
+            return [self.__store.trade(i) for i in range(len(self))[index]]
+
+        return self.__store.trade(range(len(self))[index])
+
+    def __repr__(self) -> str:
+        """Get representation of the trade views.
+
+        Returns:
+            str: representation of the trade views.
+        """
+        return repr(list(self))
+
+
+def merge_column(
+    column: array, start: int, values: Sequence, order: list[int]
+) -> None:
+    """Merge values into a column from a position in a given order.
+
+    Args:
+        column (array): column to merge into.
+        start (int): position of the first merged value.
+        values (Sequence): values to merge.
+        order (list[int]): positions the merged values come from, as
+            positions in the column from the start followed by the values.
+    """
+    merged = column[start:] + array(column.typecode, values)
+    column[start:] = array(column.typecode, map(merged.__getitem__, order))
+
+
+class ColumnarTradeStore(TradeStore):
+    """Columnar trade store class.
+
+    Keeps timestamps, prices, quantities and trade type codes in growable
+    typed arrays sorted by timestamp. The timestamps are shared with the
+    prefix sum index, so the recent trades are aggregated with two binary
+    searches and without building Trade objects.
+    """
+
+    def __init__(self, stock_name: str, window: float = WINDOW_LENGTH):
+        super().__init__(stock_name, window)
+        self.prices = array("d")
+        self.quantities = array("d")
+        self.types = array("b")
+
+    @property
+    def trades(self) -> TradeColumns:
+        """Get lazy views of the stored trades.
+
+        Returns:
+            TradeColumns: stored trades.
+        """
+        return TradeColumns(self)
+
+    def memory_bytes(self) -> int:
+        """Get the memory taken by the stored trades.
+
+        Returns:
+            int: size in bytes.
+        """
+        return (
+            super().memory_bytes()
+            + sys.getsizeof(self.prices)
+            + sys.getsizeof(self.quantities)
+            + sys.getsizeof(self.types)
+        )
+
+    def trade(self, index: int) -> Trade:
+        """Build the Trade at a given position.
+
+        Args:
+            index (int): trade position.
+
+        Returns:
+            Trade: trade at the given position.
+        """
+        return Trade(
+            self._stock_name,
+            TRADE_TYPES[self.types[index]],
+            self.quantities[index],
+            self.prices[index],
+            self.timestamps[index],
+        )
+
+    def append(
+        self,
+        trade_type: TradeType,
+        quantity: float,
+        price: float,
+        timestamp: float,
+    ) -> Trade:
+        """Store a trade.
+
+        Args:
+            trade_type (TradeType): trade type.
+            quantity (float): traded quantity.
+            price (float): trade price.
+            timestamp (float): timestamp of the trade.
+
+        Returns:
+            Trade: stored trade.
+        """
+        code = TRADE_TYPE_CODES[trade_type]
+        index = self._prefix.add(timestamp, price, quantity)
+
+        if index == len(self.prices):
+            self.prices.append(price)
+            self.quantities.append(quantity)
+            self.types.append(code)
+        else:
+            self.prices.insert(index, price)
+            self.quantities.insert(index, quantity)
+            self.types.insert(index, code)
+
+        return Trade(self._stock_name, trade_type, quantity, price, timestamp)
+
+    def extend(
+        self,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Store several trades given as parallel columns.
+
+        Columns that continue the timestamp order are appended in one go,
+        anything else is merged in timestamp order in one pass.
+
+        Args:
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): traded quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Sequence[float]): timestamp of every trade.
+        """
+        start, order = self._prefix.extend(timestamps, prices, quantities)
+        codes = [TRADE_TYPE_CODES[trade_type] for trade_type in trade_types]
+        if order is None:
+            self.prices.extend(prices)
+            self.quantities.extend(quantities)
+            self.types.extend(codes)
+            return
+
+        merge_column(self.prices, start, prices, order)
+        merge_column(self.quantities, start, quantities, order)
+        merge_column(self.types, start, codes, order)
+
+    def columns(self) -> tuple[array, array, array, array]:
+        """Get the stored trades as typed arrays in timestamp order.
+
+        Returns:
+            tuple[array, array, array, array]: trade type codes, quantities,
+                prices and timestamps of the stored trades.
+        """
+        return (
+            self.types,
+            self.quantities,
+            self.prices,
+            self._prefix.timestamps,
+        )
+
+    def compact(
+        self, cutoff: float
+    ) -> tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """Remove the trades done before a timestamp.
+
+        Args:
+            cutoff (float): timestamp of the oldest trade to keep.
+
+        Returns:
+            tuple[Sequence[float], Sequence[float], Sequence[float]]:
+                timestamps, prices and quantities of the removed trades in
+                timestamp order.
+        """
+        count = bisect_left(self.timestamps, cutoff)
+        removed = (
+            self.timestamps[:count],
+            self.prices[:count],
+            self.quantities[:count],
+        )
+
+        self._prefix.drop(count)
+        del self.prices[:count]
+        del self.quantities[:count]
+        del self.types[:count]
+
+        return removed
@@ -0,0 +1,162 @@
+"""Object trade store module."""
+
+
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Sequence
+
+from ..trade import Trade, TradeType
+from ..window import WINDOW_LENGTH
+from . import TradeStore
+from .columnar import TRADE_TYPE_CODES
+
+
+def sequence_size(items: Sequence[Any]) -> int:
+    """Estimate the memory taken by a sequence and its items.
+
+    Items are taken to be as big as the first one, including the floats
+    and the dictionary it holds.
+
+    Args:
+        items (Sequence[Any]): sequence.
+
+    Returns:
+        int: estimated size in bytes.
+    """
+    size = sys.getsizeof(items)
+    if not items:
+        return size
+
+    item = items[0]
+    parts = item if isinstance(item, tuple) else vars(item).values()
+    item_size = sys.getsizeof(item) + sum(
+        sys.getsizeof(part) for part in parts if isinstance(part, float)
+    )
+    if not isinstance(item, tuple):
+        item_size += sys.getsizeof(vars(item))
+    return size + item_size * len(items)
+
+
+class ObjectTradeStore(TradeStore):
+    """Object trade store class.
+
+    Keeps a list of Trade objects sorted by timestamp, in the order of the
+    prefix sum index it aggregates the recent trades from, so old trades
+    are removed with a binary search and a slice.
+    """
+
+    __trades: list[Trade]
+
+    def __init__(self, stock_name: str, window: float = WINDOW_LENGTH):
+        super().__init__(stock_name, window)
+        self.__trades = []
+
+    @property
+    def trades(self) -> list[Trade]:
+        """Get stored trades.
+
+        Returns:
+            list[Trade]: stored trades.
+        """
+        return self.__trades
+
+    def memory_bytes(self) -> int:
+        """Estimate the memory taken by the stored trades.
+
+        Returns:
+            int: estimated size in bytes.
+        """
+        return super().memory_bytes() + sequence_size(self.__trades)
+
+    def append(
+        self,
+        trade_type: TradeType,
+        quantity: float,
+        price: float,
+        timestamp: float,
+    ) -> Trade:
+        """Store a trade.
+
+        Args:
+            trade_type (TradeType): trade type.
+            quantity (float): traded quantity.
+            price (float): trade price.
+            timestamp (float): timestamp of the trade.
+
+        Returns:
+            Trade: stored trade.
+        """
+        trade = Trade(self._stock_name, trade_type, quantity, price, timestamp)
+        self.__trades.insert(
+            self._prefix.add(timestamp, price, quantity), trade
+        )
+        return trade
+
+    def extend(
+        self,
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Store several trades given as parallel columns.
+
+        Args:
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): traded quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Sequence[float]): timestamp of every trade.
+        """
+        name = self._stock_name
+        trades = [
+            Trade(name, trade_type, quantity, price, timestamp)
+            for trade_type, quantity, price, timestamp in zip(
+                trade_types, quantities, prices, timestamps
+            )
+        ]
+        start, order = self._prefix.extend(timestamps, prices, quantities)
+        if order is None:
+            self.__trades.extend(trades)
+        else:
+            merged = self.__trades[start:] + trades
+            self.__trades[start:] = map(merged.__getitem__, order)
+
+    def columns(self) -> tuple[array, array, array, array]:
+        """Get the stored trades as typed arrays in timestamp order.
+
+        Returns:
+            tuple[array, array, array, array]: trade type codes, quantities,
+                prices and timestamps of the stored trades.
+        """
+        trades = self.__trades
+        return (
+            array("b", [TRADE_TYPE_CODES[trade.type] for trade in trades]),
+            array("d", [trade.quantity for trade in trades]),
+            array("d", [trade.price for trade in trades]),
+            array("d", self._prefix.timestamps),
+        )
+
+    def compact(
+        self, cutoff: float
+    ) -> tuple[Sequence[float], Sequence[float], Sequence[float]]:
+        """Remove the trades done before a timestamp.
+
+        Args:
+            cutoff (float): timestamp of the oldest trade to keep.
+
+        Returns:
+            tuple[Sequence[float], Sequence[float], Sequence[float]]:
+                timestamps, prices and quantities of the removed trades in
+                timestamp order.
+        """
+        count = bisect_left(self._prefix.timestamps, cutoff)
+        removed = self.__trades[:count]
+        del self.__trades[:count]
+        self._prefix.drop(count)
+
+        return (
+            [trade.timestamp for trade in removed],
+            [trade.price for trade in removed],
+            [trade.quantity for trade in removed],
+        )
@@ -3,6 +3,9 @@
 
 from datetime import datetime
 from enum import Enum
+from typing import Optional
+
+from .window import WINDOW_LENGTH
 
 
 class TradeType(Enum):
@@ -20,7 +23,8 @@ class Trade:
         trade_type (TradeType): type of trade.
         quantity (float): stock quantity.
         price (float): paid price per stock.
-        timestamp (float): timestamp of the trade.
+        timestamp (Optional[float]): timestamp of the trade. None means
+            now.
     """
 
     def __init__(
@@ -29,9 +33,12 @@ class Trade:
         trade_type: TradeType,
         quantity: float,
         price: float,
-        timestamp: float = datetime.timestamp(datetime.utcnow()),
+        timestamp: Optional[float] = None,
     ):
         # pylint: disable=too-many-arguments
+        if timestamp is None:
+            timestamp = datetime.timestamp(datetime.utcnow())
+
         self.__stock_name = stock_name
         self.__type = trade_type
         self.__quantity = quantity
@@ -49,16 +56,17 @@ class Trade:
             f'Stock "{self.__stock_name}" object at {hex(id(self))}>'
         )
 
-    @property
-    def is_done_last_5_minutes(self) -> bool:
-        """Check whether the trade has been done in the last 5 minutes.
+    def is_recent(self, now: float, window: float = WINDOW_LENGTH) -> bool:
+        """Check whether the trade has been done within a window.
+
+        Args:
+            now (float): current timestamp, e.g. from the stock clock.
+            window (float): seconds a trade is taken as recent for.
 
         Returns:
-            bool: whether the trade has been done in the last 5 minutes.
+            bool: whether the trade has been done in the window up to now.
         """
-        return (
-            datetime.timestamp(datetime.utcnow()) - self.__timestamp <= 5 * 60
-        )
+        return now - self.__timestamp <= window
 
     @property
     def quantity(self) -> float:
@@ -0,0 +1,5 @@
+"""Trade window module."""
+
+
+# Seconds a trade is taken as recent for.
+WINDOW_LENGTH = 5 * 60
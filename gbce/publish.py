@@ -0,0 +1,376 @@
+"""Shared memory publication module."""
+
+
+import math
+import mmap
+import struct
+import time
+from types import TracebackType
+from typing import Iterator, Mapping, NamedTuple, Optional, Type
+
+from .tape import NAME_SIZE, Path, encode_name
+from .view import ExchangeView, StockView
+
+MAGIC = b"GBCP"
+VERSION = 1
+
+# Magic, format version and number of stock slots.
+HEADER = struct.Struct("<4sH2xI4x")
+
+# Sequence, number of used stock slots, all share index and timestamp.
+INDEX = struct.Struct("<QQdd")
+
+# Sequence, stock name, volume weighted stock price, volume and timestamp.
+SLOT = struct.Struct(f"<Q{NAME_SIZE}sddd")
+
+SEQUENCE = struct.Struct("<Q")
+
+INDEX_OFFSET = HEADER.size
+SLOTS_OFFSET = INDEX_OFFSET + INDEX.size
+
+
+class PublishedIndex(NamedTuple):
+    """Published all share index class."""
+
+    value: float
+    timestamp: float
+
+
+class PublishedPrice(NamedTuple):
+    """Published stock price class."""
+
+    volume_weighted_stock_price: float
+    volume: float
+    timestamp: float
+
+
+class Publisher:
+    """Shared memory publisher of live prices.
+
+    Publishes the volume weighted price of every stock and the all share
+    index into a memory-mapped file of fixed layout, e.g. in /dev/shm, with
+    a slot per stock. Every slot, and the index, is guarded by a sequence
+    number that is odd while it's being written, so readers in other
+    processes can tell a torn read and retry it.
+
+    Removed stocks keep their slot, written with a NaN price and no volume,
+    which is taken again if they are listed again.
+
+    There must be a single publisher per file.
+
+    Args:
+        path (Path): publication path. It is overwritten if it exists.
+        capacity (int): number of stock slots.
+    """
+
+    __slots: dict[str, int]
+    __published: dict[str, StockView]
+
+    def __init__(self, path: Path, capacity: int = 1024):
+        self.path = path
+        self.capacity = capacity
+        size = SLOTS_OFFSET + capacity * SLOT.size
+        with open(path, "wb+") as publication:
+            publication.truncate(size)
+            self.__data = mmap.mmap(publication.fileno(), size)
+
+        HEADER.pack_into(self.__data, 0, MAGIC, VERSION, capacity)
+        self.__slots = {}
+        self.__published = {}
+        self.__sequences = [0] * (capacity + 1)
+
+    def __enter__(self) -> "Publisher":
+        """Enter the publisher context.
+
+        Returns:
+            Publisher: the publisher itself.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the publisher when leaving its context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the publication, leaving its last values in place."""
+        self.__data.close()
+
+    def publish(self, view: ExchangeView) -> int:
+        """Publish a view of the exchange.
+
+        Only the stocks whose view has changed since the last publication
+        are written again.
+
+        Args:
+            view (ExchangeView): exchange view.
+
+        Returns:
+            int: number of written stock slots.
+
+        Raises:
+            ValueError: if there are more stocks than slots, or a stock name
+                is longer than its field.
+        """
+        data = self.__data
+        slots = self.__slots
+        published = self.__published
+        written = 0
+        for name, stock_view in view.items():
+            if published.get(name) is stock_view:
+                continue
+
+            slot = slots.get(name)
+            if slot is None:
+                if len(slots) == self.capacity:
+                    raise ValueError(
+                        f"Publication is full with {self.capacity} stocks."
+                    )
+                slot = len(slots)
+
+            self.__write_slot(
+                slot,
+                name,
+                stock_view.volume_weighted_stock_price,
+                stock_view.volume,
+                stock_view.timestamp,
+            )
+            slots[name] = slot
+            published[name] = stock_view
+            written += 1
+
+        if len(published) > len(view):
+            for name in [name for name in published if name not in view]:
+                self.__write_slot(
+                    slots[name], name, math.nan, 0.0, view.timestamp
+                )
+                del published[name]
+                written += 1
+
+        sequence = self.__sequences[0]
+        SEQUENCE.pack_into(data, INDEX_OFFSET, sequence + 1)
+        INDEX.pack_into(
+            data,
+            INDEX_OFFSET,
+            sequence + 1,
+            len(slots),
+            view.all_share_index,
+            view.timestamp,
+        )
+        SEQUENCE.pack_into(data, INDEX_OFFSET, sequence + 2)
+        self.__sequences[0] = sequence + 2
+        return written
+
+    def __write_slot(
+        self,
+        slot: int,
+        name: str,
+        price: float,
+        volume: float,
+        timestamp: float,
+    ) -> None:
+        """Write the slot of a stock.
+
+        Args:
+            slot (int): slot number.
+            name (str): stock name.
+            price (float): volume weighted stock price.
+            volume (float): recent volume.
+            timestamp (float): view timestamp.
+        """
+        # pylint: disable=too-many-arguments
+        encoded = encode_name(name)
+        offset = SLOTS_OFFSET + slot * SLOT.size
+        sequence = self.__sequences[slot + 1]
+        SEQUENCE.pack_into(self.__data, offset, sequence + 1)
+        SLOT.pack_into(
+            self.__data,
+            offset,
+            sequence + 1,
+            encoded,
+            price,
+            volume,
+            timestamp,
+        )
+        SEQUENCE.pack_into(self.__data, offset, sequence + 2)
+        self.__sequences[slot + 1] = sequence + 2
+
+
+class Subscriber(Mapping[str, PublishedPrice]):
+    """Shared memory subscriber of live prices.
+
+    Maps a publication read-only and reads its values in place: reads are
+    retried while they overlap a write, but take no locks and make no
+    system calls unless retried. A value that stays mid-write for longer
+    than the timeout, e.g. because the publisher died while writing it,
+    raises TimeoutError instead of being retried forever.
+
+    Args:
+        path (Path): publication path.
+        timeout (float): seconds a read is retried for.
+
+    Raises:
+        ValueError: if the file isn't a publication of a supported version.
+    """
+
+    __slots: dict[str, int]
+
+    def __init__(self, path: Path, timeout: float = 1.0):
+        self.timeout = timeout
+        with open(path, "rb") as publication:
+            self.__data = mmap.mmap(
+                publication.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        magic, version, self.capacity = HEADER.unpack_from(self.__data)
+        if magic != MAGIC:
+            self.__data.close()
+            raise ValueError(f"{path} isn't a GBCE publication.")
+        if version != VERSION:
+            self.__data.close()
+            raise ValueError(f"Unsupported publication version {version}.")
+
+        self.__slots = {}
+
+    def __enter__(self) -> "Subscriber":
+        """Enter the subscriber context.
+
+        Returns:
+            Subscriber: the subscriber itself.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the subscriber when leaving its context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the publication."""
+        self.__data.close()
+
+    def __getitem__(self, name: str) -> PublishedPrice:
+        """Read the published price of a stock.
+
+        Args:
+            name (str): stock name.
+
+        Returns:
+            PublishedPrice: published price.
+
+        Raises:
+            KeyError: if the stock hasn't been published.
+            TimeoutError: if the price stays mid-write for the timeout.
+        """
+        slot = self.__slots.get(name)
+        if slot is None:
+            self.__refresh()
+            slot = self.__slots[name]
+
+        _, *values = self.__read(SLOT, SLOTS_OFFSET + slot * SLOT.size)
+        return PublishedPrice(*values)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the published stock names.
+
+        Returns:
+            Iterator[str]: stock names.
+        """
+        self.__refresh()
+        return iter(list(self.__slots))
+
+    def __len__(self) -> int:
+        """Get number of published stocks.
+
+        Returns:
+            int: number of published stocks.
+
+        Raises:
+            TimeoutError: if the index stays mid-write for the timeout.
+        """
+        return self.__read_index()[0]
+
+    @property
+    def all_share_index(self) -> PublishedIndex:
+        """Read the published all share index.
+
+        Returns:
+            PublishedIndex: published index.
+
+        Raises:
+            TimeoutError: if the index stays mid-write for the timeout.
+        """
+        return PublishedIndex(*self.__read_index()[1:])
+
+    def __read_index(self) -> tuple[int, float, float]:
+        """Read the published index record.
+
+        Returns:
+            tuple[int, float, float]: number of published stocks, all share
+                index and timestamp.
+
+        Raises:
+            TimeoutError: if the index stays mid-write for the timeout.
+        """
+        count, value, timestamp = self.__read(INDEX, INDEX_OFFSET)
+        return count, value, timestamp
+
+    def __read(self, record: struct.Struct, offset: int) -> tuple:
+        """Read a record, retrying while it overlaps a write.
+
+        Args:
+            record (struct.Struct): record layout, starting with its
+                sequence.
+            offset (int): record offset.
+
+        Returns:
+            tuple: record values after the sequence.
+
+        Raises:
+            TimeoutError: if the record stays mid-write for the timeout.
+        """
+        deadline = None
+        while True:
+            sequence, *values = record.unpack_from(self.__data, offset)
+            if not sequence & 1 and (
+                SEQUENCE.unpack_from(self.__data, offset)[0] == sequence
+            ):
+                return tuple(values)
+
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + self.timeout
+            elif now > deadline:
+                raise TimeoutError(
+                    f"Published record at {offset} stayed mid-write for "
+                    f"{self.timeout} seconds."
+                )
+
+    def __refresh(self) -> None:
+        """Read the names of the stocks published since the last refresh."""
+        count = len(self)
+        for slot in range(len(self.__slots), count):
+            name = SLOT.unpack_from(
+                self.__data, SLOTS_OFFSET + slot * SLOT.size
+            )[1]
+            self.__slots[name.rstrip(b"\0").decode()] = slot
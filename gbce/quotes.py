@@ -0,0 +1,138 @@
+"""Quote table module."""
+
+
+import math
+from array import array
+from typing import Iterable, Mapping, NamedTuple, Sequence, Union
+
+from .models.stock import Stock, StockType
+
+Prices = Union[Mapping[str, float], Sequence[float]]
+
+
+class QuoteTable(NamedTuple):
+    """Quote table class.
+
+    Columns hold a value per stock, in the order of the names. Values that
+    can't be calculated, e.g. the dividend yield for a price of zero or the
+    P/E ratio of a stock that hasn't paid a dividend, are NaN.
+    """
+
+    names: tuple[str, ...]
+    prices: array
+    dividend_yield: array
+    p_e_ratio: array
+    volume_weighted_stock_price: array
+
+
+class StockParameters:
+    """Struct-of-arrays copy of the parameters of some stocks.
+
+    The dividend yield numerator of every stock is worked out once, as the
+    last dividend of common stocks and the fixed dividend over par value of
+    preferred ones, so dividend yields are taken for all the stocks without
+    dispatching on their type.
+
+    Args:
+        stocks (Iterable[Stock]): stocks.
+    """
+
+    def __init__(self, stocks: Iterable[Stock]):
+        listed = list(stocks)
+        self.names = tuple(stock.name for stock in listed)
+        self.positions = {name: i for i, name in enumerate(self.names)}
+        self.preferred = array(
+            "b", [stock.type == StockType.PREFERRED for stock in listed]
+        )
+        self.last_dividend = array(
+            "d", [stock.last_dividend for stock in listed]
+        )
+        self.fixed_dividend = array(
+            "d",
+            [
+                stock.fixed_dividend if preferred else math.nan
+                for stock, preferred in zip(listed, self.preferred)
+            ],
+        )
+        self.par_value = array("d", [stock.par_value for stock in listed])
+        self.dividend = array(
+            "d",
+            [
+                fixed / 100 * par if preferred else last
+                for preferred, last, fixed, par in zip(
+                    self.preferred,
+                    self.last_dividend,
+                    self.fixed_dividend,
+                    self.par_value,
+                )
+            ],
+        )
+
+    def __len__(self) -> int:
+        """Get number of stocks.
+
+        Returns:
+            int: number of stocks.
+        """
+        return len(self.names)
+
+    def price_column(self, prices: Prices) -> array:
+        """Line prices up with the stocks.
+
+        Args:
+            prices (Prices): price by stock name, or price of every stock
+                in order. Stocks without a price get NaN.
+
+        Returns:
+            array: price of every stock.
+
+        Raises:
+            ValueError: if there isn't a price for every stock in order.
+        """
+        if isinstance(prices, Mapping):
+            column = array("d", [math.nan]) * len(self)
+            positions = self.positions
+            for name, price in prices.items():
+                position = positions.get(name)
+                if position is not None:
+                    column[position] = price
+            return column
+
+        if len(prices) != len(self):
+            raise ValueError(
+                f"Got {len(prices)} prices for {len(self)} stocks."
+            )
+        return array("d", prices)
+
+    def quote(self, prices: Prices, vwsps: Sequence[float]) -> QuoteTable:
+        """Quote the stocks at some prices.
+
+        Args:
+            prices (Prices): price by stock name, or price of every stock
+                in order.
+            vwsps (Sequence[float]): volume weighted price of every stock.
+
+        Returns:
+            QuoteTable: quote table.
+        """
+        column = self.price_column(prices)
+        nan = math.nan
+        return QuoteTable(
+            self.names,
+            column,
+            array(
+                "d",
+                [
+                    dividend / price * 100 if price else nan
+                    for dividend, price in zip(self.dividend, column)
+                ],
+            ),
+            array(
+                "d",
+                [
+                    price / dividend if dividend else nan
+                    for dividend, price in zip(self.last_dividend, column)
+                ],
+            ),
+            array("d", vwsps),
+        )
@@ -0,0 +1,167 @@
+"""Trade tape replay module."""
+
+
+from array import array
+from typing import Iterable, Iterator, NamedTuple
+
+from . import Gbce
+from .clock import SimulatedClock
+from .ingest import IngestSummary
+from .tape import TapeRecord
+
+
+class Sample(NamedTuple):
+    """Replay sample class."""
+
+    timestamp: float
+    prices: dict[str, float]
+    all_share_index: float
+
+
+class SampleSeries(NamedTuple):
+    """Replay sample series class."""
+
+    timestamps: array
+    prices: dict[str, array]
+    all_share_index: array
+
+
+class TapeReplay:
+    """Trade tape replay class.
+
+    Streams a trade tape through an exchange in timestamp order and samples
+    the volume weighted stock price of every stock and the all share index
+    at a fixed interval. Trades are ingested in batches and the tape is
+    never loaded whole into memory, and the exchange needs a retention
+    policy so it doesn't keep every trade either: every stock holds at
+    most the trades its policy keeps, plus the slack, the recent ones and
+    those of the last interval, and bars for the older ones.
+
+    Args:
+        gbce (Gbce): exchange to replay the tape through. It needs a
+            simulated clock and a retention policy.
+        interval (float): seconds between samples.
+        batch_size (int): number of trades ingested at a time.
+
+    Raises:
+        ValueError: if the exchange doesn't have a simulated clock or a
+            retention policy.
+    """
+
+    def __init__(
+        self, gbce: Gbce, interval: float = 60.0, batch_size: int = 10000
+    ):
+        if not isinstance(gbce.clock, SimulatedClock):
+            raise ValueError("Replaying a tape needs a simulated clock.")
+        if gbce.retention is None:
+            raise ValueError("Replaying a tape needs a retention policy.")
+
+        self.__gbce = gbce
+        self.__clock = gbce.clock
+        self.__interval = interval
+        self.__batch_size = batch_size
+        self.summary = IngestSummary()
+
+    def samples(self, records: Iterable[TapeRecord]) -> Iterator[Sample]:
+        """Replay a tape and yield a sample at the end of every interval.
+
+        Samples are taken at multiples of the interval and only see the
+        trades done before them. A last sample is taken at the end of the
+        interval of the last trade.
+
+        Args:
+            records (Iterable[TapeRecord]): tape records in timestamp order.
+
+        Yields:
+            Sample: volume weighted stock prices and all share index.
+
+        Raises:
+            ValueError: if the records aren't in timestamp order.
+        """
+        interval = self.__interval
+        batch: list[TapeRecord] = []
+        next_sample = None
+        last = float("-inf")
+
+        for record in records:
+            timestamp = record.timestamp
+            if timestamp < last:
+                raise ValueError(
+                    f"Tape isn't in timestamp order at {timestamp}."
+                )
+            last = timestamp
+
+            if next_sample is None:
+                next_sample = (timestamp // interval + 1) * interval
+
+            while timestamp >= next_sample:
+                self.__flush(batch)
+                yield self.__sample(next_sample)
+                next_sample += interval
+
+            batch.append(record)
+            if len(batch) >= self.__batch_size:
+                self.__flush(batch)
+
+        if next_sample is not None:
+            self.__flush(batch)
+            yield self.__sample(next_sample)
+
+    def series(self, records: Iterable[TapeRecord]) -> SampleSeries:
+        """Replay a tape and collect the samples into arrays.
+
+        Args:
+            records (Iterable[TapeRecord]): tape records in timestamp order.
+
+        Returns:
+            SampleSeries: sample timestamps, volume weighted stock prices of
+                every stock and all share index.
+        """
+        series = SampleSeries(
+            array("d"),
+            {name: array("d") for name in self.__gbce.stocks},
+            array("d"),
+        )
+
+        for sample in self.samples(records):
+            series.timestamps.append(sample.timestamp)
+            series.all_share_index.append(sample.all_share_index)
+            for name, price in sample.prices.items():
+                series.prices[name].append(price)
+
+        return series
+
+    def __flush(self, batch: list[TapeRecord]) -> None:
+        """Ingest a batch of trades.
+
+        Args:
+            batch (list[TapeRecord]): records of the trades.
+        """
+        if not batch:
+            return
+
+        timestamps, names, trade_types, quantities, prices = zip(*batch)
+        offset = self.summary.accepted + len(self.summary.rejected)
+        summary = self.__gbce.ingest_trade_columns(
+            names, trade_types, quantities, prices, timestamps
+        )
+        self.summary.merge(summary, range(offset, offset + len(batch)))
+        batch.clear()
+
+    def __sample(self, timestamp: float) -> Sample:
+        """Sample the exchange.
+
+        Args:
+            timestamp (float): sample timestamp.
+
+        Returns:
+            Sample: volume weighted stock prices and all share index.
+        """
+        self.__clock.set(timestamp)
+        prices = {
+            name: stock.calculate_volume_weighted_stock_price(timestamp)
+            for name, stock in self.__gbce.stocks.items()
+        }
+        return Sample(
+            timestamp, prices, self.__gbce.calculate_all_share_index()
+        )
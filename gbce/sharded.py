@@ -0,0 +1,543 @@
+"""Multi-process sharded exchange module."""
+
+
+import logging
+import multiprocessing
+import os
+import threading
+import zlib
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from operator import itemgetter
+from types import TracebackType
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, Type
+
+from . import Gbce
+from .clock import Clock, SimulatedClock, WallClock
+from .index import Universe, combine_log_sums, sub_indices
+from .ingest import (
+    UNKNOWN_STOCK,
+    IngestSummary,
+    check_columns,
+    split_rows,
+)
+from .logger import LoggerMixin
+from .models.retention import Retention
+from .models.stock import StockType
+from .models.trade import TradeType
+from .models.window import WINDOW_LENGTH
+
+
+def shard_of(name: str, shards: int) -> int:
+    """Get the shard a stock belongs to.
+
+    The shard is taken from a stable hash of the name, so it doesn't change
+    between runs.
+
+    Args:
+        name (str): stock name.
+        shards (int): number of shards.
+
+    Returns:
+        int: shard number.
+    """
+    return zlib.crc32(name.encode()) % shards
+
+
+def take_rows(
+    columns: Sequence[Sequence], rows: Sequence[int]
+) -> tuple[Sequence, ...]:
+    """Take some rows of parallel columns.
+
+    Args:
+        columns (Sequence[Sequence]): parallel columns.
+        rows (Sequence[int]): positions of the rows to take.
+
+    Returns:
+        tuple[Sequence, ...]: values of the rows in every column.
+    """
+    if len(rows) == 1:
+        return tuple([column[rows[0]]] for column in columns)
+
+    take = itemgetter(*rows)
+    return tuple(take(column) for column in columns)
+
+
+def serve(connection: Connection, options: dict[str, Any]) -> None:
+    """Run a shard: an exchange answering requests from a connection.
+
+    Every request is an operation name, the timestamp of the coordinator
+    clock it was made at and the operation arguments, and is answered with
+    whether it succeeded and its result or the error it raised. The exchange
+    calculates as of the timestamp of every request, so shards agree with
+    the coordinator clock, simulated or not. The shard stops when the
+    connection is closed or it is asked to close.
+
+    Args:
+        connection (Connection): connection to the coordinator.
+        options (dict[str, Any]): exchange options.
+    """
+    clock = SimulatedClock()
+    gbce = Gbce(clock=clock, **options)
+    operations: dict[str, Callable[..., Any]] = {
+        "add_stock": lambda *args: gbce.add_stock(*args) is not None,
+        "ingest": gbce.ingest_trade_columns,
+        "log_sum": gbce.calculate_all_share_index_log_sum,
+        "prices": lambda names: {
+            name: gbce.stocks[name].calculate_volume_weighted_stock_price()
+            for name in names
+        },
+        "windows": gbce.calculate_volume_weighted_stock_prices,
+    }
+
+    while True:
+        try:
+            operation, now, args = connection.recv()
+        except EOFError:
+            break
+        if operation == "close":
+            connection.send((True, None))
+            break
+
+        clock.set(now)
+        try:
+            result = (True, operations[operation](*args))
+        except Exception as error:  # pylint: disable=broad-except
+            result = (False, error)
+        connection.send(result)
+
+    connection.close()
+
+
+class ShardedGbce(LoggerMixin):
+    """Exchange sharded across worker processes.
+
+    Stocks are partitioned by name hash across the shards, every one of
+    them an exchange owning its stocks in its own process, so trades of
+    different shards are recorded in parallel on different cores. Requests
+    are sent to every shard involved before any answer is awaited.
+
+    The all share index is combined from the partial log sums of the
+    shards. Bulk ingestion is the way to trade at scale, since every
+    request is a round trip to the shards.
+
+    Args:
+        shards (Optional[int]): number of worker processes. None means one
+            per CPU.
+        logger_level (Optional[int]): logger level of the exchange and its
+            shards. None leaves it as configured.
+        columnar (bool): whether stocks keep their trades in typed arrays.
+        clock (Optional[Clock]): clock trades without a timestamp are
+            stamped with, and the shards calculate as of, read once per
+            request. None means the wall clock.
+        window (float): seconds a trade is taken as recent for.
+        retention (Optional[Retention]): policy to compact the old trades of
+            every stock into bars. None keeps every trade.
+        context (Optional[BaseContext]): multiprocessing context the worker
+            processes are started with. None means the default one.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        shards: Optional[int] = None,
+        logger_level: Optional[int] = None,
+        columnar: bool = False,
+        clock: Optional[Clock] = None,
+        window: float = WINDOW_LENGTH,
+        retention: Optional[Retention] = None,
+        context: Optional[BaseContext] = None,
+    ):
+        # pylint: disable=too-many-arguments
+        super().__init__(logger_level)
+        processes: Any = (
+            context if context is not None else multiprocessing.get_context()
+        )
+
+        self.__clock = clock if clock is not None else WallClock()
+        self.__listings: dict[str, StockType] = {}
+        self.__shard_by_name: dict[str, int] = {}
+        self.__lock = threading.Lock()
+        self.__connections: list[Connection] = []
+        self.__processes: list[Any] = []
+
+        options = {
+            "logger_level": logger_level,
+            "columnar": columnar,
+            "window": window,
+            "retention": retention,
+        }
+        for _ in range(shards or os.cpu_count() or 1):
+            connection, child = processes.Pipe()
+            process = processes.Process(
+                target=serve, args=(child, options), daemon=True
+            )
+            process.start()
+            child.close()
+            self.__connections.append(connection)
+            self.__processes.append(process)
+
+    def __enter__(self) -> "ShardedGbce":
+        """Enter the exchange context.
+
+        Returns:
+            ShardedGbce: the exchange itself.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Stop the shards when leaving the exchange context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        self.close()
+
+    @property
+    def shards(self) -> int:
+        """Get number of shards.
+
+        Returns:
+            int: number of worker processes.
+        """
+        return len(self.__connections)
+
+    @property
+    def listings(self) -> dict[str, StockType]:
+        """Get the listed stocks.
+
+        Returns:
+            dict[str, StockType]: stock type by stock name.
+        """
+        return dict(self.__listings)
+
+    def close(self) -> None:
+        """Stop the shards and wait for their processes to end."""
+        with self.__lock:
+            for connection in self.__connections:
+                connection.send(("close", self.__clock.now(), ()))
+            for connection, process in zip(
+                self.__connections, self.__processes
+            ):
+                connection.recv()
+                connection.close()
+                process.join()
+            self.__connections = []
+            self.__processes = []
+
+    def __request(
+        self, requests: Mapping[int, tuple[str, tuple]]
+    ) -> dict[int, Any]:
+        """Send requests to some shards and wait for their answers.
+
+        Every request is sent with the current time of the clock.
+
+        Args:
+            requests (Mapping[int, tuple[str, tuple]]): operation name and
+                arguments by shard number.
+
+        Returns:
+            dict[int, Any]: result by shard number.
+
+        Raises:
+            RuntimeError: if the exchange is closed.
+            Exception: first error a shard raised.
+        """
+        with self.__lock:
+            if not self.__connections:
+                raise RuntimeError("The sharded exchange is closed.")
+
+            now = self.__clock.now()
+            for shard, (operation, args) in requests.items():
+                self.__connections[shard].send((operation, now, args))
+            answers = {
+                shard: self.__connections[shard].recv() for shard in requests
+            }
+
+        for succeeded, result in answers.values():
+            if not succeeded:
+                raise result
+        return {shard: result for shard, (_, result) in answers.items()}
+
+    def __broadcast(self, operation: str, *args: Any) -> list[Any]:
+        """Send a request to every shard and wait for their answers.
+
+        Args:
+            operation (str): operation name.
+            args (Any): operation arguments.
+
+        Returns:
+            list[Any]: result of every shard.
+        """
+        return list(
+            self.__request(
+                {shard: (operation, args) for shard in range(self.shards)}
+            ).values()
+        )
+
+    def add_stock(
+        self,
+        name: str,
+        stock_type: StockType,
+        last_dividend: float,
+        fixed_dividend: Optional[float],
+        par_value: float,
+    ) -> bool:
+        """Add a stock to its shard.
+
+        Args:
+            name (str): stock name.
+            stock_type (StockType): stock type.
+            last_dividend (float): stock last dividend.
+            fixed_dividend (Optional[float]): stock fixed dividend, if any.
+            par_value (float): stock par value.
+
+        Returns:
+            bool: whether the stock was added.
+        """
+        # pylint: disable=too-many-arguments
+        shard = shard_of(name, self.shards)
+        args = (name, stock_type, last_dividend, fixed_dividend, par_value)
+        added = self.__request({shard: ("add_stock", args)})[shard]
+        if added:
+            self.__listings, self.__shard_by_name = (
+                {**self.__listings, name: stock_type},
+                {**self.__shard_by_name, name: shard},
+            )
+        return added
+
+    def record_trade(
+        self,
+        name: str,
+        trade_type: TradeType,
+        quantity: float,
+        price: float,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """Record a trade of a stock.
+
+        Args:
+            name (str): stock name.
+            trade_type (TradeType): trade type.
+            quantity (float): trade quantity.
+            price (float): trade price.
+            timestamp (Optional[float]): trade timestamp. None means now.
+
+        Returns:
+            bool: whether the trade was recorded.
+        """
+        # pylint: disable=too-many-arguments
+        return bool(
+            self.ingest_trade_columns(
+                [name], [trade_type], [quantity], [price], [timestamp]
+            ).accepted
+        )
+
+    def ingest_trades(
+        self,
+        trades: Iterable[tuple[str, TradeType, float, float, Optional[float]]],
+    ) -> IngestSummary:
+        """Record trades of several stocks at once.
+
+        Args:
+            trades (Iterable[tuple]): stock name, trade type, quantity,
+                price and timestamp of every trade. A None timestamp means
+                now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+        """
+        return self.ingest_trade_columns(*split_rows(trades, 5))
+
+    def ingest_trade_columns(
+        self,
+        names: Sequence[str],
+        trade_types: Sequence[TradeType],
+        quantities: Sequence[float],
+        prices: Sequence[float],
+        timestamps: Optional[Sequence[Optional[float]]] = None,
+    ) -> IngestSummary:
+        """Record trades of several stocks given as parallel columns.
+
+        The rows are split per shard and every shard records its rows in
+        parallel with the others. Rows of unknown stocks are rejected before
+        being sent.
+
+        Args:
+            names (Sequence[str]): stock name of every trade.
+            trade_types (Sequence[TradeType]): trade type of every trade.
+            quantities (Sequence[float]): quantity of every trade.
+            prices (Sequence[float]): price of every trade.
+            timestamps (Optional[Sequence[Optional[float]]]): timestamp of
+                every trade. None, or a None timestamp, means now.
+
+        Returns:
+            IngestSummary: number of recorded trades and rejected rows.
+
+        Raises:
+            ValueError: if the columns don't have the same length.
+        """
+        # pylint: disable=too-many-arguments
+        check_columns(names, trade_types, quantities, prices, timestamps)
+        now = self.__clock.now()
+        stamps = [
+            now if timestamp is None else timestamp
+            for timestamp in (
+                timestamps if timestamps is not None else [None] * len(names)
+            )
+        ]
+        rows_by_shard, rejected = self.__split(names)
+        summary = IngestSummary(rejected=rejected)
+
+        columns = (names, trade_types, quantities, prices, stamps)
+        requests = {
+            shard: ("ingest", take_rows(columns, rows))
+            for shard, rows in rows_by_shard.items()
+        }
+        for shard, shard_summary in self.__request(requests).items():
+            summary.merge(shard_summary, rows_by_shard[shard])
+        summary.rejected.sort()
+        return summary
+
+    def __split(
+        self, names: Sequence[str]
+    ) -> tuple[dict[int, list[int]], list[tuple[int, str]]]:
+        """Split rows per shard.
+
+        Args:
+            names (Sequence[str]): stock name of every trade.
+
+        Returns:
+            tuple[dict[int, list[int]], list[tuple[int, str]]]: rows by
+                shard number, and position and reason of every row of an
+                unknown stock.
+        """
+        shard_by_name = self.__shard_by_name
+        rows_by_shard: dict[int, list[int]] = {
+            shard: [] for shard in range(self.shards)
+        }
+        rejected = []
+        for row, name in enumerate(names):
+            shard = shard_by_name.get(name)
+            if shard is None:
+                rejected.append((row, UNKNOWN_STOCK))
+            else:
+                rows_by_shard[shard].append(row)
+
+        if rejected:
+            self._log_limited(
+                logging.WARNING,
+                "",
+                "Rejected trades of unknown stocks: %s",
+                ", ".join(sorted({names[row] for row, _ in rejected})),
+            )
+        return (
+            {shard: rows for shard, rows in rows_by_shard.items() if rows},
+            rejected,
+        )
+
+    def calculate_volume_weighted_stock_price(self, name: str) -> float:
+        """Calculate the volume weighted price of a stock.
+
+        Args:
+            name (str): stock name.
+
+        Returns:
+            float: volume weighted stock price.
+
+        Raises:
+            KeyError: if there isn't a stock with that name.
+        """
+        shard = shard_of(name, self.shards)
+        return self.__request({shard: ("prices", ([name],))})[shard][name]
+
+    def calculate_volume_weighted_stock_prices(
+        self, windows: Iterable[float]
+    ) -> dict[str, dict[float, float]]:
+        """Calculate every stock's volume weighted price over several windows.
+
+        Args:
+            windows (Iterable[float]): window lengths in seconds.
+
+        Returns:
+            dict[str, dict[float, float]]: volume weighted stock price by
+                window length by stock name.
+        """
+        lengths = list(windows)
+        prices: dict[str, dict[float, float]] = {}
+        for shard_prices in self.__broadcast("windows", lengths):
+            prices.update(shard_prices)
+        return prices
+
+    def calculate_all_share_index(
+        self, universe: Optional[Universe] = None
+    ) -> float:
+        """Calculate all share index.
+
+        Every shard sums the logs of the volume weighted prices of its
+        stocks, from its incrementally maintained index, and the sums are
+        combined into the geometric mean.
+
+        Args:
+            universe (Optional[Universe]): stock type or stock names to
+                calculate the index of. None means every stock.
+
+        Returns:
+            float: share index.
+        """
+        if universe is not None:
+            return self.calculate_sub_indices({"": universe})[""]
+
+        return combine_log_sums(self.__broadcast("log_sum"))
+
+    def calculate_sub_indices(
+        self, universes: Mapping[str, Universe]
+    ) -> dict[str, float]:
+        """Calculate the index of several universes of stocks in one pass.
+
+        Every shard calculates the volume weighted price of its stocks in
+        any universe once. Unknown stock names are ignored.
+
+        Args:
+            universes (Mapping[str, Universe]): stock type or stock names of
+                every universe.
+
+        Returns:
+            dict[str, float]: index of every universe.
+        """
+        listings = self.__listings
+        members = {
+            key: [
+                name
+                for name, stock_type in listings.items()
+                if stock_type == universe
+            ]
+            if isinstance(universe, StockType)
+            else [name for name in universe if name in listings]
+            for key, universe in universes.items()
+        }
+
+        names_by_shard: dict[int, list[str]] = {}
+        for name in set().union(*members.values()):
+            names_by_shard.setdefault(shard_of(name, self.shards), []).append(
+                name
+            )
+
+        prices: dict[str, float] = {}
+        for shard_prices in self.__request(
+            {
+                shard: ("prices", (names,))
+                for shard, names in names_by_shard.items()
+            }
+        ).values():
+            prices.update(shard_prices)
+
+        return sub_indices(prices, members)
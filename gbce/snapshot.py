@@ -0,0 +1,172 @@
+"""Exchange snapshot module."""
+
+
+import math
+import mmap
+import os
+import struct
+from array import array
+from functools import partial
+from typing import Iterable, NamedTuple, Optional
+
+from .models.stock import Stock, StockType, TradeLoader
+from .tape import NAME_SIZE, Path, encode_name
+
+MAGIC = b"GBCE"
+VERSION = 1
+
+# Magic, format version and number of stocks.
+HEADER = struct.Struct("<4sHI")
+
+# Stock name, stock type code, last dividend, fixed dividend, par value,
+# number of trades and offset of the trade columns. A missing fixed dividend
+# is written as NaN.
+ENTRY = struct.Struct(f"<{NAME_SIZE}sBdddQQ")
+
+# Bytes per trade: type code, quantity, price and timestamp.
+TRADE_SIZE = 1 + 3 * 8
+
+STOCK_TYPES = tuple(StockType)
+STOCK_TYPE_CODES = {
+    stock_type: code for code, stock_type in enumerate(STOCK_TYPES)
+}
+
+
+class SnapshotEntry(NamedTuple):
+    """Snapshot stock entry class."""
+
+    name: str
+    stock_type: StockType
+    last_dividend: float
+    fixed_dividend: Optional[float]
+    par_value: float
+    trade_count: int
+    load: TradeLoader
+
+
+def write_snapshot(path: Path, stocks: Iterable[Stock]) -> int:
+    """Write the parameters and trades of some stocks to a snapshot.
+
+    The snapshot starts with a header and a directory of fixed size entries,
+    one per stock, followed by the trade columns of every stock as typed
+    arrays. The columns of every stock are copied first, so the directory
+    matches them while the stocks trade, and the snapshot is written to a
+    temporary file that then replaces it, so a crash never leaves a
+    partial snapshot behind.
+
+    Args:
+        path (Path): snapshot path.
+        stocks (Iterable[Stock]): stocks to write.
+
+    Returns:
+        int: number of written stocks.
+
+    Raises:
+        ValueError: if a stock name is longer than its field.
+    """
+    columns = [
+        (encode_name(stock.name), stock, stock.trade_columns())
+        for stock in stocks
+    ]
+
+    offset = HEADER.size + len(columns) * ENTRY.size
+    partial_path = f"{os.fspath(path)}.tmp"
+    with open(partial_path, "wb") as snapshot:
+        snapshot.write(HEADER.pack(MAGIC, VERSION, len(columns)))
+        for name, stock, (codes, *_) in columns:
+            snapshot.write(
+                ENTRY.pack(
+                    name,
+                    STOCK_TYPE_CODES[stock.type],
+                    stock.last_dividend,
+                    math.nan
+                    if stock.fixed_dividend is None
+                    else stock.fixed_dividend,
+                    stock.par_value,
+                    len(codes),
+                    offset,
+                )
+            )
+            offset += len(codes) * TRADE_SIZE
+
+        for *_, stock_columns in columns:
+            for column in stock_columns:
+                snapshot.write(column)
+
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+
+    os.replace(partial_path, path)
+    return len(columns)
+
+
+def read_snapshot(path: Path) -> list[SnapshotEntry]:
+    """Read the directory of a snapshot.
+
+    The snapshot is memory-mapped and the trades of every stock are only
+    decoded when its entry loader is called. The mapping is kept while any
+    loader is.
+
+    Args:
+        path (Path): snapshot path.
+
+    Returns:
+        list[SnapshotEntry]: parameters and trade loader of every stock.
+
+    Raises:
+        ValueError: if the file isn't a snapshot of a supported version.
+    """
+    with open(path, "rb") as snapshot:
+        data = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} isn't a GBCE snapshot.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}.")
+
+    return [
+        SnapshotEntry(
+            name.rstrip(b"\0").decode(),
+            STOCK_TYPES[code],
+            last_dividend,
+            None if math.isnan(fixed_dividend) else fixed_dividend,
+            par_value,
+            trades,
+            partial(load_trades, data, offset, trades),
+        )
+        for (
+            name,
+            code,
+            last_dividend,
+            fixed_dividend,
+            par_value,
+            trades,
+            offset,
+        ) in ENTRY.iter_unpack(
+            data[slice(HEADER.size, HEADER.size + count * ENTRY.size)]
+        )
+    ]
+
+
+def load_trades(
+    data: mmap.mmap, offset: int, count: int
+) -> tuple[array, array, array, array]:
+    """Decode the trade columns of a stock.
+
+    Args:
+        data (mmap.mmap): memory-mapped snapshot.
+        offset (int): offset of the trade columns.
+        count (int): number of trades.
+
+    Returns:
+        tuple[array, array, array, array]: trade type codes, quantities,
+            prices and timestamps of the trades.
+    """
+    size = count * 8
+    codes = array("b", data[slice(offset, offset + count)])
+    offset += count
+    quantities = array("d", data[slice(offset, offset + size)])
+    prices = array("d", data[slice(offset + size, offset + 2 * size)])
+    timestamps = array("d", data[slice(offset + 2 * size, offset + 3 * size)])
+    return codes, quantities, prices, timestamps
@@ -0,0 +1,298 @@
+"""Subscriptions module."""
+
+
+import asyncio
+import math
+import threading
+from types import TracebackType
+from typing import Any, Callable, NamedTuple, Optional, Type
+
+from .clock import Clock, WallClock
+from .logger import LoggerMixin
+
+
+class Change(NamedTuple):
+    """Notified change of a subscribed value.
+
+    The previous value is the one notified last, or NaN for the first
+    notification.
+    """
+
+    subject: Any
+    value: float
+    previous: float
+    timestamp: float
+
+
+Callback = Callable[[Change], Any]
+
+# Value as of a timestamp, and timestamp after which it may change even
+# without being marked, if any.
+Reader = Callable[[float], tuple[float, Optional[float]]]
+
+
+class Subscription:
+    """Subscription to a value, e.g. a volume weighted stock price.
+
+    The value is only read again once it's marked as changed, e.g. by a
+    trade listener, or once it may have changed on its own, e.g. when a
+    recent trade expires. The callback is called when the value has moved
+    by more than the threshold since the last notification, and at most
+    once per interval: changes within the interval are coalesced into one
+    notification at the end of it.
+
+    Subscriptions are checked by a notifier.
+
+    Args:
+        subject (Any): what the value is about, e.g. a stock name.
+        read (Reader): reader of the value.
+        callback (Callback): callable the changes are notified to.
+        threshold (float): change notifications need to exceed.
+        interval (float): seconds between notifications.
+        unsubscribe (Optional[Callable[[], Any]]): callable that stops the
+            value from being marked, called when cancelled.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        subject: Any,
+        read: Reader,
+        callback: Callback,
+        threshold: float = 0.0,
+        interval: float = 0.0,
+        unsubscribe: Optional[Callable[[], Any]] = None,
+    ):
+        # pylint: disable=too-many-arguments
+        self.subject = subject
+        self.callback = callback
+        self.threshold = threshold
+        self.interval = interval
+        self.__read = read
+        self.__unsubscribe = unsubscribe
+        self.__changed = True
+        self.__expiry: Optional[float] = None
+        self.__value = math.nan
+        self.__notified_at = -math.inf
+        self.__cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        """Get whether the subscription is cancelled.
+
+        Returns:
+            bool: whether the subscription is cancelled.
+        """
+        return self.__cancelled
+
+    def mark(self, *_: Any) -> None:
+        """Mark the value as changed.
+
+        Takes and ignores any arguments, so it can be used as a trade
+        listener.
+
+        Args:
+            _ (Any): ignored arguments.
+        """
+        self.__changed = True
+
+    def cancel(self) -> None:
+        """Stop notifying changes."""
+        self.__cancelled = True
+        if self.__unsubscribe is not None:
+            self.__unsubscribe()
+
+    def check(self, now: float) -> Optional[Change]:
+        """Check whether a change needs to be notified.
+
+        Args:
+            now (float): current timestamp.
+
+        Returns:
+            Change: change to notify.
+            None: if there isn't any, or the interval hasn't passed yet.
+        """
+        if self.__cancelled or now - self.__notified_at < self.interval:
+            return None
+
+        if not self.__changed and (
+            self.__expiry is None or now <= self.__expiry
+        ):
+            return None
+
+        # Cleared before reading, so a mark in between isn't lost.
+        self.__changed = False
+        value, self.__expiry = self.__read(now)
+        previous = self.__value
+        if not math.isnan(previous) and not (
+            abs(value - previous) > self.threshold
+        ):
+            return None
+
+        self.__value = value
+        self.__notified_at = now
+        return Change(self.subject, value, previous, now)
+
+
+def queue_callback(
+    queue: "asyncio.Queue[Change]", loop: asyncio.AbstractEventLoop
+) -> Callback:
+    """Get a callback that puts the changes in an asyncio queue.
+
+    The callback can be called from any thread.
+
+    Args:
+        queue (asyncio.Queue[Change]): unbounded queue.
+        loop (asyncio.AbstractEventLoop): event loop of the queue.
+
+    Returns:
+        Callback: callback.
+    """
+
+    def put(change: Change) -> None:
+        """Put a change in the queue from the event loop.
+
+        Args:
+            change (Change): change.
+        """
+        loop.call_soon_threadsafe(queue.put_nowait, change)
+
+    return put
+
+
+class Notifier(LoggerMixin):
+    """Notifier of the changes of some subscriptions.
+
+    Checks every subscription when dispatched, either by calling dispatch,
+    e.g. with a simulated clock, or every period from a background thread.
+    Errors raised by callbacks are logged and don't stop the other
+    subscriptions from being notified.
+
+    Args:
+        clock (Optional[Clock]): clock intervals are measured with. None
+            means the wall clock.
+        logger_level (Optional[int]): logger level. None leaves it as
+            configured.
+    """
+
+    __subscriptions: list[Subscription]
+
+    def __init__(
+        self,
+        clock: Optional[Clock] = None,
+        logger_level: Optional[int] = None,
+    ):
+        super().__init__(logger_level)
+        self.__clock = clock if clock is not None else WallClock()
+        self.__subscriptions = []
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "Notifier":
+        """Enter the notifier context.
+
+        Returns:
+            Notifier: the notifier itself.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Stop the notifier when leaving its context.
+
+        Args:
+            exc_type (Optional[Type[BaseException]]): exception type.
+            exc (Optional[BaseException]): exception.
+            traceback (Optional[TracebackType]): exception traceback.
+        """
+        self.close()
+
+    def __len__(self) -> int:
+        """Get number of subscriptions.
+
+        Returns:
+            int: number of subscriptions that aren't cancelled.
+        """
+        return sum(
+            not subscription.cancelled for subscription in self.__subscriptions
+        )
+
+    def add(self, subscription: Subscription) -> Subscription:
+        """Add a subscription.
+
+        Args:
+            subscription (Subscription): subscription.
+
+        Returns:
+            Subscription: added subscription.
+        """
+        with self.__lock:
+            self.__subscriptions = [*self.__subscriptions, subscription]
+        return subscription
+
+    def dispatch(self) -> int:
+        """Check every subscription and notify their changes.
+
+        Returns:
+            int: number of notified changes.
+        """
+        subscriptions = self.__subscriptions
+        if any(subscription.cancelled for subscription in subscriptions):
+            with self.__lock:
+                self.__subscriptions = [
+                    subscription
+                    for subscription in self.__subscriptions
+                    if not subscription.cancelled
+                ]
+            subscriptions = self.__subscriptions
+
+        now = self.__clock.now()
+        notified = 0
+        for subscription in subscriptions:
+            change = subscription.check(now)
+            if change is None:
+                continue
+
+            try:
+                subscription.callback(change)
+            except Exception:  # pylint: disable=broad-except
+                self._log.exception(
+                    "Failed to notify a change of %s.", change.subject
+                )
+            notified += 1
+        return notified
+
+    def start(self, period: float = 0.1) -> None:
+        """Dispatch every period from a background thread.
+
+        Args:
+            period (float): seconds between dispatches.
+        """
+        if self.__thread is None:
+            self.__stop.clear()
+            self.__thread = threading.Thread(
+                target=self.__run, args=(period,), daemon=True
+            )
+            self.__thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread, if started."""
+        if self.__thread is not None:
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self, period: float) -> None:
+        """Dispatch every period until stopped.
+
+        Args:
+            period (float): seconds between dispatches.
+        """
+        while not self.__stop.wait(period):
+            self.dispatch()
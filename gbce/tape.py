@@ -0,0 +1,173 @@
+"""Trade tape module."""
+
+
+import csv
+import os
+import struct
+from typing import Iterable, Iterator, NamedTuple, Union
+
+from .models.store.columnar import TRADE_TYPE_CODES, TRADE_TYPES
+from .models.trade import TradeType
+
+Path = Union[str, os.PathLike]
+
+# Bytes a stock name takes in binary records, snapshots and publications.
+NAME_SIZE = 16
+
+# Timestamp, stock name, trade type code, quantity and price.
+RECORD = struct.Struct(f"<d{NAME_SIZE}sBdd")
+
+
+class TapeRecord(NamedTuple):
+    """Trade tape record class."""
+
+    timestamp: float
+    stock: str
+    trade_type: TradeType
+    quantity: float
+    price: float
+
+
+def name_fits(name: str) -> bool:
+    """Check whether a stock name fits a fixed size binary field.
+
+    Args:
+        name (str): stock name.
+
+    Returns:
+        bool: whether the UTF-8 encoded name is at most the field size.
+    """
+    return len(name.encode()) <= NAME_SIZE
+
+
+def encode_name(name: str) -> bytes:
+    """Encode a stock name for a fixed size binary field.
+
+    Args:
+        name (str): stock name.
+
+    Returns:
+        bytes: UTF-8 encoded name.
+
+    Raises:
+        ValueError: if the encoded name is longer than the field, since it
+            would be truncated.
+    """
+    if not name_fits(name):
+        raise ValueError(
+            f"Stock name {name} is longer than {NAME_SIZE} bytes."
+        )
+    return name.encode()
+
+
+def pack(record: TapeRecord) -> bytes:
+    """Pack a record into its fixed size binary form.
+
+    Args:
+        record (TapeRecord): record to pack.
+
+    Returns:
+        bytes: packed record.
+
+    Raises:
+        ValueError: if the stock name is longer than its field.
+    """
+    return RECORD.pack(
+        record.timestamp,
+        encode_name(record.stock),
+        TRADE_TYPE_CODES[record.trade_type],
+        record.quantity,
+        record.price,
+    )
+
+
+def unpack(data: bytes) -> Iterator[TapeRecord]:
+    """Unpack consecutive binary records.
+
+    Args:
+        data (bytes): packed records.
+
+    Yields:
+        TapeRecord: unpacked record.
+    """
+    for timestamp, name, code, quantity, price in RECORD.iter_unpack(data):
+        yield TapeRecord(
+            timestamp,
+            name.rstrip(b"\0").decode(),
+            TRADE_TYPES[code],
+            quantity,
+            price,
+        )
+
+
+def read_binary(path: Path, chunk_size: int = 65536) -> Iterator[TapeRecord]:
+    """Stream the records of a binary tape.
+
+    Args:
+        path (Path): tape path.
+        chunk_size (int): number of records read at a time.
+
+    Yields:
+        TapeRecord: tape record.
+    """
+    with open(path, "rb") as tape:
+        while chunk := tape.read(chunk_size * RECORD.size):
+            yield from unpack(chunk)
+
+
+def write_binary(path: Path, records: Iterable[TapeRecord]) -> int:
+    """Write records to a binary tape.
+
+    Args:
+        path (Path): tape path.
+        records (Iterable[TapeRecord]): records to write.
+
+    Returns:
+        int: number of written records.
+
+    Raises:
+        ValueError: if a stock name is longer than its field.
+    """
+    count = 0
+    with open(path, "wb") as tape:
+        for record in records:
+            tape.write(pack(record))
+            count += 1
+    return count
+
+
+def read_csv(path: Path) -> Iterator[TapeRecord]:
+    """Stream the records of a CSV tape.
+
+    Every row holds the timestamp, stock name, trade type, quantity and
+    price of a trade. A first row that doesn't start with a number is taken
+    as a header and skipped.
+
+    Args:
+        path (Path): tape path.
+
+    Yields:
+        TapeRecord: tape record.
+
+    Raises:
+        ValueError: if a row other than the first one is invalid.
+    """
+    with open(path, newline="", encoding="utf-8") as tape:
+        rows = csv.reader(tape)
+        for number, (timestamp, stock, side, quantity, price) in enumerate(
+            rows
+        ):
+            try:
+                time = float(timestamp)
+            except ValueError:
+                if number:
+                    raise
+                continue
+
+            yield TapeRecord(
+                time,
+                stock,
+                TradeType(side.capitalize()),
+                float(quantity),
+                float(price),
+            )
@@ -0,0 +1,368 @@
+"""Exchange view module."""
+
+
+import heapq
+import math
+import threading
+from typing import Iterator, Mapping, Optional, Union
+
+from .index import DirtySet, geometric_mean
+from .models.stock import Stock, StockType
+
+
+class StockView:
+    """Immutable point-in-time view of a stock.
+
+    Holds a copy of the stock type and parameters, and the state of its
+    recent trades as of the view timestamp, so relisting the stock doesn't
+    change it.
+
+    Args:
+        stock (Stock): stock to view.
+        now (float): view timestamp.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, stock: Stock, now: float):
+        self.__name = stock.name
+        self.__type = stock.type
+        self.__last_dividend = stock.last_dividend
+        self.__fixed_dividend = stock.fixed_dividend
+        self.__par_value = stock.par_value
+        self.__timestamp = now
+        price_x_qty, quantity, expiry = stock.window_state(now)
+        self.__volume = quantity
+        self.__vwsp = price_x_qty / quantity if quantity else 0
+        self.__expiry = expiry
+
+    def __repr__(self) -> str:
+        """Get representation of a StockView object.
+
+        Returns:
+            str: representation of a StockView object.
+        """
+        return (
+            f'<{self.__class__.__qualname__} "{self.name}" '
+            f"at {self.__timestamp}>"
+        )
+
+    @property
+    def name(self) -> str:
+        """Get stock name.
+
+        Returns:
+            str: stock name.
+        """
+        return self.__name
+
+    @property
+    def type(self) -> StockType:
+        """Get stock type.
+
+        Returns:
+            StockType: stock type.
+        """
+        return self.__type
+
+    @property
+    def last_dividend(self) -> float:
+        """Get last dividend.
+
+        Returns:
+            float: stock last dividend.
+        """
+        return self.__last_dividend
+
+    @property
+    def fixed_dividend(self) -> float:
+        """Get fixed dividend.
+
+        Returns:
+            float: stock fixed dividend.
+        """
+        return self.__fixed_dividend
+
+    @property
+    def par_value(self) -> float:
+        """Get par value.
+
+        Returns:
+            float: stock par value.
+        """
+        return self.__par_value
+
+    @property
+    def timestamp(self) -> float:
+        """Get view timestamp.
+
+        Returns:
+            float: timestamp the view was taken at.
+        """
+        return self.__timestamp
+
+    @property
+    def volume(self) -> float:
+        """Get recent volume.
+
+        Returns:
+            float: quantity traded in the window.
+        """
+        return self.__volume
+
+    @property
+    def volume_weighted_stock_price(self) -> float:
+        """Get volume weighted stock price.
+
+        Returns:
+            float: volume weighted stock price or 0 if there were no recent
+                trades.
+        """
+        return self.__vwsp
+
+    def calculate_dividend_yield(
+        self, price: Optional[float] = None
+    ) -> Union[float, None]:
+        """Calculate the dividend yield of the stock.
+
+        Args:
+            price (Optional[float]): stock price. None means the volume
+                weighted stock price.
+
+        Returns:
+            float: dividend yield percentage.
+            None: if price is 0.
+        """
+        if price is None:
+            price = self.__vwsp
+        if not price:
+            return None
+
+        if self.__type == StockType.PREFERRED:
+            return self.__fixed_dividend / 100 * self.__par_value / price * 100
+        return self.__last_dividend / price * 100
+
+    def calculate_p_e_ratio(
+        self, price: Optional[float] = None
+    ) -> Union[float, None]:
+        """Calculate P/E ratio.
+
+        Args:
+            price (Optional[float]): stock price. None means the volume
+                weighted stock price.
+
+        Returns:
+            float: P/E ratio.
+            None: if last dividend is zero.
+        """
+        if not self.__last_dividend:
+            return None
+
+        return (self.__vwsp if price is None else price) / self.__last_dividend
+
+    @property
+    def expiry(self) -> Optional[float]:
+        """Get the expiry of the oldest recent trade.
+
+        Returns:
+            float: timestamp after which the view no longer holds.
+            None: if there are no recent trades.
+        """
+        return self.__expiry
+
+    def is_current(self, now: float) -> bool:
+        """Check whether the view still holds at a later time.
+
+        Only tells whether a recent trade has expired since; trades
+        recorded since are tracked by the view cache.
+
+        Args:
+            now (float): timestamp to check.
+
+        Returns:
+            bool: whether no recent trade has expired by then.
+        """
+        return now >= self.__timestamp and (
+            self.__expiry is None or now <= self.__expiry
+        )
+
+
+class ExchangeView(Mapping[str, StockView]):
+    """Immutable point-in-time view of an exchange.
+
+    Args:
+        timestamp (float): view timestamp.
+        stocks (Mapping[str, StockView]): view of every stock by name.
+    """
+
+    def __init__(self, timestamp: float, stocks: Mapping[str, StockView]):
+        self.__timestamp = timestamp
+        self.__stocks = stocks
+        self.__index: Optional[float] = None
+
+    def __getitem__(self, name: str) -> StockView:
+        """Get the view of a stock.
+
+        Args:
+            name (str): stock name.
+
+        Returns:
+            StockView: stock view.
+        """
+        return self.__stocks[name]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the stock names.
+
+        Returns:
+            Iterator[str]: stock names.
+        """
+        return iter(self.__stocks)
+
+    def __len__(self) -> int:
+        """Get number of stocks.
+
+        Returns:
+            int: number of stocks.
+        """
+        return len(self.__stocks)
+
+    @property
+    def timestamp(self) -> float:
+        """Get view timestamp.
+
+        Returns:
+            float: timestamp the view was taken at.
+        """
+        return self.__timestamp
+
+    @property
+    def all_share_index(self) -> float:
+        """Get the all share index of the viewed stocks.
+
+        Returns:
+            float: geometric mean of the positive volume weighted stock
+                prices or 0 if there are none.
+        """
+        if self.__index is None:
+            self.__index = geometric_mean(
+                view.volume_weighted_stock_price
+                for view in self.__stocks.values()
+            )
+        return self.__index
+
+
+class ViewCache:
+    """Cache of stock views shared between exchange views.
+
+    A new exchange view reuses the stock views of the previous one for the
+    stocks that haven't traded, and whose recent trades haven't expired,
+    since. While the stocks dictionary stays the same, the changed stocks
+    are found from the marked names and a heap of view expiries, so taking
+    a view only views them again and copies the stock views once.
+    """
+
+    __views: dict[str, StockView]
+
+    def __init__(self) -> None:
+        self.__views = {}
+        self.__stocks: Optional[Mapping[str, Stock]] = None
+        self.__timestamp = -math.inf
+        self.__expiries: list[tuple[float, str]] = []
+        self.__dirty = DirtySet()
+        self.__lock = threading.Lock()
+
+    def mark(self, name: str) -> None:
+        """Mark a stock to be viewed again on the next view.
+
+        Args:
+            name (str): stock name.
+        """
+        self.__dirty.add(name)
+
+    def view(self, stocks: Mapping[str, Stock], now: float) -> ExchangeView:
+        """Take a view of the stocks.
+
+        Args:
+            stocks (Mapping[str, Stock]): stocks by name.
+            now (float): view timestamp.
+
+        Returns:
+            ExchangeView: exchange view.
+        """
+        with self.__lock:
+            dirty = self.__dirty.take()
+            if stocks is self.__stocks and now >= self.__timestamp:
+                views = self.__update(stocks, now, dirty)
+            else:
+                views = self.__rebuild(stocks, now, dirty)
+
+            self.__views = views
+            self.__stocks = stocks
+            self.__timestamp = now
+
+        return ExchangeView(now, views)
+
+    def __update(
+        self, stocks: Mapping[str, Stock], now: float, dirty: set[str]
+    ) -> dict[str, StockView]:
+        """View again the stocks that have changed since the last view.
+
+        The lock must be held.
+
+        Args:
+            stocks (Mapping[str, Stock]): stocks by name, the same as on
+                the last view.
+            now (float): view timestamp, not before the last one.
+            dirty (set[str]): names of the marked stocks.
+
+        Returns:
+            dict[str, StockView]: view of every stock by name.
+        """
+        views = self.__views
+        expiries = self.__expiries
+        changed = {name for name in dirty if name in stocks}
+        while expiries and expiries[0][0] < now:
+            expiry, name = heapq.heappop(expiries)
+            if name in views and views[name].expiry == expiry:
+                changed.add(name)
+        if not changed:
+            return views
+
+        views = dict(views)
+        for name in changed:
+            views[name] = view = StockView(stocks[name], now)
+            if view.expiry is not None:
+                heapq.heappush(expiries, (view.expiry, name))
+        return views
+
+    def __rebuild(
+        self, stocks: Mapping[str, Stock], now: float, dirty: set[str]
+    ) -> dict[str, StockView]:
+        """View the stocks, reusing the stock views that still hold.
+
+        The lock must be held.
+
+        Args:
+            stocks (Mapping[str, Stock]): stocks by name.
+            now (float): view timestamp.
+            dirty (set[str]): names of the marked stocks.
+
+        Returns:
+            dict[str, StockView]: view of every stock by name.
+        """
+        previous = self.__views
+        views = {}
+        for name, stock in stocks.items():
+            view = previous.get(name)
+            if view is None or name in dirty or not view.is_current(now):
+                view = StockView(stock, now)
+            views[name] = view
+
+        self.__expiries = [
+            (view.expiry, name)
+            for name, view in views.items()
+            if view.expiry is not None
+        ]
+        heapq.heapify(self.__expiries)
+        return views
@@ -5,7 +5,7 @@ from setuptools import find_packages, setup
 
 setup(
     name="gbce",
-    packages=find_packages(exclude=["tests*"]),
+    packages=find_packages(exclude=["tests*", "benchmarks*"]),
     version="0.1",
     extras_require={
         "test": [
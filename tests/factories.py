@@ -26,6 +26,7 @@ class CommonStockFactory(factory.Factory):
     last_dividend = 8
     fixed_dividend = None
     par_value = 100
+    columnar = False
 
 
 class PreferredStockFactory(factory.Factory):
@@ -43,6 +44,7 @@ class PreferredStockFactory(factory.Factory):
     last_dividend = 8
     fixed_dividend = 2
     par_value = 100
+    columnar = False
 
 
 class TradeFactory(factory.Factory):
@@ -0,0 +1,169 @@
+"""gbce.aio module tests."""
+
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gbce import Gbce
+from gbce.aio import AsyncGbce
+from gbce.clock import SimulatedClock
+from gbce.ingest import UNKNOWN_STOCK
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+
+
+@pytest.fixture
+def gbce():
+    """GBCE with a simulated clock and some stocks."""
+    gbce = Gbce(clock=SimulatedClock(1000))
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    return gbce
+
+
+def test_submit(gbce):
+    """Submitted trades are recorded and can be queried."""
+    # Given
+    exchange = AsyncGbce(gbce)
+
+    async def trade():
+        async with exchange:
+            exchange.start()
+            await exchange.submit("TEA", TradeType.BUY, 1, 2)
+            await exchange.submit("GIN", TradeType.SELL, 1, 8, 999)
+            await exchange.flush()
+            assert exchange.pending == 0
+            return (
+                exchange.summary,
+                await exchange.calculate_all_share_index(),
+                await exchange.calculate_volume_weighted_stock_price("TEA"),
+            )
+
+    # When
+    summary, index, price = asyncio.run(trade())
+
+    # Then
+    assert summary.accepted == 2
+    assert index == pytest.approx(4)
+    assert price == 2
+    assert gbce.stocks["TEA"].trades[0].timestamp == 1000
+    assert gbce.stocks["GIN"].trades[0].timestamp == 999
+
+
+def test_submit_all(gbce):
+    """Trades of an async iterable are submitted in micro-batches."""
+    # Given
+    exchange = AsyncGbce(gbce, batch_size=2)
+
+    async def trades():
+        for index in range(5):
+            name = "XXX" if index == 3 else "TEA"
+            yield name, TradeType.BUY, 1, index + 1, None
+
+    async def trade():
+        async with exchange:
+            count = await exchange.submit_all(trades())
+        return count, exchange.summary
+
+    # When
+    count, summary = asyncio.run(trade())
+
+    # Then
+    assert count == 5
+    assert summary.accepted == 4
+    assert summary.rejected == [(3, UNKNOWN_STOCK)]
+    assert len(gbce.stocks["TEA"].trades) == 4
+
+
+def test_submit_waits_while_queue_is_full(gbce):
+    """Submitting waits while the queue is full."""
+    # Given
+    release = threading.Event()
+    executor = ThreadPoolExecutor(1)
+    executor.submit(release.wait)
+
+    async def trade():
+        exchange = AsyncGbce(gbce, max_pending=2, executor=executor)
+        exchange.start()
+        for _ in range(2):
+            await exchange.submit("TEA", TradeType.BUY, 1, 2)
+        await asyncio.sleep(0.01)
+        for _ in range(2):
+            await exchange.submit("TEA", TradeType.BUY, 1, 2)
+
+        blocked = asyncio.create_task(
+            exchange.submit("TEA", TradeType.BUY, 1, 2)
+        )
+        await asyncio.sleep(0.01)
+        waited = not blocked.done()
+
+        release.set()
+        await blocked
+        await exchange.close()
+        await exchange.close()
+        return waited, exchange.summary
+
+    # When
+    waited, summary = asyncio.run(trade())
+    executor.shutdown()
+
+    # Then
+    assert waited
+    assert summary.accepted == 5
+
+
+def test_submit_before_start(gbce):
+    """Trades can't be submitted before starting."""
+    # Given
+    exchange = AsyncGbce(gbce)
+
+    # When / Then
+    with pytest.raises(RuntimeError):
+        asyncio.run(exchange.submit("TEA", TradeType.BUY, 1, 2))
+    asyncio.run(exchange.flush())
+    assert exchange.pending == 0
+    assert exchange.gbce is gbce
+
+
+def test_failed_batch(gbce, mocker):
+    """The error a batch fails with is raised to the producers."""
+    # Given
+    mocker.patch.object(
+        gbce, "ingest_trade_columns", side_effect=ValueError("failed")
+    )
+
+    async def trade():
+        async with AsyncGbce(gbce) as exchange:
+            await exchange.submit("TEA", TradeType.BUY, 1, 2)
+            with pytest.raises(ValueError):
+                await exchange.flush()
+            await exchange.flush()
+
+    # When / Then
+    asyncio.run(trade())
+
+
+def test_subscribe(gbce):
+    """Changes are put in the queue of a subscription."""
+    # Given
+    exchange = AsyncGbce(gbce)
+
+    async def subscribe():
+        async with exchange:
+            queue, subscription = exchange.subscribe("TEA")
+            await exchange.submit("TEA", TradeType.BUY, 1, 2)
+            await exchange.flush()
+            gbce.notifier.dispatch()
+            change = await asyncio.wait_for(queue.get(), 5)
+            subscription.cancel()
+            return change
+
+    # When
+    change = asyncio.run(subscribe())
+
+    # Then
+    assert (change.subject, change.value, change.timestamp) == ("TEA", 2, 1000)
+    assert not gbce.notifier
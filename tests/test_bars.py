@@ -0,0 +1,152 @@
+"""gbce.models.bars module tests."""
+
+
+import pytest
+
+from gbce.models.bars import Bar, BarAggregator, BarSeries
+from gbce.models.trade import TradeType
+
+
+@pytest.fixture
+def bars():
+    """Series of one minute bars with some trades."""
+    bars = BarSeries(60)
+    bars.extend([0, 10, 20, 30, 70], [5, 7, 3, 6, 8], [1, 2, 1, 1, 2])
+    return bars
+
+
+def test_bars(bars):
+    """Trades are rolled up into bars."""
+    # When / Then
+    assert len(bars) == 2
+    assert bars[0] == Bar(0, 5, 7, 3, 6, 5, 5.6)
+    assert bars[-1] == Bar(60, 8, 8, 8, 8, 2, 8)
+    assert bars[:1] == [bars[0]]
+    with pytest.raises(IndexError):
+        bars[2]  # pylint: disable=pointless-statement
+
+
+def test_late_trade_in_existing_bar(bars):
+    """Late trades update the high, low and volume of their bar."""
+    # When
+    bars.add(50, 1, 4)
+
+    # Then
+    assert bars[0] == Bar(0, 5, 7, 1, 6, 9, 32 / 9)
+    assert bars[1].close == 8
+
+
+def test_late_trade_in_new_bar(bars):
+    """Late trades open their bar if there isn't one."""
+    # When
+    bars.add(-30, 2, 1)
+
+    # Then
+    assert bars[0] == Bar(-60, 2, 2, 2, 2, 1, 2)
+    assert len(bars) == 3
+
+
+def test_empty_bar_vwap():
+    """Bars without volume have no volume weighted price."""
+    # Given
+    bars = BarSeries(60)
+    bars.add(0, 5, 0)
+
+    # When / Then
+    assert bars[0].vwap == 0
+
+
+def test_buy_and_sell_volume():
+    """Bar volume is split into buy and sell volume by trade type."""
+    # Given
+    bars = BarSeries(60)
+
+    # When
+    bars.extend(
+        [0, 10, 20, 70],
+        [5, 7, 3, 8],
+        [1, 2, 4, 2],
+        [TradeType.BUY, TradeType.SELL, TradeType.BUY, TradeType.SELL],
+    )
+    bars.add(30, 6, 1)
+
+    # Then
+    assert bars[0] == Bar(0, 5, 7, 3, 3, 8, 4.625, 5, 2)
+    assert bars[1] == Bar(60, 8, 8, 8, 8, 2, 8, 0, 2)
+
+
+def test_view(bars):
+    """Completed bars can be read without copying them while trades go on."""
+    # When
+    with bars.view() as view:
+        bars.add(200, 1, 1)
+        bars.add(10, 9, 1)
+        closes = view["closes"].tolist()
+        volumes = view["volumes"].tolist()
+        with pytest.raises(TypeError):
+            view["closes"][0] = 0
+
+    # Then
+    assert closes == [6]
+    assert volumes == [6]
+    assert len(bars) == 3
+    assert bars[0].volume == 6
+
+
+def test_view_while_the_series_grows():
+    """Views stay valid while the columns grow past their capacity."""
+    # Given
+    bars = BarSeries(60, capacity=0)
+    bars.add(0, 5, 1)
+    bars.add(60, 6, 1)
+
+    # When
+    with bars.view() as view:
+        for minute in range(2, 10):
+            bars.add(minute * 60, minute, 1)
+        bars.add(-60, 4, 1)
+        starts = view["starts"].tolist()
+
+    # Then
+    assert starts == [0]
+    assert len(bars) == 11
+    assert [first.start for first in bars[:3]] == [-60, 0, 60]
+    assert bars[-1] == Bar(540, 9, 9, 9, 9, 1, 9)
+
+
+def test_view_current_bar(bars):
+    """The current bar can also be read."""
+    # When
+    with bars.view(completed=False) as view:
+        starts = view["starts"].tolist()
+
+    # Then
+    assert starts == [0, 60]
+
+
+def test_view_no_bars():
+    """Views of a series without bars are empty."""
+    # When
+    with BarSeries(60).view() as view:
+        # Then
+        assert not view["opens"]
+
+
+def test_aggregator():
+    """Trades are aggregated into bars at every resolution."""
+    # Given
+    aggregator = BarAggregator([1, 60])
+
+    # When
+    aggregator(
+        None, [TradeType.BUY, TradeType.SELL], [1, 2], [5, 7], [0.5, 30]
+    )
+    aggregator.add_resolutions([60, 300])
+
+    # Then
+    assert aggregator[1][:] == [
+        Bar(0, 5, 5, 5, 5, 1, 5, 1, 0),
+        Bar(30, 7, 7, 7, 7, 2, 7, 0, 2),
+    ]
+    assert aggregator[60][:] == [Bar(0, 5, 7, 5, 7, 3, 19 / 3, 1, 2)]
+    assert not aggregator[300]
@@ -0,0 +1,104 @@
+"""benchmarks package tests."""
+
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.baseline import Regression, compare, load, merge, rescale, save
+from benchmarks.suite import Result
+
+RESULT = Result(
+    "record", {"trades": 10}, {"trades_per_second": 100, "seconds": 2}, 1
+)
+
+
+def test_rescale():
+    """Timings are scaled to another machine speed, other metrics aren't."""
+    # Given
+    result = RESULT._replace(metrics={**RESULT.metrics, "bytes": 5})
+
+    # When
+    res = rescale(result, 2)
+
+    # Then
+    assert res.metrics == {"trades_per_second": 50, "seconds": 4, "bytes": 5}
+    assert res.reference == 2
+
+
+def test_merge():
+    """Merged runs keep the best metrics at the speed of the faster run."""
+    # Given
+    slower = RESULT._replace(
+        metrics={"trades_per_second": 80, "seconds": 3}, reference=2
+    )
+
+    # When
+    res = merge(RESULT, slower)
+
+    # Then
+    assert res.metrics == {"trades_per_second": 160, "seconds": 1.5}
+    assert res.reference == 1
+
+
+def test_compare(tmp_path):
+    """Metrics regressed past the threshold are found at the same speed."""
+    # Given
+    path = tmp_path / "baseline.json"
+    save(path, "quick", [RESULT])
+    results = [
+        RESULT._replace(
+            metrics={"trades_per_second": 20, "seconds": 0}, reference=2
+        ),
+        RESULT._replace(params={"trades": 20}),
+    ]
+
+    # When
+    regressions = compare(load(path), results, 0.5)
+
+    # Then
+    assert regressions == [
+        Regression(RESULT.key, "trades_per_second", 100, 40, 1.5)
+    ]
+    assert not compare(load(path), results, 2)
+
+
+@pytest.fixture(name="runs")
+def runs_fixture(mocker):
+    """Benchmark runs giving fixed results."""
+    mocker.patch("benchmarks.__main__.run", return_value=[RESULT])
+    return mocker.patch("benchmarks.__main__.run_case", return_value=RESULT)
+
+
+def test_main_without_a_baseline(mocker, tmp_path, runs):
+    """A missing baseline fails the run instead of being saved."""
+    # Given
+    path = tmp_path / "baseline.json"
+    mocker.patch("sys.argv", ["benchmarks", "--baseline", str(path)])
+
+    # When / Then
+    with pytest.raises(SystemExit) as error:
+        main()
+    assert error.value.code == 2
+    assert not path.exists()
+    assert not runs.called
+
+
+def test_main_with_a_baseline(mocker, tmp_path, runs):
+    """Results are compared to a baseline saved before."""
+    # Given
+    path = tmp_path / "baseline.json"
+    args = ["benchmarks", "--baseline", str(path), "--retries", "1"]
+    mocker.patch("sys.argv", [*args, "--save-baseline"])
+    assert main() == 0
+
+    # When
+    mocker.patch("sys.argv", args)
+    unchanged = main()
+    runs.return_value = RESULT._replace(metrics={"seconds": 4})
+    mocker.patch("benchmarks.__main__.run", return_value=[runs.return_value])
+    regressed = main()
+
+    # Then
+    assert unchanged == 0
+    assert regressed == 1
+    assert runs.call_count == 2
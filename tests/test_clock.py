@@ -0,0 +1,60 @@
+"""gbce.clock module tests."""
+
+
+from datetime import datetime
+
+from gbce.clock import CoarseClock, SimulatedClock, WallClock
+
+
+def test_wall_clock():
+    """Wall clock reads the system time."""
+    # Given
+    before = datetime.timestamp(datetime.utcnow())
+
+    # When
+    res = WallClock().now()
+
+    # Then
+    assert before <= res <= datetime.timestamp(datetime.utcnow())
+
+
+def test_coarse_clock_caches_time(mocker):
+    """Coarse clock reads the system time once per resolution."""
+    # Given
+    monotonic = mocker.patch("gbce.clock.time.monotonic", return_value=10)
+    clock = CoarseClock(resolution=1)
+    first = clock.now()
+
+    # When / Then
+    monotonic.return_value = 10.5
+    assert clock.now() == first
+
+    # When / Then
+    monotonic.return_value = 11
+    assert clock.now() >= first
+
+
+def test_coarse_clock_refresh():
+    """Coarse clock can be refreshed."""
+    # Given
+    clock = CoarseClock(resolution=3600)
+    first = clock.now()
+
+    # When
+    res = clock.refresh()
+
+    # Then
+    assert res >= first
+    assert clock.now() == res
+
+
+def test_simulated_clock():
+    """Simulated clock only moves when told to."""
+    # Given
+    clock = SimulatedClock(1000)
+
+    # When / Then
+    assert clock.now() == 1000
+    assert clock.advance(5) == 1005
+    clock.set(2000)
+    assert clock.now() == 2000
@@ -2,10 +2,21 @@
 
 
 import copy
+import logging
+import math
+import sys
+import threading
 
 import pytest
 
 from gbce import Gbce
+from gbce.clock import SimulatedClock
+from gbce.ingest import NON_POSITIVE_QUANTITY, UNKNOWN_STOCK
+from gbce.journal import Journal, read_journal
+from gbce.models.retention import Retention
+from gbce.models.stock import StockType
+from gbce.models.store.columnar import TradeColumns
+from gbce.models.trade import TradeType
 
 from .fixtures.stocks import SAMPLE_STOCKS
 
@@ -48,6 +59,216 @@ def gbce_with_a_stock(stock_values):
     return gbce
 
 
+def test_add_columnar_stock(stock_values):
+    """GBCE can add stocks that keep columnar trades."""
+    # Given
+    gbce = Gbce(columnar=True)
+
+    # When
+    stock = gbce.add_stock(**stock_values)
+    stock.buy(1, 2)
+
+    # Then
+    assert isinstance(stock.trades, TradeColumns)
+    assert stock.calculate_volume_weighted_stock_price() == 2
+
+
+def test_ingest_trades(gbce_with_a_stock, caplog):
+    """GBCE can record trades of several stocks at once."""
+    # Given
+    gbce_with_a_stock.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+
+    # When
+    summary = gbce_with_a_stock.ingest_trades(
+        [
+            ("TEA", TradeType.BUY, 1, 2, None),
+            ("XXX", TradeType.BUY, 1, 2, None),
+            ("GIN", TradeType.SELL, 3, 4, None),
+            ("TEA", TradeType.SELL, -1, 2, None),
+            ("XXX", TradeType.SELL, 1, 2, None),
+            ("TEA", TradeType.BUY, 3, 4, None),
+        ]
+    )
+
+    # Then
+    assert summary.accepted == 3
+    assert summary.rejected == [
+        (1, UNKNOWN_STOCK),
+        (3, NON_POSITIVE_QUANTITY),
+        (4, UNKNOWN_STOCK),
+    ]
+    assert len(caplog.records) == 2
+    stocks = gbce_with_a_stock.stocks
+    assert stocks["TEA"].calculate_volume_weighted_stock_price() == 3.5
+    assert stocks["GIN"].calculate_volume_weighted_stock_price() == 4
+
+
+def test_ingest_trade_columns(gbce_with_a_stock):
+    """GBCE can record trades given as columns."""
+    # When
+    summary = gbce_with_a_stock.ingest_trade_columns(
+        ["TEA", "TEA"], [TradeType.BUY, TradeType.SELL], [1, 3], [2, 4]
+    )
+
+    # Then
+    assert summary.accepted == 2
+    assert not summary.rejected
+
+
+def test_ingest_trade_columns_of_different_lengths(gbce_with_a_stock):
+    """GBCE refuses trade columns of different lengths."""
+    # When / Then
+    with pytest.raises(ValueError):
+        gbce_with_a_stock.ingest_trade_columns(
+            ["TEA", "TEA"], [TradeType.BUY], [1, 3], [2, 4]
+        )
+    assert not gbce_with_a_stock.stocks["TEA"].trades
+
+
+def test_simulated_clock(stock_values):
+    """GBCE and its stocks share a simulated clock."""
+    # Given
+    clock = SimulatedClock(1000)
+    gbce = Gbce(clock=clock)
+    stock = gbce.add_stock(**stock_values)
+
+    # When
+    trade = stock.buy(1, 2)
+    clock.advance(200)
+    stock.buy(1, 4)
+
+    # Then
+    assert gbce.clock is clock
+    assert trade.timestamp == 1000
+    assert gbce.calculate_all_share_index() == pytest.approx(3)
+    clock.advance(101)
+    assert gbce.calculate_all_share_index() == pytest.approx(4)
+    clock.advance(200)
+    assert gbce.calculate_all_share_index() == 0
+
+
+def test_window(stock_values):
+    """GBCE and its stocks share a configurable window."""
+    # Given
+    clock = SimulatedClock(1000)
+    gbce = Gbce(clock=clock, window=60)
+    stock = gbce.add_stock(**stock_values)
+    stock.buy(1, 2)
+    clock.advance(30)
+    stock.buy(1, 4)
+
+    # When / Then
+    assert stock.window == 60
+    assert gbce.calculate_volume_weighted_stock_prices([20, 60]) == {
+        "TEA": {20: 4, 60: 3}
+    }
+    clock.advance(31)
+    assert gbce.calculate_all_share_index() == pytest.approx(4)
+
+
+def test_retention(stock_values):
+    """GBCE compacts the old trades of its stocks."""
+    # Given
+    clock = SimulatedClock(1000)
+    gbce = Gbce(clock=clock, retention=Retention(max_age=600))
+    stock = gbce.add_stock(**stock_values)
+    stock.buy(1, 2)
+    clock.advance(650)
+    stock.buy(1, 4)
+    assert len(stock.trades) == 2
+
+    # When
+    res = gbce.compact()
+
+    # Then
+    assert res == 1
+    assert len(stock.trades) == 1
+    assert len(stock.bars) == 1
+
+
+def test_bar_resolutions(stock_values):
+    """GBCE aggregates the trades of its stocks into bars."""
+    # Given
+    gbce = Gbce(bar_resolutions=[1, 60])
+
+    # When
+    stock = gbce.add_stock(**stock_values)
+    stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # Then
+    assert list(stock.aggregator.series) == [1, 60]
+    assert len(stock.aggregator[60]) == 1
+
+
+def test_recover(tmp_path, stock_values):
+    """GBCE recovers the recent trades of a journal."""
+    # Given
+    path = tmp_path / "journal.bin"
+    clock = SimulatedClock(1000)
+    with Journal(path, sync=False) as journal:
+        gbce = Gbce(clock=clock, journal=journal)
+        stock = gbce.add_stock(**stock_values)
+        stock.buy(1, 2)
+        clock.advance(400)
+        stock.buy(1, 4)
+        stock.sell(0, 4)
+    recovered = Gbce(clock=clock)
+    recovered.add_stock(**stock_values)
+
+    # When
+    res = recovered.recover(path)
+
+    # Then
+    assert res.accepted == 1
+    recovered_stock = recovered.stocks[stock_values["name"]]
+    assert len(recovered_stock.trades) == 1
+    assert recovered_stock.calculate_volume_weighted_stock_price() == 4
+
+
+def test_recover_after_backfill(tmp_path, stock_values):
+    """Backfilled trades don't hide the recent trades of a journal."""
+    # Given
+    path = tmp_path / "journal.bin"
+    clock = SimulatedClock(10000)
+    with Journal(path, group_size=4, sync=False) as journal:
+        gbce = Gbce(clock=clock, journal=journal)
+        stock = gbce.add_stock(**stock_values)
+        for _ in range(10):
+            stock.buy(1, 2)
+        stock.record_trades(
+            [(TradeType.BUY, 1, 50, ts) for ts in range(1000, 1030)]
+        )
+    recovered = Gbce(clock=clock)
+    recovered.add_stock(**stock_values)
+
+    # When
+    res = recovered.recover(path)
+
+    # Then
+    assert res.accepted == 10
+    recovered_stock = recovered.stocks[stock_values["name"]]
+    assert recovered_stock.calculate_volume_weighted_stock_price() == 2
+
+
+def test_recover_doesnt_journal_again(tmp_path, stock_values):
+    """Recovered trades aren't journaled again."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, sync=False) as journal:
+        gbce = Gbce(journal=journal)
+        gbce.add_stock(**stock_values).record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # When
+    with Journal(path, sync=False) as journal:
+        gbce = Gbce(journal=journal)
+        gbce.add_stock(**stock_values)
+        res = gbce.recover(path, since=0)
+
+    # Then
+    assert res.accepted == 1
+    assert len(next(read_journal(path)).names) == 1
+
+
 def test_add_already_existing_stock(gbce_with_a_stock, stock_values):
     """Add an already existing stock is managed."""
     # When
@@ -58,6 +279,32 @@ def test_add_already_existing_stock(gbce_with_a_stock, stock_values):
     assert res is None
 
 
+def test_add_stock_with_a_long_name(tmp_path, stock_values, caplog):
+    """Stocks whose names wouldn't fit journal records aren't journaled."""
+    # Given
+    long_name = "Ä" * 9
+    unjournaled = Gbce()
+
+    # When
+    with Journal(tmp_path / "journal.bin", sync=False) as journal:
+        gbce = Gbce(journal=journal)
+        res = gbce.add_stock(**{**stock_values, "name": long_name})
+        added = gbce.add_stocks(
+            (name, StockType.COMMON, 8, None, 100)
+            for name in ["FIRST", long_name]
+        )
+
+    # Then
+    assert res is None
+    assert [stock.name for stock in added] == ["FIRST"]
+    assert gbce.add_stock(**{**stock_values, "name": "Ä" * 8})
+    assert caplog.messages == [
+        f"Stock name {long_name} is too long to journal.",
+        f"Skipped stocks with names too long to journal: {long_name}",
+    ]
+    assert unjournaled.add_stock(**{**stock_values, "name": long_name})
+
+
 def test_add_invalid_stock_type():
     """Invalid stock type is not allowed."""
     # Given
@@ -97,4 +344,464 @@ def test_calculate_all_share_index(faker):
     res = gbce.calculate_all_share_index()
 
     # Then
-    assert res == 20.115225729057688
+    assert res == pytest.approx(9.57722922401839)
+
+
+@pytest.fixture
+def traded_gbce(gbce_with_a_stock):
+    """GBCE with several traded stocks."""
+    gbce_with_a_stock.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    gbce_with_a_stock.add_stock("POP", StockType.COMMON, 8, None, 100)
+    for name, price in (("TEA", 2), ("GIN", 3), ("POP", 8)):
+        gbce_with_a_stock.stocks[name].buy(1, price)
+    return gbce_with_a_stock
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_snapshot_and_restore(tmp_path, traded_gbce, columnar, lazy):
+    """GBCE can be restored from a snapshot."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    traded_gbce.stocks["TEA"].record_trade(TradeType.SELL, 3, 4)
+    traded_gbce.add_stock("ALE", StockType.COMMON, 23, None, 60)
+    assert traded_gbce.snapshot(path) == 4
+    gbce = Gbce(columnar=columnar)
+
+    # When
+    res = gbce.restore(path, lazy=lazy)
+
+    # Then
+    assert res == 4
+    assert list(gbce.stocks) == ["TEA", "GIN", "POP", "ALE"]
+    assert not gbce.stocks["ALE"].trades
+    assert gbce.stocks["GIN"].type == StockType.PREFERRED
+    assert gbce.stocks["POP"].fixed_dividend is None
+    assert gbce.stocks["TEA"].calculate_volume_weighted_stock_price() == 3.5
+    assert gbce.calculate_all_share_index() == pytest.approx(
+        traded_gbce.calculate_all_share_index()
+    )
+
+
+def test_restore_existing_stock(tmp_path, traded_gbce, stock_values):
+    """Stocks that already exist aren't restored."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    traded_gbce.snapshot(path)
+    gbce = Gbce()
+    gbce.add_stock(**stock_values)
+
+    # When
+    res = gbce.restore(path)
+
+    # Then
+    assert res == 2
+    assert not gbce.stocks["TEA"].trades
+    assert len(gbce.stocks["GIN"].trades) == 1
+
+
+def test_all_share_index_of_a_stock_type(traded_gbce):
+    """Calculate all share index of a stock type works."""
+    # When / Then
+    assert traded_gbce.calculate_all_share_index(
+        StockType.COMMON
+    ) == pytest.approx(4)
+    assert traded_gbce.calculate_all_share_index(
+        StockType.PREFERRED
+    ) == pytest.approx(3)
+
+
+def test_bulk_add_stocks(gbce_with_a_stock, caplog):
+    """Stocks can be added in bulk, skipping the ones already listed."""
+    # Given
+    listings = [
+        (name, values["type"], *list(values.values())[1:])
+        for name, values in SAMPLE_STOCKS.items()
+    ]
+
+    # When
+    added = gbce_with_a_stock.add_stocks(
+        [*listings, ("ALE", StockType.COMMON, 1, None, 1), ("X", "?", 0, 0, 0)]
+    )
+    again = gbce_with_a_stock.add_stocks(listings)
+
+    # Then
+    assert [stock.name for stock in added] == ["POP", "ALE", "GIN", "JOE"]
+    assert gbce_with_a_stock.stocks["ALE"].last_dividend == 23
+    assert not again
+    assert list(gbce_with_a_stock.stocks_of_type(StockType.COMMON)) == [
+        "TEA",
+        "POP",
+        "ALE",
+        "JOE",
+    ]
+    assert list(gbce_with_a_stock.stocks_of_type(StockType.PREFERRED)) == [
+        "GIN"
+    ]
+    assert caplog.messages == ["Skipped stocks of unknown types: X"]
+
+
+def test_bulk_add_changed_listings(traded_gbce, caplog):
+    """Changed listings update or replace their stocks, keeping trades."""
+    # pylint: disable=protected-access
+    # Given
+    caplog.set_level(logging.INFO, logger="gbce.Gbce")
+    tea = traded_gbce.stocks["TEA"]
+    gin = traded_gbce.stocks["GIN"]
+    subscription = traded_gbce.subscribe(print, "GIN")
+    traded_gbce.quote_table({})
+
+    # When
+    changed = traded_gbce.add_stocks(
+        [
+            ("TEA", StockType.COMMON, 1, None, 100),
+            ("GIN", StockType.COMMON, 5, None, 100),
+            ("POP", StockType.COMMON, 8, None, 100),
+            ("TEA", StockType.COMMON, 2, None, 100),
+        ]
+    )
+    gin.buy(1, 100)
+
+    # Then
+    assert changed == [tea, traded_gbce.stocks["GIN"]]
+    assert tea.last_dividend == 1
+    assert changed[1] is not gin
+    assert changed[1].type == StockType.COMMON
+    assert len(changed[1].trades) == 1
+    assert subscription.cancelled
+    assert not gin._listeners
+    assert not traded_gbce.stocks_of_type(StockType.PREFERRED)
+    assert list(traded_gbce.stocks_of_type(StockType.COMMON)) == [
+        "TEA",
+        "POP",
+        "GIN",
+    ]
+    assert list(
+        traded_gbce.quote_table({"TEA": 2, "POP": 8, "GIN": 10}).dividend_yield
+    ) == [50, 100, 50]
+    assert traded_gbce.calculate_all_share_index() == pytest.approx(
+        48 ** (1 / 3)
+    )
+    assert caplog.messages == ["Updated listings: TEA, GIN"]
+    assert not traded_gbce.add_stocks(
+        [("TEA", StockType.COMMON, 1, None, 100)]
+    )
+
+
+def test_removed_stocks_are_detached(tmp_path):
+    """Removed stocks are no longer journaled nor notified."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, sync=False) as journal:
+        gbce = Gbce(journal=journal)
+        stock = gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+        subscription = gbce.subscribe(print, "TEA")
+
+        # When
+        gbce.remove_stock("TEA")
+        stock.buy(1, 2)
+
+    # Then
+    assert subscription.cancelled
+    assert not stock._listeners  # pylint: disable=protected-access
+    assert not list(read_journal(path))
+
+
+def test_remove_stocks(traded_gbce, caplog):
+    """Removed stocks are left out of the indices and views."""
+    # Given
+    assert traded_gbce.calculate_all_share_index() == pytest.approx(
+        48 ** (1 / 3)
+    )
+    assert traded_gbce.calculate_all_share_index(
+        StockType.COMMON
+    ) == pytest.approx(4)
+    stocks = traded_gbce.stocks
+    traded_gbce.view()
+
+    # When
+    removed = traded_gbce.remove_stock("POP")
+    missing = traded_gbce.remove_stock("XXX")
+
+    # Then
+    assert removed.name == "POP"
+    assert missing is None
+    assert caplog.messages == ["Stock with name XXX isn't listed."]
+    assert list(stocks) == ["TEA", "GIN", "POP"]
+    assert list(traded_gbce.stocks) == ["TEA", "GIN"]
+    assert list(traded_gbce.stocks_of_type(StockType.COMMON)) == ["TEA"]
+    assert list(traded_gbce.view()) == ["TEA", "GIN"]
+    assert traded_gbce.calculate_all_share_index() == pytest.approx(6**0.5)
+    assert traded_gbce.calculate_all_share_index(
+        StockType.COMMON
+    ) == pytest.approx(2)
+
+
+def test_changed_stock_type_leaves_its_former_index():
+    """Stocks whose type changes are left out of their former type index."""
+    # Given
+    gbce = Gbce()
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.add_stock("POP", StockType.COMMON, 8, None, 100)
+    gbce.stocks["TEA"].buy(1, 10)
+    gbce.stocks["POP"].buy(1, 40)
+    assert gbce.calculate_all_share_index(StockType.COMMON) == pytest.approx(
+        20
+    )
+
+    # When
+    gbce.add_stocks([("TEA", StockType.PREFERRED, 0, 2, 100)])
+
+    # Then
+    assert gbce.calculate_all_share_index(StockType.COMMON) == pytest.approx(
+        40
+    )
+    assert gbce.calculate_all_share_index(
+        StockType.PREFERRED
+    ) == pytest.approx(10)
+
+
+def test_relist_removed_stock(traded_gbce):
+    """Removed stocks can be listed again without their trades."""
+    # Given
+    assert traded_gbce.calculate_all_share_index(
+        StockType.PREFERRED
+    ) == pytest.approx(3)
+
+    # When
+    removed = traded_gbce.remove_stocks(["GIN", "TEA", "GIN"])
+    relisted = traded_gbce.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+
+    # Then
+    assert [stock.name for stock in removed] == ["GIN", "TEA"]
+    assert relisted is not removed[0]
+    assert traded_gbce.calculate_all_share_index(StockType.PREFERRED) == 0
+    assert traded_gbce.calculate_all_share_index() == pytest.approx(8)
+
+
+def test_all_share_index_of_some_stocks(traded_gbce):
+    """Calculate all share index of some stocks works."""
+    # When / Then
+    assert traded_gbce.calculate_all_share_index(
+        ["GIN", "POP", "XXX"]
+    ) == pytest.approx(24**0.5)
+
+
+def test_calculate_sub_indices(traded_gbce):
+    """Calculate several sub indices at once works."""
+    # When
+    res = traded_gbce.calculate_sub_indices(
+        {
+            "common": StockType.COMMON,
+            "preferred": StockType.PREFERRED,
+            "drinks": ["GIN", "POP"],
+        }
+    )
+
+    # Then
+    assert res == {
+        "common": pytest.approx(4),
+        "preferred": pytest.approx(3),
+        "drinks": pytest.approx(24**0.5),
+    }
+
+
+def test_all_share_index_at(traded_gbce):
+    """Calculate all share index as of past instants works."""
+    # Given
+    now = traded_gbce.clock.now()
+    traded_gbce.stocks["TEA"].record_trade(TradeType.BUY, 1, 4, now - 400)
+
+    # When / Then
+    assert traded_gbce.all_share_index_at(now - 400) == pytest.approx(4)
+    assert traded_gbce.all_share_index_at(now + 60) == pytest.approx(
+        48 ** (1 / 3)
+    )
+    assert list(
+        traded_gbce.all_share_index_at_many([now - 400, now + 60])
+    ) == pytest.approx([4, 48 ** (1 / 3)])
+
+
+def test_all_share_index_at_without_stocks():
+    """Calculate all share index as of past instants without stocks."""
+    # When / Then
+    assert Gbce().all_share_index_at(1000) == 0
+    assert list(Gbce().all_share_index_at_many([1000, 2000])) == [0, 0]
+
+
+def test_all_share_index_without_trades(gbce_with_a_stock):
+    """Stocks without recent trades are left out of the all share index."""
+    # Given
+    gbce_with_a_stock.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    gbce_with_a_stock.add_stock("POP", StockType.COMMON, 8, None, 100)
+    assert gbce_with_a_stock.calculate_all_share_index() == 0
+
+    # When
+    gbce_with_a_stock.stocks["TEA"].buy(1, 4)
+    gbce_with_a_stock.stocks["GIN"].buy(1, 9)
+
+    # Then
+    res = gbce_with_a_stock.calculate_all_share_index()
+    assert res == pytest.approx(6)
+
+
+def test_subscribe():
+    """Price and index changes are notified when dispatched."""
+    # Given
+    gbce = Gbce(clock=SimulatedClock(1000))
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    changes = []
+    gbce.subscribe(changes.append, "TEA")
+    gbce.subscribe(changes.append, StockType.PREFERRED)
+    gbce.subscribe(changes.append, threshold=1, interval=10)
+    gbce.notifier.dispatch()
+    changes.clear()
+
+    # When
+    gbce.stocks["TEA"].buy(1, 2)
+    gbce.stocks["GIN"].buy(1, 8)
+    coalesced = gbce.notifier.dispatch()
+    gbce.clock.advance(10)
+    gbce.stocks["TEA"].buy(1, 2)
+    unchanged = gbce.notifier.dispatch()
+
+    # Then
+    assert coalesced == 2
+    assert unchanged == 1
+    assert [(change.subject, change.value) for change in changes] == [
+        ("TEA", 2),
+        (StockType.PREFERRED, pytest.approx(8)),
+        (None, pytest.approx(4)),
+    ]
+    with pytest.raises(KeyError):
+        gbce.subscribe(changes.append, "XXX")
+
+
+def test_view(traded_gbce):
+    """GBCE gives immutable point-in-time views of its stocks."""
+    # Given
+    view = traded_gbce.view()
+
+    # When
+    traded_gbce.stocks["TEA"].buy(1, 8)
+    traded_gbce.add_stock("ALE", StockType.COMMON, 23, None, 60)
+    later = traded_gbce.view()
+
+    # Then
+    assert list(view) == ["TEA", "GIN", "POP"]
+    assert view["TEA"].volume_weighted_stock_price == 2
+    assert view.all_share_index == pytest.approx(48 ** (1 / 3))
+    assert later["TEA"].volume_weighted_stock_price == 5
+    assert later["GIN"] is view["GIN"]
+    assert "ALE" in later
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_concurrent_trading(columnar):
+    """GBCE can be traded and read from many threads at once."""
+    # Given
+    gbce = Gbce(columnar=columnar, clock=SimulatedClock(1000))
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    names = [f"S{number}" for number in range(8)]
+    for name in names:
+        gbce.add_stock(name, StockType.COMMON, 8, None, 100)
+    trades = 500
+    barrier = threading.Barrier(len(names) + 2)
+    errors = []
+
+    def trade(name):
+        barrier.wait()
+        for number in range(trades):
+            price = 2 if number % 2 else 4
+            gbce.stocks[name].record_trade(TradeType.BUY, 1, price, 900)
+            gbce.stocks["TEA"].record_trade(TradeType.SELL, 1, price, 900)
+
+    def read():
+        barrier.wait()
+        try:
+            for number in range(trades):
+                gbce.calculate_all_share_index()
+                gbce.calculate_volume_weighted_stock_prices([60, 300])
+                gbce.add_stock(f"NEW{number}", StockType.COMMON, 8, None, 1)
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    threads = [threading.Thread(target=trade, args=(n,)) for n in names]
+    threads += [threading.Thread(target=read) for _ in range(2)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+
+    # When
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    # Then
+    assert not errors
+    assert len(gbce.stocks) == len(names) + 1 + trades
+    assert len(gbce.stocks["TEA"].trades) == trades * len(names)
+    for name in ["TEA", *names]:
+        stock = gbce.stocks[name]
+        assert stock.calculate_volume_weighted_stock_price() == 3
+    assert gbce.calculate_all_share_index() == pytest.approx(3)
+
+
+def test_metrics(stock_values):
+    """GBCE with metrics on counts and times its hot paths."""
+    # Given
+    gbce = Gbce(metrics=True)
+    stock = gbce.add_stock(**stock_values)
+    stock.buy(1, 2)
+
+    # When
+    gbce.calculate_all_share_index()
+    gbce.calculate_all_share_index(StockType.COMMON)
+    metrics = gbce.metrics()
+
+    # Then
+    assert metrics.record_trade_seconds.samples == 1
+    assert metrics.vwsp_seconds.samples == 2
+    assert metrics.all_share_index_seconds.samples == 2
+    assert list(metrics.stocks) == ["TEA"]
+    assert metrics.stocks["TEA"].trades_accepted == 1
+
+
+def test_no_metrics(traded_gbce):
+    """GBCE without metrics only gives the size of its stocks."""
+    # When
+    traded_gbce.calculate_all_share_index()
+    metrics = traded_gbce.metrics()
+
+    # Then
+    assert metrics.all_share_index_seconds.samples == 0
+    assert metrics.record_trade_seconds.samples == 0
+    assert {name: stock.trades for name, stock in metrics.stocks.items()} == {
+        "TEA": 1,
+        "GIN": 1,
+        "POP": 1,
+    }
+    assert metrics.stocks["TEA"].trades_accepted == 0
+
+
+def test_quote_table(traded_gbce):
+    """GBCE quotes every stock at once."""
+    # When
+    table = traded_gbce.quote_table({"TEA": 4, "GIN": 4})
+    traded_gbce.add_stock("ALE", StockType.COMMON, 23, None, 60)
+    relisted = traded_gbce.quote_table([1, 2, 4, 5])
+    requoted = traded_gbce.quote_table([1, 2, 4, 5])
+
+    # Then
+    assert table.names == ("TEA", "GIN", "POP")
+    assert list(table.dividend_yield[:2]) == [0, 50]
+    assert math.isnan(table.p_e_ratio[0])
+    assert table.p_e_ratio[1] == 0.5
+    assert list(table.volume_weighted_stock_price) == [2, 3, 8]
+    assert relisted.names == ("TEA", "GIN", "POP", "ALE")
+    assert relisted.p_e_ratio[3] == pytest.approx(5 / 23)
+    assert requoted.dividend_yield == relisted.dividend_yield
@@ -0,0 +1,190 @@
+"""gbce.index module tests."""
+
+
+import math
+
+import pytest
+from pytest_factoryboy import register
+
+from gbce.index import (
+    IncrementalIndex,
+    combine_log_sums,
+    geometric_mean,
+    sub_indices,
+)
+from gbce.models.trade import TradeType
+
+from .factories import CommonStockFactory
+
+register(CommonStockFactory)
+
+
+@pytest.mark.parametrize(
+    ["values", "result"],
+    [
+        ([], 0),
+        ([0, -1], 0),
+        ([2, 8], 4),
+        ([2, 0, 8], 4),
+        ([1e300] * 5000, 1e300),
+    ],
+)
+def test_geometric_mean(values, result):
+    """Geometric mean works without overflowing."""
+    # When / Then
+    assert geometric_mean(values) == pytest.approx(result)
+
+
+def test_geometric_mean_does_not_underflow():
+    """Geometric mean works without underflowing."""
+    # When / Then
+    assert geometric_mean([1e-300] * 5000) == pytest.approx(1e-300)
+
+
+def test_combine_log_sums():
+    """Partial log sums are combined into their geometric mean."""
+    # Given
+    partials = [(math.log(2) + math.log(8), 2), (0.0, 0), (math.log(4), 1)]
+
+    # When / Then
+    assert combine_log_sums(partials) == pytest.approx(4)
+    assert combine_log_sums([(0.0, 0)]) == 0
+
+
+def test_sub_indices():
+    """Several sub indices are calculated at once."""
+    # Given
+    prices = {"TEA": 2, "POP": 8, "GIN": 3}
+
+    # When
+    res = sub_indices(prices, {"all": prices, "some": ["TEA", "POP"]})
+
+    # Then
+    assert res == {"all": pytest.approx(48 ** (1 / 3)), "some": 4}
+
+
+@pytest.fixture(params=[False, True])
+def stocks(common_stock_factory, request):
+    """Stocks by name with every trade store."""
+    return {
+        name: common_stock_factory(name=name, columnar=request.param)
+        for name in ("TEA", "POP", "ALE")
+    }
+
+
+@pytest.fixture
+def index(stocks):
+    """Incremental index following the stocks."""
+    index = IncrementalIndex()
+    for stock in stocks.values():
+        stock.add_trade_listener(lambda stock, *_: index.mark(stock.name))
+    return index
+
+
+def test_empty_index(index, stocks):
+    """Index without trades is zero."""
+    # When / Then
+    assert index.value(stocks, 1000) == 0
+    assert not index
+
+
+def test_index(index, stocks):
+    """Index is the geometric mean of the stocks with trades."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 2, 1000)
+    stocks["POP"].record_trade(TradeType.BUY, 1, 8, 1000)
+
+    # When
+    res = index.value(stocks, 1000)
+
+    # Then
+    assert res == pytest.approx(4)
+    assert len(index) == 2
+
+
+def test_index_follows_new_trades(index, stocks):
+    """Index is updated after new trades."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 2, 1000)
+    assert index.value(stocks, 1000) == pytest.approx(2)
+
+    # When
+    stocks["TEA"].record_trades([(TradeType.BUY, 1, 6, 1010)])
+    stocks["POP"].record_trade(TradeType.BUY, 1, 4, 1010)
+
+    # Then
+    assert index.value(stocks, 1010) == pytest.approx(4)
+
+
+def test_index_follows_expired_trades(index, stocks):
+    """Index is updated when trades expire."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 2, 1000)
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 6, 1100)
+    stocks["POP"].record_trade(TradeType.BUY, 1, 16, 1100)
+    assert index.value(stocks, 1100) == pytest.approx(8)
+
+    # When / Then
+    assert index.value(stocks, 1200) == pytest.approx(8)
+    assert index.value(stocks, 1350) == pytest.approx(96**0.5)
+    assert index.value(stocks, 1500) == 0
+    assert not index
+
+
+def test_index_ignores_stale_expiries(index, stocks):
+    """Index ignores expiries that an older trade has superseded."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 2, 1000)
+    assert index.value(stocks, 1000) == pytest.approx(2)
+
+    # When
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 6, 900)
+
+    # Then
+    assert index.value(stocks, 1000) == pytest.approx(4)
+    assert index.value(stocks, 1250) == pytest.approx(2)
+    assert index.value(stocks, 1350) == 0
+
+
+def test_index_leaves_out_non_positive_prices(index, stocks):
+    """Stocks with non positive prices are left out of the index."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, -2, 1000)
+    stocks["POP"].record_trade(TradeType.BUY, 1, 3, 1000)
+
+    # When / Then
+    assert index.value(stocks, 1000) == pytest.approx(3)
+    assert len(index) == 1
+
+
+def test_index_resum(index, stocks, monkeypatch):
+    """Running sum is recomputed every so often."""
+    # Given
+    monkeypatch.setattr(IncrementalIndex, "RESUM_INTERVAL", 2)
+
+    # When
+    for timestamp in range(1000, 1004):
+        stocks["TEA"].record_trade(TradeType.BUY, 1, 2, timestamp)
+        stocks["POP"].record_trade(TradeType.BUY, 1, 8, timestamp)
+        res = index.value(stocks, timestamp)
+
+    # Then
+    assert res == pytest.approx(4)
+
+
+def test_index_leaves_out_removed_stocks(index, stocks):
+    """Marked stocks that are no longer listed are dropped."""
+    # Given
+    stocks["TEA"].record_trade(TradeType.BUY, 1, 2, 1000)
+    stocks["POP"].record_trade(TradeType.BUY, 1, 8, 1000)
+    assert index.value(stocks, 1000) == pytest.approx(4)
+
+    # When
+    removed = stocks.pop("POP")
+    index.mark(removed.name)
+    index.mark("XXX")
+
+    # Then
+    assert index.value(stocks, 1000) == pytest.approx(2)
+    assert len(index) == 1
+    assert index.value(stocks, 2000) == 0
@@ -0,0 +1,90 @@
+"""gbce.ingest module tests."""
+
+
+import math
+
+import pytest
+
+from gbce.ingest import (
+    NON_FINITE_VALUE,
+    NON_POSITIVE_QUANTITY,
+    UNKNOWN_TRADE_TYPE,
+    IngestSummary,
+    check_columns,
+    invalid_trade,
+    split_rows,
+    validate_trades,
+)
+from gbce.models.trade import TradeType
+
+
+def test_validate_trades():
+    """Invalid trades are found in one pass."""
+    # When
+    res = validate_trades(
+        [TradeType.BUY, "invalid", TradeType.SELL, TradeType.BUY]
+        + [TradeType.BUY] * 4,
+        [1, 1, 0, -1, math.inf, math.nan, 1, 1],
+        [2, 2, 2, 2, 2, 2, math.nan, -math.inf],
+    )
+
+    # Then
+    assert res == [
+        (1, UNKNOWN_TRADE_TYPE),
+        (2, NON_POSITIVE_QUANTITY),
+        (3, NON_POSITIVE_QUANTITY),
+        (4, NON_FINITE_VALUE),
+        (5, NON_FINITE_VALUE),
+        (6, NON_FINITE_VALUE),
+        (7, NON_FINITE_VALUE),
+    ]
+
+
+def test_invalid_trade():
+    """Valid trades have no reason to be rejected."""
+    # When / Then
+    assert invalid_trade(TradeType.BUY, 1, 2) is None
+    assert invalid_trade(TradeType.BUY, 1, math.nan) == NON_FINITE_VALUE
+
+
+def test_split_rows():
+    """Rows are split into columns."""
+    # When / Then
+    assert split_rows([(1, 2), (3, 4)], 2) == [(1, 3), (2, 4)]
+    assert split_rows([], 3) == [(), (), ()]
+
+
+def test_split_rows_with_wrong_width():
+    """Rows with a wrong number of values are not allowed."""
+    # When / Then
+    with pytest.raises(ValueError):
+        split_rows([(1, 2), (3, 4)], 3)
+
+
+def test_check_columns():
+    """Parallel columns need the same length, None columns aside."""
+    # When / Then
+    check_columns([1, 2], (3, 4), None)
+    with pytest.raises(ValueError):
+        check_columns([1, 2], [3])
+
+
+def test_summary():
+    """Ingestion summaries can be merged and counted."""
+    # Given
+    summary = IngestSummary(2, [(0, UNKNOWN_TRADE_TYPE)])
+
+    # When
+    summary.merge(IngestSummary(3, [(1, NON_POSITIVE_QUANTITY)]), [5, 7])
+
+    # Then
+    assert summary.accepted == 5
+    assert summary.rejected == [
+        (0, UNKNOWN_TRADE_TYPE),
+        (7, NON_POSITIVE_QUANTITY),
+    ]
+    assert summary.reasons() == {
+        UNKNOWN_TRADE_TYPE: 1,
+        NON_POSITIVE_QUANTITY: 1,
+    }
+    assert repr(summary) == "<IngestSummary accepted=5 rejected=2>"
@@ -0,0 +1,184 @@
+"""gbce.journal module tests."""
+
+
+import math
+import threading
+
+from pytest_factoryboy import register
+
+from gbce.journal import (
+    SEEK_ENTRY,
+    Journal,
+    latest_timestamp,
+    read_journal,
+    read_seek_index,
+    seek_index_path,
+    truncate_torn_tail,
+)
+from gbce.models.trade import TradeType
+
+from .factories import CommonStockFactory
+
+register(CommonStockFactory)
+
+
+def test_journal(tmp_path, common_stock):
+    """Recorded trades are journaled and can be read back."""
+    # Given
+    path = tmp_path / "journal.bin"
+
+    # When
+    with Journal(path, group_size=2, interval=60, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+        assert journal.pending == 1
+        common_stock.record_trade(TradeType.SELL, 3, 4, 1001)
+        assert journal.pending == 0
+        common_stock.record_trade(TradeType.BUY, 5, 6, 1002)
+    journal.close()
+
+    # Then
+    batches = list(read_journal(path, batch_size=2))
+    assert len(batches) == 2
+    assert batches[0].names == [common_stock.name] * 2
+    assert batches[0].trade_types == [TradeType.BUY, TradeType.SELL]
+    assert batches[1].quantities == [5]
+    assert batches[1].prices == [6]
+    assert batches[1].timestamps == [1002]
+
+
+def test_journal_commit_interval(tmp_path, common_stock):
+    """Pending trades are committed once the interval has passed."""
+    # Given
+    journal = Journal(tmp_path / "journal.bin", interval=0)
+    common_stock.add_trade_listener(journal)
+
+    # When
+    common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # Then
+    assert journal.pending == 0
+    assert len(next(read_journal(journal.path)).names) == 1
+    journal.close()
+
+
+def test_suspended_journal(tmp_path, common_stock):
+    """Suspended journals only skip the trades of the suspending thread."""
+    # Given
+    journal = Journal(tmp_path / "journal.bin")
+    common_stock.add_trade_listener(journal)
+    other = threading.Thread(
+        target=common_stock.record_trade, args=(TradeType.SELL, 3, 4, 1001)
+    )
+
+    # When
+    with journal.suspended():
+        common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+        other.start()
+        other.join()
+    journal.close()
+
+    # Then
+    batches = list(read_journal(journal.path))
+    assert [batch.timestamps for batch in batches] == [[1001]]
+
+
+def test_journal_torn_tail(tmp_path, common_stock):
+    """Partly written records and index entries are truncated on open."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    common_stock.remove_trade_listener(journal)
+    with open(path, "ab") as data:
+        data.write(b"\xff" * 3)
+    with open(seek_index_path(path), "ab") as index:
+        index.write(SEEK_ENTRY.pack(3000, 10**6) + b"\xff")
+
+    # When
+    with Journal(path, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trade(TradeType.SELL, 3, 4, 2000)
+
+    # Then
+    batches = list(read_journal(path))
+    assert [batch.timestamps for batch in batches] == [[1000, 2000]]
+    assert [latest for latest, _ in read_seek_index(path)] == [1000, 2000]
+    truncate_torn_tail(tmp_path / "missing.bin")
+
+
+def test_read_journal_tail(tmp_path, common_stock):
+    """Only the tail of a journal is read and partial records are ignored."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trades(
+            [(TradeType.BUY, 1, 2, ts) for ts in range(1000, 1010)]
+        )
+    with open(path, "ab") as journal_file:
+        journal_file.write(b"\0" * 10)
+
+    # When
+    batches = list(read_journal(path, since=1007))
+
+    # Then
+    assert [batch.timestamps for batch in batches] == [[1007, 1008, 1009]]
+
+
+def test_read_journal_out_of_order(tmp_path, common_stock):
+    """Trades journaled out of timestamp order are all found."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, group_size=5, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        for timestamp in range(2000, 2010):
+            common_stock.record_trade(TradeType.BUY, 1, 2, timestamp)
+        common_stock.record_trades(
+            [(TradeType.BUY, 1, 2, ts) for ts in range(1000, 1030)]
+        )
+        common_stock.record_trade(TradeType.BUY, 1, 2, 1995)
+        common_stock.record_trade(TradeType.BUY, 1, 2, 2010)
+
+    # When
+    batches = list(read_journal(path, since=2005, batch_size=4))
+
+    # Then
+    assert [ts for batch in batches for ts in batch.timestamps] == [
+        2005,
+        2006,
+        2007,
+        2008,
+        2009,
+        2010,
+    ]
+    assert [latest for latest, _ in read_seek_index(path)] == [
+        2004,
+        2009,
+        2009,
+        2010,
+    ]
+
+
+def test_reopened_journal_keeps_its_latest_timestamp(tmp_path, common_stock):
+    """Journals appended to again resume from their latest timestamp."""
+    # Given
+    path = tmp_path / "journal.bin"
+    with Journal(path, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trade(TradeType.BUY, 1, 2, 2000)
+    common_stock.remove_trade_listener(journal)
+    assert latest_timestamp(path) == 2000
+
+    # When
+    with open(seek_index_path(path), "wb"):
+        pass
+    with Journal(path, sync=False) as journal:
+        common_stock.add_trade_listener(journal)
+        common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # Then
+    assert read_seek_index(path)[-1][0] == 2000
+    (tmp_path / "empty.bin").touch()
+    assert latest_timestamp(tmp_path / "empty.bin") == -math.inf
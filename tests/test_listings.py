@@ -0,0 +1,47 @@
+"""gbce.listings module tests."""
+
+
+import pytest
+
+from gbce.listings import parse_fixed_dividend, read_listings
+from gbce.models.stock import StockType
+
+
+@pytest.mark.parametrize(
+    ["value", "expected"], [("2", 2), (" 2% ", 2), ("", None), (" ", None)]
+)
+def test_parse_fixed_dividend(value, expected):
+    """Fixed dividends are parsed with or without a percent sign."""
+    # When / Then
+    assert parse_fixed_dividend(value) == expected
+
+
+def test_read_listings(tmp_path):
+    """Listings can be read with or without header."""
+    # Given
+    path = tmp_path / "listings.csv"
+    path.write_text(
+        "Stock Symbol,Type,Last Dividend,Fixed Dividend,Par Value\n"
+        "TEA,Common,0,,100\n"
+        "GIN, preferred ,8,2%,100\n"
+    )
+
+    # When
+    listings = list(read_listings(path))
+
+    # Then
+    assert listings == [
+        ("TEA", StockType.COMMON, 0, None, 100),
+        ("GIN", StockType.PREFERRED, 8, 2, 100),
+    ]
+
+
+def test_read_listings_with_invalid_row(tmp_path):
+    """Listings with invalid rows are not allowed."""
+    # Given
+    path = tmp_path / "listings.csv"
+    path.write_text("TEA,Common,0,,100\nGIN,Preferred,eight,2,100\n")
+
+    # When / Then
+    with pytest.raises(ValueError):
+        list(read_listings(path))
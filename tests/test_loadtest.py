@@ -0,0 +1,178 @@
+"""gbce.loadtest module tests."""
+
+
+import runpy
+import sys
+import time
+
+import pytest
+
+from gbce import Gbce
+from gbce.loadtest import (
+    ALL_SHARE_INDEX,
+    OPERATIONS,
+    RECORD_TRADE,
+    VWSP,
+    LatencyStats,
+    LoadGenerator,
+    LoadReport,
+    add_listings,
+    latency_stats,
+    main,
+    percentile,
+)
+from gbce.models.stock import StockType
+
+
+@pytest.fixture
+def gbce():
+    """GBCE with a wall clock."""
+    return Gbce()
+
+
+@pytest.mark.parametrize(
+    ["fraction", "expected"],
+    [(0, 1), (0.5, 50), (0.99, 99), (0.999, 100), (1, 100)],
+)
+def test_percentile(fraction, expected):
+    """Percentiles are taken by the nearest rank."""
+    # Given
+    values = list(range(1, 101))
+
+    # When / Then
+    assert percentile(values, fraction) == expected
+
+
+def test_latency_stats():
+    """Latencies are summarized by their percentiles."""
+    # When / Then
+    assert latency_stats([3, 1, 2]) == LatencyStats(3, 2, 3, 3, 3)
+    assert latency_stats([]) == LatencyStats(0, 0, 0, 0, 0)
+
+
+def test_throughput():
+    """Throughput is the operations run per second."""
+    # Given
+    report = LoadReport(100, 2, 0, {})
+
+    # When / Then
+    assert report.throughput == 50
+
+
+def test_add_listings(gbce):
+    """A reproducible universe of common and preferred stocks is listed."""
+    # When
+    prices = add_listings(gbce, 10, seed=1)
+
+    # Then
+    assert (
+        list(prices) == list(gbce.stocks) == [f"S{i:05d}" for i in range(10)]
+    )
+    assert [stock.type for stock in gbce.stocks.values()].count(
+        StockType.PREFERRED
+    ) == 2
+    assert all(1 <= price <= 200 for price in prices.values())
+    assert prices == add_listings(Gbce(), 10, seed=1)
+
+
+def test_run(gbce):
+    """Operations of every kind are run on the stocks, skewed by rank."""
+    # Given
+    prices = add_listings(gbce, 20, seed=1)
+    generator = LoadGenerator(gbce, prices, 5000, query_ratio=0.2, seed=1)
+
+    # When
+    report = generator.run(0.2)
+
+    # Then
+    assert set(report.latencies) == set(OPERATIONS)
+    assert report.operations == sum(
+        stats.samples for stats in report.latencies.values()
+    )
+    trades = report.latencies[RECORD_TRADE].samples
+    quotes = report.latencies[VWSP].samples
+    indices = report.latencies[ALL_SHARE_INDEX].samples
+    assert trades > quotes + indices
+    assert quotes > 0
+    assert indices > 0
+    assert 0.1 < report.elapsed < 1
+    assert report.lag < 1
+
+    traded = [len(stock.trades) for stock in gbce.stocks.values()]
+    assert sum(traded) == trades
+    assert traded[0] > traded[-1]
+
+
+def test_run_behind(gbce):
+    """Falling behind the arrivals is reported as lag."""
+    # Given
+    prices = add_listings(gbce, 5, seed=1)
+    generator = LoadGenerator(gbce, prices, 10_000_000, seed=1)
+
+    # When
+    report = generator.run(0.1)
+
+    # Then
+    assert report.lag > 0
+    assert report.throughput < 10_000_000
+    assert report.elapsed < 1
+
+
+def test_run_slow_target(gbce, mocker):
+    """Latencies include the time operations wait behind slow ones."""
+    # Given
+    prices = add_listings(gbce, 1, seed=1)
+    mocker.patch.object(
+        gbce.stocks["S00000"],
+        "record_trade",
+        side_effect=lambda *_: time.sleep(0.01),
+    )
+    generator = LoadGenerator(gbce, prices, 1000, query_ratio=0, seed=1)
+
+    # When
+    report = generator.run(0.2)
+
+    # Then
+    stats = report.latencies[RECORD_TRADE]
+    assert 0 < stats.samples < 50
+    assert stats.p50 > 0.05
+    assert stats.maximum > 0.1
+
+
+def test_main(capsys):
+    """The load test prints its report."""
+    # When
+    status = main(["--duration", "0.05", "--listings", "10", "--seed", "1"])
+
+    # Then
+    out = capsys.readouterr().out
+    assert status == 0
+    assert "operations in" in out
+    for operation in OPERATIONS:
+        assert operation in out
+
+
+def test_run_module(monkeypatch, capsys):
+    """The load test can be run as a module."""
+    # Given
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "gbce.loadtest",
+            "--duration",
+            "0.05",
+            "--listings",
+            "5",
+            "--columnar",
+        ],
+    )
+    monkeypatch.delitem(sys.modules, "gbce.loadtest")
+
+    # When
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("gbce.loadtest", run_name="__main__")
+
+    # Then
+    assert exit_info.value.code == 0
+    assert "operations in" in capsys.readouterr().out
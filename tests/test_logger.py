@@ -0,0 +1,196 @@
+"""gbce.logger module tests."""
+
+
+import logging
+
+import pytest
+
+from gbce import Gbce
+from gbce.logger import LoggerMixin, LogThrottle
+from gbce.models.stock import Stock, StockType
+from gbce.models.stock.common import CommonStock
+from gbce.models.stock.preferred import PreferredStock
+from gbce.models.trade import TradeType
+
+from .factories import CommonStockFactory
+
+
+@pytest.fixture
+def clock(mocker):
+    """Monotonic clock of the throttles."""
+    return mocker.patch("gbce.logger.time.monotonic", return_value=100.0)
+
+
+@pytest.fixture
+def log():
+    """Logger that records everything."""
+    log = logging.getLogger("tests.throttled")
+    log.setLevel(logging.DEBUG)
+    return log
+
+
+def test_throttle(clock, log, caplog):
+    """Repeated records are suppressed within the interval."""
+    # Given
+    throttle = LogThrottle(10)
+
+    # When
+    logged = [
+        throttle.log(log, logging.WARNING, "TEA", "%s: bad %d", "TEA", i)
+        for i in range(3)
+    ]
+    other = throttle.log(log, logging.WARNING, "GIN", "%s: bad %d", "GIN", 0)
+    clock.return_value = 110.0
+    after = throttle.log(log, logging.WARNING, "TEA", "%s: bad %d", "TEA", 3)
+
+    # Then
+    assert throttle.interval == 10
+    assert logged == [True, False, False]
+    assert other
+    assert after
+    assert caplog.messages == [
+        "TEA: bad 0",
+        "GIN: bad 0",
+        "TEA: bad 3 (2 more suppressed)",
+    ]
+
+
+def test_flush_throttle(clock, log, caplog):
+    """Suppressed records are summarized when flushed."""
+    # Given
+    throttle = LogThrottle(10)
+    for i in range(3):
+        throttle.log(log, logging.WARNING, "TEA", "%s: bad %d", "TEA", i)
+    throttle.log(log, logging.INFO, "GIN", "%s: odd", "GIN")
+    caplog.clear()
+
+    # When
+    summarized = throttle.flush()
+    flushed_again = throttle.flush()
+    clock.return_value = 105.0
+    logged = throttle.log(log, logging.WARNING, "TEA", "%s: bad %d", "TEA", 4)
+
+    # Then
+    assert summarized == 1
+    assert flushed_again == 0
+    assert not logged
+    assert caplog.messages == ["TEA: bad 2 (repeated 2 times)"]
+
+
+def test_timed_flush(clock, log, caplog, mocker):
+    """Suppressed records are summarized every period once started."""
+    # Given
+    timer = mocker.patch("gbce.logger.threading.Timer")
+    throttle = LogThrottle(10)
+    for i in range(3):
+        throttle.log(log, logging.WARNING, "TEA", "%s: bad %d", "TEA", i)
+    caplog.clear()
+
+    # When
+    throttle.start()
+    throttle.start(5)
+    period, tick, args = timer.call_args.args
+    tick(*args)
+    throttle.close()
+    tick(*args)
+    throttle.close()
+
+    # Then
+    assert period == 10
+    assert timer.call_count == 2
+    assert timer.return_value.start.call_count == 2
+    assert timer.return_value.cancel.call_count == 1
+    assert caplog.messages == ["TEA: bad 2 (repeated 2 times)"]
+
+
+def test_logger_level_is_only_set_on_change(mocker):
+    """Instances share their class logger and set its level on change."""
+    # pylint: disable=protected-access
+    # Given
+    set_level = mocker.spy(logging.Logger, "setLevel")
+
+    # When
+    stocks = [CommonStockFactory(logger_level=logging.ERROR) for _ in range(5)]
+    CommonStockFactory(logger_level=logging.DEBUG)
+
+    # Then
+    assert len({id(stock._log) for stock in stocks}) == 1
+    assert set_level.call_count <= 2
+    assert stocks[0]._log.level == logging.DEBUG
+
+
+def test_instances_keep_the_configured_level(monkeypatch):
+    """Instances without a level leave the configured one alone."""
+    # pylint: disable=protected-access
+    # Given
+    monkeypatch.setattr(Stock, "_log_throttle", None)
+    Stock.configure_logging(logging.ERROR)
+
+    # When
+    stock = CommonStockFactory(logger_level=None)
+    gbce = Gbce()
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+
+    # Then
+    assert stock._log.level == logging.ERROR
+    assert logging.getLogger("gbce.models.stock.common.CommonStock").level == (
+        logging.ERROR
+    )
+
+
+def test_configure_logging(monkeypatch, caplog):
+    """Logging is configured for a class and its subclasses."""
+    # pylint: disable=protected-access
+    # Given
+    monkeypatch.setattr(Stock, "_log_throttle", None)
+    stock = CommonStockFactory(logger_level=logging.DEBUG)
+
+    # When
+    throttle = Stock.configure_logging(logging.WARNING, interval=60)
+    for _ in range(100):
+        stock.record_trade(TradeType.BUY, 0, 1)
+
+    # Then
+    assert isinstance(throttle, LogThrottle)
+    assert CommonStock._log_throttle is throttle
+    assert PreferredStock._log_throttle is throttle
+    assert Gbce._log_throttle is None
+    assert logging.getLogger(
+        "gbce.models.stock.preferred.PreferredStock"
+    ).level == (logging.WARNING)
+    assert caplog.messages == ["POP: Quantity needs to be bigger than 0"]
+    assert throttle.flush() == 1
+
+
+def test_configure_logging_without_throttle(monkeypatch, caplog):
+    """Hot path records are all logged without a throttle."""
+    # Given
+    monkeypatch.setattr(LoggerMixin, "_log_throttle", None)
+    monkeypatch.setattr(Stock, "_log_throttle", None)
+    Stock.configure_logging(logging.DEBUG, interval=60)
+
+    # When
+    throttle = Stock.configure_logging(logging.DEBUG)
+    stock = CommonStockFactory(logger_level=logging.DEBUG, last_dividend=0)
+    for _ in range(3):
+        stock.calculate_p_e_ratio(1)
+
+    # Then
+    assert throttle is None
+    assert len(caplog.messages) == 3
+
+
+def test_disabled_records_are_skipped(monkeypatch, caplog):
+    """Hot path records below the level don't reach the throttle."""
+    # Given
+    monkeypatch.setattr(Stock, "_log_throttle", None)
+    throttle = Stock.configure_logging(logging.ERROR, interval=60)
+    stock = CommonStockFactory(logger_level=logging.ERROR)
+
+    # When
+    stock.record_trade(TradeType.BUY, 0, 1)
+    stock.calculate_dividend_yield(0)
+
+    # Then
+    assert not caplog.messages
+    assert throttle.flush() == 0
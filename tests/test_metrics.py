@@ -0,0 +1,172 @@
+"""gbce.metrics module tests."""
+
+
+import functools
+import socketserver
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from gbce import Gbce
+from gbce.metrics import (
+    CONTENT_TYPE,
+    Histogram,
+    HistogramSnapshot,
+    Metrics,
+    MetricsServer,
+    StockMetrics,
+    escape,
+    number,
+    prometheus_text,
+)
+from gbce.models.stock import StockType
+
+
+def test_histogram():
+    """Observations are counted in cumulative buckets."""
+    # Given
+    histogram = Histogram([1, 10])
+
+    # When
+    for value in (0.5, 1, 5, 20):
+        histogram.observe(value)
+
+    # Then
+    snapshot = histogram.snapshot()
+    assert snapshot == HistogramSnapshot((1, 10), (2, 3, 4), 26.5)
+    assert snapshot.samples == 4
+
+
+def test_histogram_across_threads():
+    """Observations of every thread are merged in snapshots."""
+    # Given
+    histogram = Histogram([1, 10])
+    histogram.observe(0.5)
+    threads = [
+        threading.Thread(target=histogram.observe, args=(value,))
+        for value in (5, 20, 20)
+    ]
+
+    # When
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Then
+    assert histogram.snapshot() == HistogramSnapshot((1, 10), (1, 2, 4), 45.5)
+    assert Histogram([1]).snapshot() == HistogramSnapshot((1,), (0, 0), 0)
+
+
+@pytest.mark.parametrize(
+    ["value", "expected"],
+    [(3, "3"), (0.5, "0.5"), (1e-6, "1e-06"), (float("inf"), "+Inf")],
+)
+def test_number(value, expected):
+    """Sample values are formatted as Prometheus expects."""
+    # When / Then
+    assert number(value) == expected
+    assert number(-float("inf")) == "-Inf"
+
+
+def test_escape():
+    """Label values are escaped."""
+    # When / Then
+    assert escape('a\\b"c\nd') == 'a\\\\b\\"c\\nd'
+
+
+def test_prometheus_text():
+    """Metrics are formatted in the Prometheus text format."""
+    # Given
+    metrics = Metrics()
+    metrics.record_trade.observe(3e-6)
+    metrics.vwsp_trades.observe(5)
+    snapshot = metrics.snapshot({'T"EA': StockMetrics(4, 1, 3, 100)})
+
+    # When
+    text = prometheus_text(snapshot)
+
+    # Then
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE gbce_record_trade_seconds histogram" in lines
+    assert 'gbce_record_trade_seconds_bucket{le="2.5e-06"} 0' in lines
+    assert 'gbce_record_trade_seconds_bucket{le="5e-06"} 1' in lines
+    assert 'gbce_record_trade_seconds_bucket{le="+Inf"} 1' in lines
+    assert "gbce_record_trade_seconds_sum 3e-06" in lines
+    assert "gbce_record_trade_seconds_count 1" in lines
+    assert 'gbce_vwsp_trades_bucket{le="10.0"} 1' in lines
+    assert "gbce_all_share_index_seconds_count 0" in lines
+    assert "# TYPE gbce_trades_accepted_total counter" in lines
+    assert 'gbce_trades_accepted_total{stock="T\\"EA"} 4' in lines
+    assert 'gbce_trades_rejected_total{stock="T\\"EA"} 1' in lines
+    assert 'gbce_stock_trades{stock="T\\"EA"} 3' in lines
+    assert 'gbce_stock_memory_bytes{stock="T\\"EA"} 100' in lines
+
+
+@pytest.fixture
+def gbce():
+    """GBCE with metrics and a traded stock."""
+    gbce = Gbce(metrics=True)
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.stocks["TEA"].buy(1, 2)
+    return gbce
+
+
+def scrape(server, path):
+    """Scrape a metrics server, handling the request in this thread."""
+    server.process_request = functools.partial(
+        socketserver.TCPServer.process_request, server
+    )
+    url = server.url.replace("/metrics", path)
+    response = {}
+
+    def get():
+        try:
+            with urllib.request.urlopen(url, timeout=5) as reply:
+                response["status"] = reply.status
+                response["type"] = reply.headers["Content-Type"]
+                response["body"] = reply.read().decode()
+        except urllib.error.HTTPError as error:
+            response["status"] = error.code
+
+    client = threading.Thread(target=get)
+    client.start()
+    server.handle_request()
+    client.join()
+    return response
+
+
+def test_serve_metrics(gbce):
+    """Metrics are served in the Prometheus text format."""
+    # Given
+    server = MetricsServer(gbce.metrics)
+
+    # When
+    response = scrape(server, "/metrics?name=all")
+    missing = scrape(server, "/")
+    server.close()
+
+    # Then
+    assert response["status"] == 200
+    assert response["type"] == CONTENT_TYPE
+    assert "gbce_record_trade_seconds_count 1" in response["body"]
+    assert 'gbce_trades_accepted_total{stock="TEA"} 1' in response["body"]
+    assert missing["status"] == 404
+
+
+def test_serve_metrics_in_background(gbce):
+    """Metrics are served from a background thread."""
+    # Given
+    with MetricsServer(gbce.metrics) as server:
+        server.start()
+
+        # When
+        with urllib.request.urlopen(server.url, timeout=5) as reply:
+            body = reply.read().decode()
+
+    # Then
+    assert server.url.startswith("http://127.0.0.1:")
+    assert "gbce_stock_trades" in body
@@ -0,0 +1,82 @@
+"""gbce.models.prefix module tests."""
+
+
+import pytest
+
+from gbce.models.prefix import PrefixIndex
+
+
+@pytest.fixture
+def index():
+    """Prefix index with some trades."""
+    index = PrefixIndex()
+    for timestamp, price, quantity in [(10, 2, 1), (20, 4, 3), (30, 6, 5)]:
+        index.add(timestamp, price, quantity)
+    return index
+
+
+@pytest.mark.parametrize(
+    ["start", "end", "result"],
+    [
+        (0, 100, (44, 9)),
+        (10, 30, (14, 4)),
+        (11, 30, (12, 3)),
+        (30, 10, (0, 0)),
+        (40, 50, (0, 0)),
+    ],
+)
+def test_sums(index, start, end, result):
+    """Sums over a time range work."""
+    # When / Then
+    assert index.sums(start, end) == result
+
+
+def test_sums_including_end(index):
+    """Sums over a time range including its end work."""
+    # When / Then
+    assert index.sums(10, 30, include_end=True) == (44, 9)
+
+
+def test_add_out_of_order(index):
+    """Trades added out of time order are indexed in time order."""
+    # When
+    position = index.add(15, 10, 2)
+
+    # Then
+    assert position == 1
+    assert list(index.timestamps) == [10, 15, 20, 30]
+    assert list(index.price_x_qty) == [0, 2, 22, 34, 64]
+    assert list(index.quantity) == [0, 1, 3, 6, 11]
+    assert index.sums(15, 20) == (20, 2)
+
+
+def test_extend(index):
+    """Several trades in time order are indexed at once."""
+    # When
+    res = index.extend([30, 40], [1, 2], [1, 1])
+
+    # Then
+    assert res == (3, None)
+    assert len(index) == 5
+    assert index.sums(30, 50) == (33, 7)
+
+
+def test_extend_out_of_order(index):
+    """Several trades out of time order are merged in time order."""
+    # When
+    start, order = index.extend([40, 20, 15], [1, 2, 10], [1, 1, 2])
+
+    # Then
+    assert start == 1
+    assert order == [4, 0, 3, 1, 2]
+    assert list(index.timestamps) == [10, 15, 20, 20, 30, 40]
+    assert list(index.price_x_qty) == [0, 2, 22, 34, 36, 66, 67]
+    assert list(index.quantity) == [0, 1, 3, 6, 7, 12, 13]
+    assert index.sums(15, 30) == (34, 6)
+
+
+def test_extend_nothing(index):
+    """Indexing no trades is managed."""
+    # When / Then
+    assert index.extend([], [], []) == (3, None)
+    assert len(index) == 3
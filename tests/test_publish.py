@@ -0,0 +1,209 @@
+"""gbce.publish module tests."""
+
+
+import math
+import mmap
+import threading
+import time
+
+import pytest
+
+from gbce import Gbce
+from gbce.clock import SimulatedClock
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+from gbce.publish import (
+    HEADER,
+    INDEX_OFFSET,
+    MAGIC,
+    SEQUENCE,
+    SLOTS_OFFSET,
+    PublishedIndex,
+    PublishedPrice,
+    Publisher,
+    Subscriber,
+)
+
+
+@pytest.fixture
+def gbce():
+    """GBCE with a simulated clock and some traded stocks."""
+    gbce = Gbce(clock=SimulatedClock(1000))
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    gbce.ingest_trades(
+        [
+            ("TEA", TradeType.BUY, 1, 2, None),
+            ("GIN", TradeType.SELL, 1, 8, None),
+        ]
+    )
+    return gbce
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Publication path."""
+    return tmp_path / "gbce.prices"
+
+
+def test_publish(gbce, path):
+    """Published prices and index can be read by subscribers."""
+    # Given
+    with Publisher(path, capacity=4) as publisher:
+        written = publisher.publish(gbce.view())
+
+        # When
+        with Subscriber(path) as subscriber:
+            # Then
+            assert written == 2
+            assert subscriber.capacity == 4
+            assert len(subscriber) == 2
+            assert list(subscriber) == ["TEA", "GIN"]
+            assert subscriber["TEA"] == PublishedPrice(2, 1, 1000)
+            assert subscriber.all_share_index == PublishedIndex(4, 1000)
+            with pytest.raises(KeyError):
+                subscriber["XXX"]  # pylint: disable=pointless-statement
+
+
+def test_publish_changed_stocks(gbce, path):
+    """Only the stocks that have changed are published again."""
+    # Given
+    with Publisher(path) as publisher, Subscriber(path) as subscriber:
+        publisher.publish(gbce.view())
+        assert subscriber["GIN"].volume_weighted_stock_price == 8
+
+        # When
+        unchanged = publisher.publish(gbce.view())
+        gbce.add_stock("ALE", StockType.COMMON, 23, None, 60)
+        gbce.stocks["GIN"].record_trade(TradeType.BUY, 1, 4)
+        changed = publisher.publish(gbce.view())
+
+        # Then
+        assert unchanged == 0
+        assert changed == 2
+        assert subscriber["GIN"].volume_weighted_stock_price == 6
+        assert subscriber["ALE"] == PublishedPrice(0, 0, 1000)
+        assert len(subscriber) == 3
+
+
+def test_publish_removed_stocks(gbce, path):
+    """Removed stocks are published without a price until listed again."""
+    # Given
+    with Publisher(path) as publisher, Subscriber(path) as subscriber:
+        publisher.publish(gbce.view())
+
+        # When
+        gbce.remove_stock("TEA")
+        removed = publisher.publish(gbce.view())
+        delisted = subscriber["TEA"]
+        gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+        relisted = publisher.publish(gbce.view())
+
+        # Then
+        assert removed == 1
+        assert math.isnan(delisted.volume_weighted_stock_price)
+        assert delisted.volume == 0
+        assert relisted == 1
+        assert subscriber["TEA"] == PublishedPrice(0, 0, 1000)
+        assert len(subscriber) == 2
+
+
+def test_publication_full(gbce, path):
+    """Stocks that don't fit the publication are rejected."""
+    # Given
+    with Publisher(path, capacity=1) as publisher:
+        # When / Then
+        with pytest.raises(ValueError, match="full with 1 stocks"):
+            publisher.publish(gbce.view())
+
+
+@pytest.mark.parametrize("offset", [INDEX_OFFSET, SLOTS_OFFSET])
+def test_torn_read_is_retried(gbce, path, offset):
+    """Reads overlapping a write are retried."""
+    # Given
+    with Publisher(path) as publisher, Subscriber(path) as subscriber:
+        publisher.publish(gbce.view())
+        list(subscriber)
+
+        with open(path, "r+b") as publication:
+            data = mmap.mmap(publication.fileno(), 0)
+        sequence = SEQUENCE.unpack_from(data, offset)[0]
+        SEQUENCE.pack_into(data, offset, sequence + 1)
+
+        def finish_write():
+            time.sleep(0.01)
+            SEQUENCE.pack_into(data, offset, sequence + 2)
+
+        writer = threading.Thread(target=finish_write)
+
+        # When
+        writer.start()
+        price = subscriber["TEA"]
+        index = subscriber.all_share_index
+        writer.join()
+        data.close()
+
+        # Then
+        assert price.volume_weighted_stock_price == 2
+        assert index.value == pytest.approx(4)
+
+
+def test_changed_read_is_retried(gbce, path, mocker):
+    """Reads that see the sequence change are retried."""
+    # Given
+    with Publisher(path) as publisher, Subscriber(path) as subscriber:
+        publisher.publish(gbce.view())
+        list(subscriber)
+        sequence = mocker.patch("gbce.publish.SEQUENCE")
+        sequence.unpack_from.side_effect = [(99,), (2,), (99,), (2,)]
+
+        # When
+        price = subscriber["TEA"]
+        index = subscriber.all_share_index
+
+        # Then
+        assert price.volume_weighted_stock_price == 2
+        assert index.value == pytest.approx(4)
+        assert sequence.unpack_from.call_count == 4
+
+
+@pytest.mark.parametrize(
+    ["offset", "read"],
+    [
+        (INDEX_OFFSET, lambda subscriber: subscriber.all_share_index),
+        (SLOTS_OFFSET, lambda subscriber: subscriber["TEA"]),
+    ],
+)
+def test_read_left_mid_write_times_out(gbce, path, offset, read):
+    """Reads of a record a dead publisher left mid-write time out."""
+    # Given
+    with Publisher(path) as publisher, Subscriber(
+        path, timeout=0.01
+    ) as subscriber:
+        publisher.publish(gbce.view())
+        list(subscriber)
+        with open(path, "r+b") as publication:
+            data = mmap.mmap(publication.fileno(), 0)
+        SEQUENCE.pack_into(data, offset, 1)
+        data.close()
+
+        # When / Then
+        with pytest.raises(TimeoutError, match="stayed mid-write"):
+            read(subscriber)
+
+
+@pytest.mark.parametrize(
+    ["header", "message"],
+    [
+        (HEADER.pack(b"GBCE", 1, 0), "isn't a GBCE publication"),
+        (HEADER.pack(MAGIC, 99, 0), "Unsupported publication version 99"),
+    ],
+)
+def test_invalid_publication(path, header, message):
+    """Files that aren't publications of a supported version are rejected."""
+    # Given
+    path.write_bytes(header)
+
+    # When / Then
+    with pytest.raises(ValueError, match=message):
+        Subscriber(path)
@@ -0,0 +1,83 @@
+"""gbce.quotes module tests."""
+
+
+import math
+
+import pytest
+
+from gbce.quotes import StockParameters
+
+from .factories import CommonStockFactory, PreferredStockFactory
+
+
+@pytest.fixture
+def stocks():
+    """Common, preferred and dividendless stocks."""
+    return [
+        CommonStockFactory(name="POP", last_dividend=8),
+        PreferredStockFactory(
+            name="GIN", last_dividend=8, fixed_dividend=2, par_value=100
+        ),
+        CommonStockFactory(name="TEA", last_dividend=0),
+    ]
+
+
+def test_parameters(stocks):
+    """Stock parameters are copied into typed arrays."""
+    # When
+    parameters = StockParameters(stocks)
+
+    # Then
+    assert len(parameters) == 3
+    assert parameters.names == ("POP", "GIN", "TEA")
+    assert list(parameters.preferred) == [0, 1, 0]
+    assert list(parameters.last_dividend) == [8, 8, 0]
+    assert math.isnan(parameters.fixed_dividend[0])
+    assert parameters.fixed_dividend[1] == 2
+    assert list(parameters.par_value) == [100, 100, 100]
+
+
+@pytest.mark.parametrize(
+    "prices", [{"POP": 2, "GIN": 4, "TEA": 5, "XXX": 1}, [2, 4, 5]]
+)
+def test_quote(stocks, prices):
+    """Quotes match the ones of every stock."""
+    # Given
+    parameters = StockParameters(stocks)
+
+    # When
+    table = parameters.quote(prices, [1, 2, 3])
+
+    # Then
+    assert list(table.prices) == [2, 4, 5]
+    assert list(table.volume_weighted_stock_price) == [1, 2, 3]
+    for i, (stock, price) in enumerate(zip(stocks, [2, 4, 5])):
+        assert table.dividend_yield[i] == stock.calculate_dividend_yield(price)
+    assert list(table.p_e_ratio[:2]) == [0.25, 0.5]
+    assert math.isnan(table.p_e_ratio[2])
+
+
+def test_quote_missing_prices(stocks):
+    """Stocks without a price or with a price of zero aren't quoted."""
+    # Given
+    parameters = StockParameters(stocks)
+
+    # When
+    table = parameters.quote({"POP": 0}, [0, 0, 0])
+
+    # Then
+    assert math.isnan(table.dividend_yield[0])
+    assert table.p_e_ratio[0] == 0
+    assert all(math.isnan(value) for value in table.prices[1:])
+    assert all(math.isnan(value) for value in table.dividend_yield[1:])
+    assert all(math.isnan(value) for value in table.p_e_ratio[1:])
+
+
+def test_quote_wrong_number_of_prices(stocks):
+    """Prices in order are one per stock."""
+    # Given
+    parameters = StockParameters(stocks)
+
+    # When / Then
+    with pytest.raises(ValueError, match="Got 2 prices for 3 stocks"):
+        parameters.quote([1, 2], [0, 0, 0])
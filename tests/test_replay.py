@@ -0,0 +1,117 @@
+"""gbce.replay module tests."""
+
+
+import pytest
+
+from gbce import Gbce
+from gbce.clock import SimulatedClock
+from gbce.ingest import UNKNOWN_STOCK
+from gbce.models.retention import Retention
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+from gbce.replay import TapeReplay
+from gbce.tape import TapeRecord, read_binary, write_binary
+
+RECORDS = [
+    TapeRecord(1000, "TEA", TradeType.BUY, 1, 2),
+    TapeRecord(1010, "GIN", TradeType.SELL, 1, 8),
+    TapeRecord(1030, "XXX", TradeType.SELL, 1, 8),
+    TapeRecord(1070, "TEA", TradeType.BUY, 1, 4),
+    TapeRecord(1300, "GIN", TradeType.BUY, 1, 2),
+]
+
+
+@pytest.fixture
+def gbce():
+    """GBCE with a simulated clock and some stocks."""
+    gbce = Gbce(clock=SimulatedClock(), retention=Retention(max_age=600))
+    gbce.add_stock("TEA", StockType.COMMON, 0, None, 100)
+    gbce.add_stock("GIN", StockType.PREFERRED, 8, 2, 100)
+    return gbce
+
+
+def test_replay_needs_simulated_clock():
+    """Replay is not allowed on a GBCE with a wall clock."""
+    # When / Then
+    with pytest.raises(ValueError, match="simulated clock"):
+        TapeReplay(Gbce(retention=Retention(max_age=600)))
+
+
+def test_replay_needs_retention():
+    """Replay is not allowed on a GBCE that keeps every trade."""
+    # When / Then
+    with pytest.raises(ValueError, match="retention policy"):
+        TapeReplay(Gbce(clock=SimulatedClock()))
+
+
+def test_replay_bounds_memory(gbce):
+    """Replayed trades beyond the retention limits are compacted."""
+    # Given
+    records = (
+        TapeRecord(float(second), "TEA", TradeType.BUY, 1, 2)
+        for second in range(20000)
+    )
+
+    # When
+    samples = list(TapeReplay(gbce, interval=60).samples(records))
+
+    # Then
+    assert len(samples) == 334
+    assert len(gbce.stocks["TEA"].trades) < 1000
+    assert len(gbce.stocks["TEA"].bars) > 300
+
+
+def test_replay_samples(gbce):
+    """Replay samples the GBCE at every interval."""
+    # Given
+    replay = TapeReplay(gbce, interval=60, batch_size=2)
+
+    # When
+    samples = list(replay.samples(RECORDS))
+
+    # Then
+    assert [sample.timestamp for sample in samples] == [
+        1020,
+        1080,
+        1140,
+        1200,
+        1260,
+        1320,
+    ]
+    assert samples[0].prices == {"TEA": 2, "GIN": 8}
+    assert samples[0].all_share_index == pytest.approx(4)
+    assert samples[1].prices == {"TEA": 3, "GIN": 8}
+    assert samples[-1].prices == {"TEA": 4, "GIN": 2}
+    assert replay.summary.accepted == 4
+    assert replay.summary.rejected == [(2, UNKNOWN_STOCK)]
+    assert gbce.clock.now() == 1320
+
+
+def test_replay_series(gbce, tmp_path):
+    """Replay collects the samples into arrays."""
+    # Given
+    path = tmp_path / "tape.bin"
+    write_binary(path, RECORDS)
+    replay = TapeReplay(gbce, interval=300)
+
+    # When
+    series = replay.series(read_binary(path))
+
+    # Then
+    assert list(series.timestamps) == [1200, 1500]
+    assert list(series.prices["TEA"]) == [3, 0]
+    assert list(series.prices["GIN"]) == [8, 2]
+    assert list(series.all_share_index) == pytest.approx([24**0.5, 2])
+
+
+def test_replay_empty_tape(gbce):
+    """Replay of an empty tape has no samples."""
+    # When / Then
+    assert not list(TapeReplay(gbce).samples([]))
+
+
+def test_replay_unordered_tape(gbce):
+    """Replay of a tape that isn't in timestamp order is not allowed."""
+    # When / Then
+    with pytest.raises(ValueError):
+        list(TapeReplay(gbce).samples(reversed(RECORDS)))
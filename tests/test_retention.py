@@ -0,0 +1,73 @@
+"""gbce.models.retention module tests."""
+
+
+import pytest
+
+from gbce.models.retention import Retention
+
+
+def test_retention_needs_a_limit():
+    """Retention without limits is not allowed."""
+    # When / Then
+    with pytest.raises(ValueError):
+        Retention()
+
+
+def test_repr():
+    """Method repr works."""
+    # When / Then
+    assert repr(Retention(max_age=60)) == (
+        "<Retention max_age=60 max_count=None>"
+    )
+
+
+@pytest.mark.parametrize(
+    ["count", "result"], [(0, False), (10, False), (11, False), (12, True)]
+)
+def test_due_by_count(count, result):
+    """Compaction is due once the count exceeds the limit and slack."""
+    # Given
+    retention = Retention(max_count=10)
+
+    # When / Then
+    assert retention.due(list(range(count)), 0) is result
+
+
+@pytest.mark.parametrize(
+    ["oldest", "result"], [(100, False), (34, False), (33, True)]
+)
+def test_due_by_age(oldest, result):
+    """Compaction is due once the age exceeds the limit and slack."""
+    # Given
+    retention = Retention(max_age=60)
+
+    # When / Then
+    assert retention.due([oldest, 100], 100) is result
+
+
+def test_due_only_when_trades_can_be_removed():
+    """Compaction isn't due while the trades to remove are kept anyway."""
+    # Given
+    by_count = Retention(max_count=10)
+    by_age = Retention(max_age=60)
+
+    # When / Then
+    assert not by_count.due(list(range(20)), 100, keep_after=1)
+    assert by_count.due(list(range(20)), 100, keep_after=2)
+    assert not by_age.due([30, 100], 100, keep_after=30)
+    assert by_age.due([30, 100], 100, keep_after=31)
+
+
+@pytest.mark.parametrize(
+    ["retention", "result"],
+    [
+        (Retention(max_age=60), 40),
+        (Retention(max_count=2), 80),
+        (Retention(max_count=10), float("-inf")),
+        (Retention(max_age=10, max_count=4), 90),
+    ],
+)
+def test_cutoff(retention, result):
+    """Cutoff follows the strictest limit."""
+    # When / Then
+    assert retention.cutoff([0, 20, 50, 80, 100], 100) == result
@@ -0,0 +1,210 @@
+"""gbce.sharded module tests."""
+
+
+import multiprocessing
+import threading
+
+import pytest
+
+from gbce import Gbce
+from gbce.clock import SimulatedClock
+from gbce.ingest import UNKNOWN_STOCK, UNKNOWN_TRADE_TYPE
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+from gbce.sharded import ShardedGbce, serve, shard_of, take_rows
+
+STOCKS = [
+    ("TEA", StockType.COMMON, 0, None, 100),
+    ("POP", StockType.COMMON, 8, None, 100),
+    ("ALE", StockType.COMMON, 23, None, 60),
+    ("GIN", StockType.PREFERRED, 8, 2, 100),
+    ("JOE", StockType.COMMON, 13, None, 250),
+]
+
+TRADES = [
+    ("TEA", TradeType.BUY, 1, 2, None),
+    ("XXX", TradeType.BUY, 1, 2, None),
+    ("POP", TradeType.SELL, 2, 4, None),
+    ("ALE", "HOLD", 1, 8, None),
+    ("GIN", TradeType.BUY, 3, 8, None),
+    ("JOE", TradeType.SELL, 1, 16, None),
+    ("TEA", TradeType.SELL, 3, 6, None),
+]
+
+
+@pytest.fixture(name="sharded")
+def sharded_fixture():
+    """Sharded GBCE with some stocks."""
+    with ShardedGbce(3) as sharded:
+        for stock in STOCKS:
+            sharded.add_stock(*stock)
+        yield sharded
+
+
+def test_shard_of():
+    """Stocks are partitioned by a stable hash of their name."""
+    # When
+    shards = [shard_of(name, 3) for name, *_ in STOCKS]
+
+    # Then
+    assert shards == [shard_of(name, 3) for name, *_ in STOCKS]
+    assert set(shards) <= {0, 1, 2}
+    assert len(set(shards)) > 1
+
+
+def test_take_rows():
+    """Rows of parallel columns are taken together."""
+    # Given
+    columns = (["a", "b", "c"], [1, 2, 3])
+
+    # When / Then
+    assert take_rows(columns, [0, 2]) == (("a", "c"), (1, 3))
+    assert take_rows(columns, [1]) == (["b"], [2])
+
+
+def test_sharded_gbce(sharded):
+    """A sharded GBCE calculates like a single process one."""
+    # Given
+    gbce = Gbce()
+    for stock in STOCKS:
+        gbce.add_stock(*stock)
+
+    # When
+    summary = sharded.ingest_trades(TRADES)
+    recorded = sharded.record_trade("ALE", TradeType.BUY, 1, 8)
+    gbce.ingest_trades(TRADES)
+    gbce.stocks["ALE"].record_trade(TradeType.BUY, 1, 8)
+
+    # Then
+    assert sharded.shards == 3
+    assert sharded.listings == {name: kind for name, kind, *_ in STOCKS}
+    assert summary.accepted == 5
+    assert summary.rejected == [(1, UNKNOWN_STOCK), (3, UNKNOWN_TRADE_TYPE)]
+    assert recorded
+    assert not sharded.record_trade("XXX", TradeType.BUY, 1, 8)
+    assert sharded.calculate_all_share_index() == pytest.approx(
+        gbce.calculate_all_share_index()
+    )
+    assert sharded.calculate_volume_weighted_stock_price("TEA") == 5
+    assert sharded.calculate_volume_weighted_stock_prices([60]) == (
+        gbce.calculate_volume_weighted_stock_prices([60])
+    )
+    universes = {
+        "common": StockType.COMMON,
+        "some": ["TEA", "GIN", "XXX"],
+        "none": [],
+    }
+    assert sharded.calculate_sub_indices(universes) == pytest.approx(
+        gbce.calculate_sub_indices(universes)
+    )
+    assert sharded.calculate_all_share_index(
+        StockType.PREFERRED
+    ) == pytest.approx(8)
+
+
+def test_sharded_gbce_with_a_simulated_clock():
+    """Shards calculate as of the time of the coordinator clock."""
+    # Given
+    clock = SimulatedClock(1000)
+    gbce = Gbce(clock=clock)
+    with ShardedGbce(3, clock=clock) as sharded:
+        for stock in STOCKS:
+            gbce.add_stock(*stock)
+            sharded.add_stock(*stock)
+        gbce.ingest_trades(TRADES)
+        sharded.ingest_trades(TRADES)
+
+        # When
+        prices = [sharded.calculate_volume_weighted_stock_prices([60])]
+        indices = [sharded.calculate_all_share_index()]
+        expected = [gbce.calculate_volume_weighted_stock_prices([60])]
+        expected_indices = [gbce.calculate_all_share_index()]
+        clock.advance(30)
+        sharded.record_trade("TEA", TradeType.BUY, 1, 10)
+        gbce.stocks["TEA"].record_trade(TradeType.BUY, 1, 10)
+        clock.advance(45)
+        prices.append(sharded.calculate_volume_weighted_stock_prices([60]))
+        indices.append(sharded.calculate_all_share_index())
+        expected.append(gbce.calculate_volume_weighted_stock_prices([60]))
+        expected_indices.append(gbce.calculate_all_share_index())
+
+    # Then
+    assert prices == expected
+    assert prices[0]["TEA"][60] == 5
+    assert prices[1]["TEA"][60] == 10
+    assert indices == pytest.approx(expected_indices)
+    assert indices[0] > 0
+
+
+def test_add_existing_stock(sharded):
+    """A stock can't be added twice."""
+    # When / Then
+    assert not sharded.add_stock(*STOCKS[0])
+
+
+def test_shard_error(sharded):
+    """Errors raised by a shard are raised by the sharded GBCE."""
+    # When / Then
+    with pytest.raises(KeyError):
+        sharded.calculate_volume_weighted_stock_price("XXX")
+
+
+def test_ingest_trade_columns_of_different_lengths(sharded):
+    """Trade columns of different lengths are refused before being sent."""
+    # When / Then
+    with pytest.raises(ValueError):
+        sharded.ingest_trade_columns(["TEA"], [TradeType.BUY], [1], [2, 4])
+
+
+def test_closed():
+    """A closed sharded GBCE can't be used."""
+    # Given
+    sharded = ShardedGbce(1, context=multiprocessing.get_context("spawn"))
+
+    # When
+    sharded.close()
+    sharded.close()
+
+    # Then
+    with pytest.raises(RuntimeError):
+        sharded.calculate_all_share_index()
+
+
+def test_serve():
+    """A shard answers requests until asked to close."""
+    # Given
+    connection, child = multiprocessing.Pipe()
+    shard = threading.Thread(target=serve, args=(child, {}))
+    shard.start()
+
+    # When
+    connection.send(("add_stock", 1000, STOCKS[0]))
+    added = connection.recv()
+    connection.send(("unknown", 1000, ()))
+    unknown = connection.recv()
+    connection.send(("log_sum", 1000, ()))
+    log_sum = connection.recv()
+    connection.send(("close", 1000, ()))
+    closed = connection.recv()
+    shard.join()
+
+    # Then
+    assert added == (True, True)
+    assert not unknown[0]
+    assert isinstance(unknown[1], KeyError)
+    assert log_sum == (True, (0.0, 0))
+    assert closed == (True, None)
+    assert child.closed
+
+
+def test_serve_disconnected():
+    """A shard stops when its connection is closed."""
+    # Given
+    connection, child = multiprocessing.Pipe()
+
+    # When
+    connection.close()
+    serve(child, {})
+
+    # Then
+    assert child.closed
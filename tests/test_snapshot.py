@@ -0,0 +1,104 @@
+"""gbce.snapshot module tests."""
+
+
+import pytest
+from pytest_factoryboy import register
+
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+from gbce.snapshot import HEADER, MAGIC, read_snapshot, write_snapshot
+
+from .factories import CommonStockFactory, PreferredStockFactory
+
+register(CommonStockFactory)
+register(PreferredStockFactory)
+
+
+def test_snapshot(tmp_path, common_stock, preferred_stock):
+    """Stocks and their trades can be written and read back."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    common_stock.record_trades(
+        [(TradeType.SELL, 3, 4, 1100), (TradeType.BUY, 1, 2, 1000)]
+    )
+
+    # When
+    count = write_snapshot(path, [common_stock, preferred_stock])
+    entries = read_snapshot(path)
+
+    # Then
+    assert count == 2
+    assert [entry.name for entry in entries] == [
+        common_stock.name,
+        preferred_stock.name,
+    ]
+    assert entries[0].stock_type == StockType.COMMON
+    assert entries[0].par_value == common_stock.par_value
+    assert entries[0].trade_count == 2
+    assert entries[1].stock_type == StockType.PREFERRED
+    assert entries[1].fixed_dividend == preferred_stock.fixed_dividend
+    assert entries[1].trade_count == 0
+    codes, quantities, prices, timestamps = entries[0].load()
+    assert list(codes) == [0, 1]
+    assert list(quantities) == [1, 3]
+    assert list(prices) == [2, 4]
+    assert list(timestamps) == [1000, 1100]
+    assert [list(column) for column in entries[1].load()] == [[]] * 4
+
+
+def test_snapshot_without_fixed_dividend(tmp_path, common_stock_factory):
+    """Stocks without fixed dividend can be written and read back."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    write_snapshot(path, [common_stock_factory(fixed_dividend=None)])
+
+    # When / Then
+    assert read_snapshot(path)[0].fixed_dividend is None
+
+
+@pytest.mark.parametrize(
+    ["header", "message"],
+    [
+        (HEADER.pack(b"TAPE", 1, 0), "isn't a GBCE snapshot"),
+        (HEADER.pack(MAGIC, 99, 0), "Unsupported snapshot version 99"),
+    ],
+)
+def test_invalid_snapshot(tmp_path, header, message):
+    """Files that aren't snapshots of a supported version are rejected."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    path.write_bytes(header)
+
+    # When / Then
+    with pytest.raises(ValueError, match=message):
+        read_snapshot(path)
+
+
+def test_failed_snapshot_keeps_the_previous_one(
+    tmp_path, common_stock, preferred_stock, mocker
+):
+    """A snapshot that fails to be written leaves the previous one intact."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+    write_snapshot(path, [common_stock])
+    previous = path.read_bytes()
+
+    # When
+    mocker.patch("os.fsync", side_effect=OSError("No space left"))
+    with pytest.raises(OSError):
+        write_snapshot(path, [common_stock, preferred_stock])
+
+    # Then
+    assert path.read_bytes() == previous
+    assert [entry.name for entry in read_snapshot(path)] == [common_stock.name]
+
+
+def test_snapshot_with_a_long_name(tmp_path, common_stock_factory):
+    """Stocks whose names don't fit the snapshot are rejected."""
+    # Given
+    path = tmp_path / "gbce.snapshot"
+
+    # When / Then
+    with pytest.raises(ValueError, match="longer than 16 bytes"):
+        write_snapshot(path, [common_stock_factory(name="A" * 17)])
+    assert not list(tmp_path.iterdir())
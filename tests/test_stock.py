@@ -1,15 +1,24 @@
 """gbce.models.stock package tests."""
 
 
+import math
+from array import array
+
 import pytest
 from pytest_factoryboy import register
 
+from gbce.ingest import NON_FINITE_VALUE
+from gbce.metrics import Metrics
+from gbce.models.bars import Bar
+from gbce.models.retention import Retention
+from gbce.models.stock import StockType
 from gbce.models.trade import Trade, TradeType
 
 from .factories import CommonStockFactory, PreferredStockFactory
 
 register(CommonStockFactory)
 register(CommonStockFactory, "common_stock_no_dividend", last_dividend=0)
+register(CommonStockFactory, "columnar_stock", columnar=True)
 register(PreferredStockFactory)
 
 
@@ -19,6 +28,13 @@ def test_repr(common_stock):
     assert '<CommonStock "POP" object at ' in repr(common_stock)
 
 
+def test_type(common_stock, preferred_stock):
+    """Get type works."""
+    # When / Then
+    assert common_stock.type == StockType.COMMON
+    assert preferred_stock.type == StockType.PREFERRED
+
+
 @pytest.mark.parametrize(["price", "result"], [(0, None), (1, 800), (2, 400)])
 def test_common_dividend_yield(common_stock, price, result):
     """Common stock dividend yield works."""
@@ -64,6 +80,23 @@ def test_volume_weighted_stock_price(common_stock):
     assert res == 4.888888888888889
 
 
+def test_columnar_volume_weighted_stock_price(columnar_stock):
+    """Volume weighted stock price works with columnar trades."""
+    # Given
+    trades = [(1, 2), (3, 4), (5, 6)]
+    for quantity, price in trades:
+        columnar_stock.buy(quantity, price)
+    columnar_stock.record_trade(TradeType.BUY, 10, 100, 1000000000)
+
+    # When
+    res = columnar_stock.calculate_volume_weighted_stock_price()
+
+    # Then
+    assert res == 4.888888888888889
+    assert len(columnar_stock.trades) == 4
+    assert columnar_stock.trades[0].timestamp == 1000000000
+
+
 def test_expired_trades_dont_affect_vwsp(common_stock):
     """Volume weighted stock price on expired trades is managed."""
     # Given
@@ -119,3 +152,532 @@ def test_buy(common_stock, quantity, price, result):
     if result:
         assert isinstance(trade, Trade)
     assert len(common_stock.trades) == result
+
+
+@pytest.fixture(params=[False, True])
+def any_stock(common_stock_factory, request):
+    """Common stock with every trade store."""
+    return common_stock_factory(columnar=request.param)
+
+
+@pytest.mark.parametrize(
+    ["quantity", "price"],
+    [
+        (math.inf, 2),
+        (math.nan, 2),
+        (1, math.inf),
+        (1, -math.inf),
+        (1, math.nan),
+    ],
+)
+def test_non_finite_trades_are_rejected(any_stock, caplog, quantity, price):
+    """Trades with infinite or NaN quantities or prices aren't recorded."""
+    # Given
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # When
+    trade = any_stock.record_trade(TradeType.BUY, quantity, price, 1000)
+    summary = any_stock.record_trades([(TradeType.BUY, quantity, price, 1000)])
+
+    # Then
+    assert trade is None
+    assert summary.rejected == [(0, NON_FINITE_VALUE)]
+    assert caplog.messages[0] == "POP: Quantity and price need to be finite"
+    assert len(any_stock.trades) == 1
+    assert any_stock.calculate_volume_weighted_stock_price(1000) == 2
+    assert any_stock.window_state(1000)[:2] == (2, 1)
+    assert any_stock.vwsp_between(0, 2000) == 2
+
+
+def test_record_trades(any_stock, caplog):
+    """Record several trades at once works."""
+    # When
+    summary = any_stock.record_trades(
+        [
+            (TradeType.BUY, 1, 2, None),
+            (TradeType.SELL, 0, 3, None),
+            (TradeType.BUY, 3, 4, None),
+            ("invalid", 3, 4, None),
+            (TradeType.SELL, 5, 6, None),
+        ]
+    )
+
+    # Then
+    assert summary.accepted == 3
+    assert [index for index, _ in summary.rejected] == [1, 3]
+    assert len(any_stock.trades) == 3
+    assert any_stock.calculate_volume_weighted_stock_price() == (
+        4.888888888888889
+    )
+    assert len(caplog.records) == 1
+
+
+def test_record_trade_columns(any_stock, caplog):
+    """Record trades given as columns works."""
+    # When
+    summary = any_stock.record_trade_columns(
+        [TradeType.BUY, TradeType.SELL, TradeType.BUY],
+        [1, 3, 10],
+        [2, 4, 100],
+    )
+
+    # Then
+    assert summary.accepted == 3
+    assert not summary.rejected
+    assert not caplog.records
+    assert any_stock.calculate_volume_weighted_stock_price() == (
+        72.42857142857143
+    )
+
+
+def test_record_unordered_trade_columns(any_stock):
+    """Record trades given in any timestamp order works."""
+    # Given
+    any_stock.record_trade(TradeType.BUY, 1, 2)
+
+    # When
+    any_stock.record_trade_columns(
+        [TradeType.BUY, TradeType.SELL], [3, 10], [4, 100], [None, 1000000000]
+    )
+
+    # Then
+    assert len(any_stock.trades) == 3
+    assert any_stock.calculate_volume_weighted_stock_price() == 3.5
+
+
+def test_record_trade_columns_of_different_lengths(any_stock):
+    """Trade columns of different lengths are refused."""
+    # When / Then
+    with pytest.raises(ValueError):
+        any_stock.record_trade_columns([TradeType.BUY], [1, 2], [3, 4])
+    with pytest.raises(ValueError):
+        any_stock.record_trade_columns([TradeType.BUY], [1], [3], [1, 2])
+    assert not any_stock.trades
+    assert any_stock.calculate_volume_weighted_stock_price() == 0
+
+
+def test_record_no_trades(any_stock):
+    """Record an empty set of trades is managed."""
+    # When
+    summary = any_stock.record_trades([])
+
+    # Then
+    assert summary.accepted == 0
+    assert not any_stock.trades
+
+
+def test_metrics(common_stock_factory):
+    """Instrumented stocks count and time their trades and prices."""
+    # Given
+    metrics = Metrics()
+    stock = common_stock_factory(metrics=metrics)
+
+    # When
+    stock.record_trade(TradeType.BUY, 1, 2)
+    stock.record_trade(TradeType.BUY, 0, 2)
+    stock.record_trades(
+        [(TradeType.SELL, 3, 4, None), (TradeType.SELL, -1, 4, None)]
+    )
+    stock.calculate_volume_weighted_stock_price()
+
+    # Then
+    assert stock.metrics()[:3] == (2, 2, 2)
+    assert stock.metrics().memory_bytes > 0
+    assert metrics.record_trade.snapshot().samples == 1
+    assert metrics.vwsp.snapshot().samples == 1
+    assert metrics.vwsp_trades.snapshot().sum == 2
+
+
+def test_no_metrics(any_stock):
+    """Uninstrumented stocks don't count their trades."""
+    # When
+    any_stock.record_trade(TradeType.BUY, 1, 2)
+    any_stock.record_trade(TradeType.BUY, 0, 2)
+
+    # Then
+    assert any_stock.metrics()[:3] == (0, 0, 1)
+
+
+@pytest.fixture
+def traded_stock(any_stock):
+    """Stock with trades over some time."""
+    any_stock.record_trades(
+        [
+            (TradeType.BUY, 1, 2, 1000),
+            (TradeType.SELL, 3, 4, 1100),
+            (TradeType.BUY, 5, 6, 1400),
+        ]
+    )
+    return any_stock
+
+
+@pytest.mark.parametrize(
+    ["start", "end", "result"],
+    [(1000, 1400, 3.5), (1100, 1401, 5.25), (0, 1000, 0)],
+)
+def test_vwsp_between(traded_stock, start, end, result):
+    """Volume weighted stock price over a time range works."""
+    # When / Then
+    assert traded_stock.vwsp_between(start, end) == result
+
+
+@pytest.mark.parametrize(
+    ["timestamp", "result"],
+    [(999, 0), (1000, 2), (1300, 3.5), (1400, 5.25), (1500, 6)],
+)
+def test_vwsp_at(traded_stock, timestamp, result):
+    """Volume weighted stock price as of a past instant works."""
+    # When / Then
+    assert traded_stock.vwsp_at(timestamp) == result
+
+
+def test_vwsp_at_many(traded_stock):
+    """Volume weighted stock price as of several instants works."""
+    # When / Then
+    assert list(traded_stock.vwsp_at_many([999, 1300, 1500])) == [
+        0,
+        3.5,
+        6,
+    ]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_window(common_stock_factory, columnar):
+    """Window length is configurable."""
+    # Given
+    stock = common_stock_factory(window=60, columnar=columnar)
+    stock.record_trades(
+        [(TradeType.BUY, 1, 2, 1000), (TradeType.BUY, 1, 4, 1050)]
+    )
+
+    # When / Then
+    assert stock.window == 60
+    assert stock.calculate_volume_weighted_stock_price(1055) == 3
+    assert stock.calculate_volume_weighted_stock_price(1061) == 4
+    assert stock.next_expiry(1061) == 1110
+    assert stock.vwsp_at(1061) == 4
+
+
+def test_volume_weighted_stock_prices(traded_stock):
+    """Volume weighted stock price over several windows works."""
+    # When
+    res = traded_stock.calculate_volume_weighted_stock_prices(
+        [60, 300, 600], 1400
+    )
+
+    # Then
+    assert res == {60: 6, 300: 5.25, 600: 4.888888888888889}
+
+
+def test_volume_weighted_stock_prices_now(any_stock):
+    """Volume weighted stock price over several windows up to now works."""
+    # Given
+    any_stock.buy(1, 2)
+
+    # When / Then
+    assert any_stock.calculate_volume_weighted_stock_prices([60, 0]) == {
+        60: 2,
+        0: 0,
+    }
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_retention(common_stock_factory, columnar):
+    """Trades beyond the retention limits are rolled up into bars."""
+    # Given
+    stock = common_stock_factory(
+        columnar=columnar, retention=Retention(max_count=2, slack=0)
+    )
+    assert stock.bars is not None
+
+    # When
+    stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    stock.record_trade(TradeType.SELL, 3, 4, 1010)
+    stock.record_trade(TradeType.SELL, 3, 4, 1020)
+    stock.record_trades(
+        [(TradeType.BUY, 5, 6, 1070), (TradeType.BUY, 1, 1, 1)]
+    )
+
+    # Then
+    assert [trade.timestamp for trade in stock.trades] == [1020, 1070]
+    assert list(stock.bars) == [
+        Bar(0, 1, 1, 1, 1, 1, 1),
+        Bar(960, 2, 4, 2, 4, 4, 3.5),
+    ]
+    assert stock.vwsp_between(0, 2000) == 5.25
+
+
+def test_retention_keeps_recent_trades(common_stock_factory):
+    """Trades that are still recent are never compacted."""
+    # Given
+    stock = common_stock_factory(retention=Retention(max_count=1))
+    stock.buy(1, 2)
+    stock.buy(1, 4)
+    stock.buy(1, 6)
+
+    # When
+    res = stock.compact()
+
+    # Then
+    assert res == 0
+    assert len(stock.trades) == 3
+    assert stock.calculate_volume_weighted_stock_price() == 4
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_retention_bounds_memory(common_stock_factory, columnar):
+    """Memory stays flat under retention, even without reads."""
+    # Given
+    stock = common_stock_factory(
+        columnar=columnar, retention=Retention(max_age=600)
+    )
+
+    # When
+    sizes = []
+    for start in range(0, 20000, 5000):
+        stock.record_trades(
+            [(TradeType.BUY, 1, 2, t) for t in range(start, start + 5000)]
+        )
+        sizes.append(stock.metrics().memory_bytes)
+
+    # Then
+    assert len(stock.trades) < 1000
+    assert max(sizes[1:]) < 2 * sizes[0]
+
+
+def test_no_retention(common_stock):
+    """Stocks without retention keep every trade."""
+    # Given
+    common_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # When / Then
+    assert common_stock.compact() == 0
+    assert common_stock.bars is None
+    assert len(common_stock.trades) == 1
+
+
+def test_aggregate_bars(any_stock):
+    """Recorded trades are aggregated into bars."""
+    # Given
+    assert any_stock.aggregator is None
+    aggregator = any_stock.aggregate_bars([1, 60])
+
+    # When
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    any_stock.record_trades(
+        [(TradeType.SELL, 3, 4, 1001), (TradeType.BUY, 5, 6, 1070)]
+    )
+
+    # Then
+    assert any_stock.aggregate_bars([300]) is aggregator
+    assert any_stock.aggregator is aggregator
+    assert len(aggregator[1]) == 3
+    assert aggregator[60][:] == [
+        Bar(960, 2, 4, 2, 4, 4, 3.5, 1, 3),
+        Bar(1020, 6, 6, 6, 6, 5, 6, 5, 0),
+    ]
+    assert not aggregator[300]
+
+
+def test_trade_while_a_bar_view_is_held(any_stock):
+    """Trades opening new bars are recorded while bars are being read."""
+    # Given
+    minutes = any_stock.aggregate_bars([60])[60]
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    any_stock.record_trade(TradeType.BUY, 1, 4, 1070)
+
+    # When
+    with minutes.view() as view:
+        recorded = any_stock.record_trade(TradeType.SELL, 3, 4, 1140)
+        closes = view["closes"].tolist()
+
+    # Then
+    assert recorded
+    assert closes == [2]
+    assert len(minutes) == 3
+
+
+def test_restore_trades(any_stock):
+    """Trades can be restored without notifying the listeners."""
+    # Given
+    listener = []
+    any_stock.add_trade_listener(lambda *args: listener.append(args))
+    loaded = []
+
+    def loader():
+        loaded.append(True)
+        return (
+            array("b", [0, 1]),
+            array("d", [1, 3]),
+            array("d", [2, 4]),
+            array("d", [1000, 1100]),
+        )
+
+    # When
+    any_stock.restore_trades(loader, lazy=True)
+
+    # Then
+    assert not loaded
+    assert [list(column) for column in any_stock.trade_columns()] == [
+        [0, 1],
+        [1, 3],
+        [2, 4],
+        [1000, 1100],
+    ]
+    assert any_stock.trades[0].type == TradeType.BUY
+    assert loaded == [True]
+    assert not listener
+
+
+def test_trade_columns_are_copies(any_stock):
+    """Trade columns stay as they were while the stock trades."""
+    # Given
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    columns = any_stock.trade_columns()
+
+    # When
+    with memoryview(columns[3]):
+        any_stock.record_trade(TradeType.SELL, 3, 4, 1100)
+
+    # Then
+    assert [list(column) for column in columns] == [
+        [0],
+        [1],
+        [2],
+        [1000],
+    ]
+    assert len(any_stock.trade_columns()[0]) == 2
+
+
+def test_remove_trade_listener(any_stock):
+    """Removed listeners aren't called."""
+    # Given
+    listener = []
+    any_stock.add_trade_listener(listener.append)
+    any_stock.remove_trade_listener(listener.append)
+
+    # When
+    any_stock.record_trade(TradeType.BUY, 1, 2)
+
+    # Then
+    assert not listener
+
+
+def test_cancel_subscriptions(any_stock):
+    """Every subscription to a stock can be cancelled at once."""
+    # Given
+    subscriptions = [any_stock.subscribe(print) for _ in range(3)]
+    subscriptions[0].cancel()
+
+    # When
+    cancelled = any_stock.cancel_subscriptions()
+
+    # Then
+    assert cancelled == 2
+    assert all(subscription.cancelled for subscription in subscriptions)
+    assert any_stock.cancel_subscriptions() == 0
+    assert not any_stock._listeners  # pylint: disable=protected-access
+
+
+def test_relist(any_stock):
+    """Relisted stocks keep their trades."""
+    # Given
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+
+    # When
+    any_stock.relist(10, 3, 50)
+
+    # Then
+    assert any_stock.last_dividend == 10
+    assert any_stock.fixed_dividend == 3
+    assert any_stock.par_value == 50
+    assert len(any_stock.trades) == 1
+
+
+def test_subscribe(any_stock):
+    """Volume weighted price changes are notified to subscriptions."""
+    # Given
+    subscription = any_stock.subscribe(print, threshold=0.5)
+    initial = subscription.check(1000)
+
+    # When
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    traded = subscription.check(1000)
+    any_stock.record_trade(TradeType.BUY, 1, 3, 1010)
+    within_threshold = subscription.check(1010)
+    expired = subscription.check(1301)
+    subscription.cancel()
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1400)
+
+    # Then
+    assert initial.value == 0
+    assert traded.value == 2
+    assert within_threshold is None
+    assert expired.value == 3
+    assert subscription.check(1400) is None
+    assert not any_stock._listeners  # pylint: disable=protected-access
+
+
+def test_read_during_a_write_takes_the_lock(any_stock):
+    """Reads that start while a write is flagged wait for the lock."""
+    # pylint: disable=protected-access
+    # Given
+    any_stock.record_trade(TradeType.BUY, 1, 2, 1000)
+    any_stock._version += 1
+
+    # When / Then
+    assert any_stock.calculate_volume_weighted_stock_price(1000) == 2
+
+
+def test_torn_read_is_retried(any_stock, mocker):
+    """Reads that fail while a trade is being recorded are retried."""
+    # Given
+    store = type(any_stock._store)  # pylint: disable=protected-access
+    mocker.patch.object(store, "sums", side_effect=[IndexError, (6, 3)])
+
+    # When / Then
+    assert any_stock.vwsp_between(0, 1000) == 2
+
+
+def test_read_racing_a_write_is_retried(any_stock, mocker):
+    """Reads that overlap a recorded trade are retried."""
+    # Given
+    results = iter([(0, 1), (6, 3)])
+
+    def racing_sums(*_):
+        if not any_stock.trades:
+            any_stock.record_trade(TradeType.BUY, 1, 2, 0)
+        return next(results)
+
+    store = type(any_stock._store)  # pylint: disable=protected-access
+    mocker.patch.object(store, "sums", side_effect=racing_sums)
+
+    # When / Then
+    assert any_stock.vwsp_between(0, 1000) == 2
+
+
+def test_record_trade_loads_restored_trades(any_stock):
+    """Restored trades that are still pending are loaded before recording."""
+    # Given
+    any_stock.restore_trades(
+        lambda: (
+            array("b", [0]),
+            array("d", [1]),
+            array("d", [2]),
+            array("d", [1000]),
+        ),
+        lazy=True,
+    )
+
+    # When
+    any_stock.record_trade(TradeType.SELL, 3, 4, 1100)
+
+    # Then
+    assert any_stock.vwsp_between(0, 2000) == 3.5
+
+
+def test_window_state(traded_stock):
+    """Window state gives the recent trade sums and next expiry."""
+    # When / Then
+    assert traded_stock.window_state(1400) == (42, 8, 1400)
+    assert traded_stock.window_state() == (0, 0, None)
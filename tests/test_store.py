@@ -0,0 +1,193 @@
+"""gbce.models.store package tests."""
+
+
+import pytest
+
+from gbce.models.store.columnar import ColumnarTradeStore
+from gbce.models.store.objects import ObjectTradeStore, sequence_size
+from gbce.models.trade import Trade, TradeType
+
+
+@pytest.fixture(params=[ObjectTradeStore, ColumnarTradeStore])
+def store(request):
+    """Trade store of every kind."""
+    return request.param("TEA")
+
+
+def test_append(store):
+    """Append a trade works."""
+    # When
+    trade = store.append(TradeType.SELL, 3, 4, 1000)
+
+    # Then
+    assert isinstance(trade, Trade)
+    assert trade.type == TradeType.SELL
+    assert trade.timestamp == 1000
+    assert len(store) == 1
+
+
+def test_volume_weighted_price(store):
+    """Volume weighted price only takes recent trades into account."""
+    # Given
+    for quantity, price, timestamp in [(10, 100, 0), (1, 2, 700), (3, 4, 800)]:
+        store.append(TradeType.BUY, quantity, price, timestamp)
+
+    # When
+    res = store.volume_weighted_price(900)
+
+    # Then
+    assert res == 3.5
+
+
+def test_volume_weighted_price_at_earlier_times(store):
+    """Reads at a later time don't change reads at an earlier time."""
+    # Given
+    for quantity, price, timestamp in [(1, 5, 0), (1, 10, 200)]:
+        store.append(TradeType.BUY, quantity, price, timestamp)
+
+    # When
+    later = store.volume_weighted_price(400)
+    earlier = store.volume_weighted_price(250)
+
+    # Then
+    assert later == 10
+    assert earlier == 7.5
+    assert store.next_expiry(250) == 300
+    assert store.next_expiry(600) is None
+
+
+def test_no_recent_trades(store):
+    """There is no volume weighted price without recent trades."""
+    # Given
+    store.append(TradeType.BUY, 1, 2, 0)
+
+    # When / Then
+    assert store.volume_weighted_price(1000) == 0
+
+
+def test_columns(store):
+    """Stored trades can be got as typed arrays in timestamp order."""
+    # Given
+    store.append(TradeType.SELL, 3, 4, 1100)
+    store.append(TradeType.BUY, 1, 2, 1000)
+
+    # When
+    codes, quantities, prices, timestamps = store.columns()
+
+    # Then
+    assert list(codes) == [0, 1]
+    assert list(quantities) == [1, 3]
+    assert list(prices) == [2, 4]
+    assert list(timestamps) == [1000, 1100]
+
+
+@pytest.mark.parametrize(
+    ["now", "result"],
+    [(1100, (14, 4, 1300)), (1350, (12, 3, 1400)), (1500, (0, 0, None))],
+)
+def test_window_state(store, now, result):
+    """Window state gives the recent trade sums and next expiry."""
+    # Given
+    store.append(TradeType.SELL, 3, 4, 1100)
+    store.append(TradeType.BUY, 1, 2, 1000)
+
+    # When / Then
+    assert store.window_state(now) == result
+
+
+def test_columns_are_sorted_by_timestamp():
+    """Columnar store keeps the trades sorted by timestamp."""
+    # Given
+    store = ColumnarTradeStore("TEA")
+
+    # When
+    store.append(TradeType.BUY, 1, 2, 30)
+    store.append(TradeType.SELL, 3, 4, 10)
+    store.append(TradeType.BUY, 5, 6, 20)
+
+    # Then
+    assert list(store.timestamps) == [10, 20, 30]
+    assert list(store.prices) == [4, 6, 2]
+    assert [trade.type for trade in store.trades] == [
+        TradeType.SELL,
+        TradeType.BUY,
+        TradeType.BUY,
+    ]
+
+
+def test_extend_out_of_order():
+    """Columnar store merges unsorted trade columns in timestamp order."""
+    # Given
+    store = ColumnarTradeStore("TEA")
+    store.extend([TradeType.BUY] * 2, [1, 3], [2, 4], [10, 30])
+
+    # When
+    store.extend([TradeType.SELL] * 3, [5, 7, 9], [6, 8, 10], [40, 20, 5])
+
+    # Then
+    assert list(store.timestamps) == [5, 10, 20, 30, 40]
+    assert list(store.prices) == [10, 2, 8, 4, 6]
+    assert list(store.quantities) == [9, 1, 7, 3, 5]
+    assert store.sums(10, 40) == (70, 11)
+    assert [trade.type for trade in store.trades] == [
+        TradeType.SELL,
+        TradeType.BUY,
+        TradeType.SELL,
+        TradeType.BUY,
+        TradeType.SELL,
+    ]
+
+
+def test_trade_views():
+    """Columnar store returns lazy trade views."""
+    # Given
+    store = ColumnarTradeStore("TEA")
+    for timestamp in range(3):
+        store.append(TradeType.BUY, 1, timestamp, timestamp)
+
+    # When
+    trades = store.trades
+
+    # Then
+    assert len(trades) == 3
+    assert trades[-1].price == 2
+    assert [trade.price for trade in trades[:2]] == [0, 1]
+    assert '<Trade "Buy" of Stock "TEA" object at ' in repr(trades)
+    with pytest.raises(IndexError):
+        trades[3]  # pylint: disable=pointless-statement
+
+
+def test_recent_price_and_count(store):
+    """Only recent trades are priced and counted."""
+    # Given
+    for timestamp, price in ((0, 1), (700, 2), (800, 4)):
+        store.append(TradeType.BUY, 1, price, timestamp)
+
+    # When / Then
+    assert store.recent_price_and_count(900) == (3, 2)
+    assert store.recent_price_and_count(2000) == (0, 0)
+
+
+def test_memory_bytes(store):
+    """Stored trades take memory that grows with their number."""
+    # Given
+    empty = store.memory_bytes()
+
+    # When
+    for timestamp in range(1000):
+        store.append(TradeType.BUY, 1, 2, timestamp)
+
+    # Then
+    assert empty > 0
+    assert store.memory_bytes() > empty + 1000 * 24
+
+
+def test_sequence_size():
+    """Sequences are sized from their first item."""
+    # Given
+    trades = [Trade("TEA", TradeType.BUY, 1.0, 2.0, 3.0)] * 10
+    entries = [(1.0, 2.0, 3.0)] * 10
+
+    # When / Then
+    assert sequence_size([]) > 0
+    assert sequence_size(trades) > sequence_size(entries) > 10 * 24 * 3
@@ -0,0 +1,234 @@
+"""gbce.subscribe module tests."""
+
+
+import asyncio
+import math
+import threading
+
+import pytest
+
+from gbce.clock import SimulatedClock
+from gbce.subscribe import Change, Notifier, Subscription, queue_callback
+
+
+class Value:
+    """Value that can be set and counts its reads."""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, value=1.0, expiry=None):
+        self.value = value
+        self.expiry = expiry
+        self.reads = 0
+
+    def read(self, _):
+        """Read the value."""
+        self.reads += 1
+        return self.value, self.expiry
+
+
+def check(subscription, now):
+    """Check a subscription, giving the notified value."""
+    change = subscription.check(now)
+    return change.value if change is not None else None
+
+
+def test_first_check_notifies_the_value():
+    """The first check notifies the value with a NaN previous value."""
+    # Given
+    subscription = Subscription("TEA", Value().read, print)
+
+    # When
+    change = subscription.check(1000)
+
+    # Then
+    assert change.subject == "TEA"
+    assert change.value == 1
+    assert math.isnan(change.previous)
+    assert change.timestamp == 1000
+
+
+def test_values_are_only_read_when_marked():
+    """Values aren't read again until marked."""
+    # Given
+    value = Value()
+    subscription = Subscription("TEA", value.read, print)
+    subscription.check(1000)
+
+    # When
+    value.value = 2
+    unmarked = check(subscription, 1001)
+    subscription.mark("stock", [], [], [], [])
+    marked = subscription.check(1002)
+
+    # Then
+    assert unmarked is None
+    assert marked == Change("TEA", 2, 1, 1002)
+    assert value.reads == 2
+
+
+def test_values_are_read_after_they_expire():
+    """Values are read again once they may have changed on their own."""
+    # Given
+    value = Value(expiry=1100)
+    subscription = Subscription("TEA", value.read, print)
+    subscription.check(1000)
+    value.value = 0
+
+    # When / Then
+    assert check(subscription, 1100) is None
+    assert check(subscription, 1101) == 0
+
+
+def test_changes_within_threshold_are_not_notified():
+    """Changes need to exceed the threshold of the last notified value."""
+    # Given
+    value = Value(expiry=-math.inf)
+    subscription = Subscription("", value.read, print, threshold=0.5)
+    subscription.check(1000)
+    notified = []
+
+    # When
+    for now, new in enumerate((1.3, 1.5, 1.6, 1.2, 1.3)):
+        value.value = new
+        notified.append(check(subscription, 1001 + now))
+
+    # Then
+    assert notified == [None, None, 1.6, None, None]
+
+
+def test_changes_are_coalesced_within_interval():
+    """Changes are notified at most once per interval."""
+    # Given
+    value = Value()
+    subscription = Subscription("TEA", value.read, print, interval=10)
+    subscription.check(1000)
+
+    # When
+    notified = []
+    for now in range(1001, 1012):
+        value.value = now
+        subscription.mark()
+        notified.append(check(subscription, now))
+
+    # Then
+    assert notified == [None] * 9 + [1010, None]
+    assert value.reads == 2
+
+
+def test_cancel():
+    """Cancelled subscriptions aren't notified."""
+    # Given
+    unsubscribed = []
+    subscription = Subscription(
+        "TEA", Value().read, print, unsubscribe=lambda: unsubscribed.append(1)
+    )
+
+    # When
+    subscription.cancel()
+
+    # Then
+    assert subscription.cancelled
+    assert unsubscribed == [1]
+    assert subscription.check(1000) is None
+
+
+async def notify_from_thread(change):
+    """Notify a change to a queue from another thread, and get it back."""
+    queue = asyncio.Queue()
+    callback = queue_callback(queue, asyncio.get_running_loop())
+    thread = threading.Thread(target=callback, args=(change,))
+    thread.start()
+    thread.join()
+    return await asyncio.wait_for(queue.get(), 5)
+
+
+def test_queue_callback():
+    """Changes are put in an asyncio queue from any thread."""
+    # When
+    change = asyncio.run(notify_from_thread(Change("TEA", 2, 1, 1000)))
+
+    # Then
+    assert change == Change("TEA", 2, 1, 1000)
+
+
+@pytest.fixture
+def clock():
+    """Simulated clock of the notifier."""
+    return SimulatedClock(1000)
+
+
+def fail(change):
+    """Fail to be notified of a change."""
+    raise RuntimeError(change)
+
+
+def test_dispatch(clock, caplog):
+    """Every subscription is checked and notified."""
+    # Given
+    notified = []
+    notifier = Notifier(clock)
+    value = Value()
+    first = notifier.add(Subscription("TEA", value.read, notified.append))
+    second = notifier.add(Subscription("GIN", Value().read, fail))
+    cancelled = notifier.add(Subscription("POP", value.read, print))
+    cancelled.cancel()
+
+    # When
+    dispatched = notifier.dispatch()
+    again = notifier.dispatch()
+    second.cancel()
+    value.value = 3
+    first.mark()
+    clock.advance(1)
+    last = notifier.dispatch()
+
+    # Then
+    assert (dispatched, again, last) == (2, 0, 1)
+    assert [change.value for change in notified] == [1, 3]
+    assert notified[1] == Change("TEA", 3, 1, 1001)
+    assert caplog.messages == ["Failed to notify a change of GIN."]
+    assert len(notifier) == 1
+
+
+def test_dispatch_in_background(clock, mocker):
+    """Subscriptions are dispatched from a background thread."""
+    # pylint: disable=protected-access
+    # Given
+    thread = mocker.patch("gbce.subscribe.threading.Thread")
+    notifier = Notifier(clock)
+    notified = []
+
+    def notify(change):
+        notified.append(change)
+        notifier.close()
+
+    notifier.add(Subscription("TEA", Value().read, notify))
+
+    # When
+    with notifier:
+        notifier.start(0.001)
+        notifier.start(0.001)
+        target = thread.call_args.kwargs["target"]
+        target(*thread.call_args.kwargs["args"])
+
+    # Then
+    assert thread.call_count == 1
+    assert thread.return_value.join.called
+    assert len(notified) == 1
+
+
+def test_start_and_close(clock):
+    """Background threads are started and stopped."""
+    # Given
+    notified = threading.Event()
+    notifier = Notifier(clock)
+    notifier.add(Subscription("TEA", Value().read, lambda _: notified.set()))
+
+    # When
+    with notifier:
+        notifier.start(0.001)
+        assert notified.wait(5)
+
+    # Then
+    notifier.close()
@@ -0,0 +1,63 @@
+"""gbce.tape module tests."""
+
+
+import pytest
+
+from gbce.models.trade import TradeType
+from gbce.tape import TapeRecord, read_binary, read_csv, write_binary
+
+RECORDS = [
+    TapeRecord(1000.5, "TEA", TradeType.BUY, 10, 2.5),
+    TapeRecord(1001, "GIN", TradeType.SELL, 5, 3),
+    TapeRecord(1002, "POP", TradeType.BUY, 1, 4),
+]
+
+
+def test_binary_tape(tmp_path):
+    """Binary tapes can be written and read back."""
+    # Given
+    path = tmp_path / "tape.bin"
+
+    # When
+    count = write_binary(path, RECORDS)
+
+    # Then
+    assert count == 3
+    assert list(read_binary(path, chunk_size=2)) == RECORDS
+
+
+def test_binary_tape_with_a_long_name(tmp_path):
+    """Stock names that don't fit records are rejected, not truncated."""
+    # Given
+    path = tmp_path / "tape.bin"
+    record = TapeRecord(1000, "Ä" * 9, TradeType.BUY, 1, 2)
+
+    # When / Then
+    with pytest.raises(ValueError, match="Stock name Ä+ is longer"):
+        write_binary(path, [record])
+
+
+def test_csv_tape(tmp_path):
+    """CSV tapes can be read with or without header."""
+    # Given
+    path = tmp_path / "tape.csv"
+    path.write_text(
+        "timestamp,stock,side,quantity,price\n"
+        "1000.5,TEA,Buy,10,2.5\n"
+        "1001,GIN,sell,5,3\n"
+        "1002,POP,BUY,1,4\n"
+    )
+
+    # When / Then
+    assert list(read_csv(path)) == RECORDS
+
+
+def test_csv_tape_with_invalid_row(tmp_path):
+    """CSV tapes with invalid rows are not allowed."""
+    # Given
+    path = tmp_path / "tape.csv"
+    path.write_text("1000.5,TEA,Buy,10,2.5\nnow,TEA,Buy,10,2.5\n")
+
+    # When / Then
+    with pytest.raises(ValueError):
+        list(read_csv(path))
@@ -1,9 +1,8 @@
 """gbce.models.trade module tests."""
 
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
-import pytest
 from pytest_factoryboy import register
 
 from gbce.models.trade import TradeType
@@ -25,6 +24,18 @@ def test_type(trade):
     assert trade.type == TradeType.BUY
 
 
+def test_quantity(trade):
+    """Get quantity works."""
+    # When / Then
+    assert trade.quantity == 2.3
+
+
+def test_price(trade):
+    """Get price works."""
+    # When / Then
+    assert trade.price == 4.5
+
+
 def test_timestamp(trade_factory):
     """Get timestamp works."""
     # Given
@@ -34,23 +45,21 @@ def test_timestamp(trade_factory):
     assert trade.timestamp == 1000000000
 
 
-def test_not_expired(trade):
-    """Is done last 5 minutes works with non expired trades."""
-    # When / Then
-    assert trade.is_done_last_5_minutes is True
+def test_default_timestamp(trade_factory):
+    """Trades without timestamp are done now."""
+    # Given
+    before = datetime.timestamp(datetime.utcnow())
 
+    # When
+    trade = trade_factory(timestamp=None)
 
-@pytest.fixture
-def timestamp(mocker):
-    """Mock timestamp."""
-    mock = mocker.patch("gbce.models.trade.datetime", wraps=datetime)
-    mock.timestamp.return_value = datetime.timestamp(
-        datetime.utcnow() + timedelta(minutes=5, seconds=1)
-    )
-    return mock
+    # Then
+    assert before <= trade.timestamp <= datetime.timestamp(datetime.utcnow())
 
 
-def test_expired(trade, timestamp):
-    """Is done last 5 minutes works with expired trades."""
+def test_recent(trade):
+    """Trades are recent until the window has passed since them."""
     # When / Then
-    assert trade.is_done_last_5_minutes is False
+    assert trade.is_recent(trade.timestamp + 300) is True
+    assert trade.is_recent(trade.timestamp + 301) is False
+    assert trade.is_recent(trade.timestamp + 301, window=400) is True
@@ -0,0 +1,177 @@
+"""gbce.view module tests."""
+
+
+import pytest
+from pytest_factoryboy import register
+
+from gbce.models.stock import StockType
+from gbce.models.trade import TradeType
+from gbce.view import StockView, ViewCache
+
+from .factories import CommonStockFactory, PreferredStockFactory
+
+register(CommonStockFactory)
+register(PreferredStockFactory)
+
+
+@pytest.fixture
+def traded_stock(common_stock):
+    """Common stock with some trades."""
+    common_stock.record_trades(
+        [(TradeType.BUY, 1, 2, 1000), (TradeType.SELL, 3, 4, 1100)]
+    )
+    return common_stock
+
+
+def test_stock_view(traded_stock):
+    """Stock views hold the stock parameters and recent trades state."""
+    # When
+    view = StockView(traded_stock, 1200)
+
+    # Then
+    assert repr(view) == f'<StockView "{traded_stock.name}" at 1200>'
+    assert view.name == traded_stock.name
+    assert view.type == StockType.COMMON
+    assert view.last_dividend == traded_stock.last_dividend
+    assert view.fixed_dividend == traded_stock.fixed_dividend
+    assert view.par_value == traded_stock.par_value
+    assert view.timestamp == 1200
+    assert view.volume == 4
+    assert view.volume_weighted_stock_price == 3.5
+    assert view.calculate_dividend_yield() == (
+        traded_stock.calculate_dividend_yield(3.5)
+    )
+    assert view.calculate_dividend_yield(2) == (
+        traded_stock.calculate_dividend_yield(2)
+    )
+    assert view.calculate_p_e_ratio() == traded_stock.calculate_p_e_ratio(3.5)
+    assert view.calculate_p_e_ratio(2) == traded_stock.calculate_p_e_ratio(2)
+
+
+def test_stock_view_is_immutable(traded_stock):
+    """Stock views don't change when the stock trades."""
+    # Given
+    view = StockView(traded_stock, 1200)
+
+    # When
+    traded_stock.record_trade(TradeType.BUY, 4, 10, 1200)
+
+    # Then
+    assert view.volume_weighted_stock_price == 3.5
+
+
+def test_stock_view_keeps_the_listing(traded_stock, preferred_stock):
+    """Stock views don't change when the stock is relisted."""
+    # Given
+    view = StockView(traded_stock, 1200)
+    preferred_stock.record_trade(TradeType.BUY, 1, 50, 1100)
+    preferred_view = StockView(preferred_stock, 1200)
+    yield_before = preferred_view.calculate_dividend_yield()
+
+    # When
+    traded_stock.relist(0, None, 1)
+    preferred_stock.relist(1, 10, 10)
+
+    # Then
+    assert view.last_dividend == 8
+    assert view.par_value == 100
+    assert view.calculate_dividend_yield(2) == 400
+    assert view.calculate_p_e_ratio(2) == 0.25
+    assert preferred_view.calculate_dividend_yield() == yield_before == 4
+    assert preferred_view.calculate_dividend_yield(0) is None
+    assert StockView(traded_stock, 1200).calculate_p_e_ratio() is None
+
+
+@pytest.mark.parametrize(
+    ["now", "result"],
+    [(1199, False), (1200, True), (1300, True), (1301, False)],
+)
+def test_stock_view_is_current(traded_stock, now, result):
+    """Stock views hold until their oldest recent trade expires."""
+    # Given
+    view = StockView(traded_stock, 1200)
+
+    # When / Then
+    assert view.is_current(now) is result
+
+
+def test_stock_view_without_trades(preferred_stock):
+    """Stock views of stocks without recent trades always hold."""
+    # When
+    view = StockView(preferred_stock, 1200)
+
+    # Then
+    assert view.volume_weighted_stock_price == 0
+    assert view.is_current(10**9)
+
+
+def test_view_cache(traded_stock, preferred_stock):
+    """Views share the stock views of the stocks that haven't changed."""
+    # Given
+    cache = ViewCache()
+    stocks = {
+        traded_stock.name: traded_stock,
+        preferred_stock.name: preferred_stock,
+    }
+    first = cache.view(stocks, 1200)
+
+    # When
+    preferred_stock.record_trade(TradeType.BUY, 1, 8, 1250)
+    cache.mark(preferred_stock.name)
+    second = cache.view(stocks, 1250)
+    third = cache.view(stocks, 1350)
+
+    # Then
+    assert len(second) == 2
+    assert list(second) == list(stocks)
+    assert second.timestamp == 1250
+    assert second[traded_stock.name] is first[traded_stock.name]
+    assert second[preferred_stock.name] is not first[preferred_stock.name]
+    assert first[preferred_stock.name].volume_weighted_stock_price == 0
+    assert second[preferred_stock.name].volume_weighted_stock_price == 8
+    assert third[traded_stock.name].volume_weighted_stock_price == 4
+    assert third[preferred_stock.name] is second[preferred_stock.name]
+
+
+def test_view_cache_reuses_unchanged_views(traded_stock, preferred_stock):
+    """Views of unchanged stocks share the previous stock views."""
+    # Given
+    cache = ViewCache()
+    stocks = {
+        traded_stock.name: traded_stock,
+        preferred_stock.name: preferred_stock,
+    }
+    first = cache.view(stocks, 1200)
+
+    # When
+    second = cache.view(stocks, 1250)
+    traded_stock.record_trade(TradeType.BUY, 1, 4, 960)
+    for name in (traded_stock.name, preferred_stock.name, "XXX"):
+        cache.mark(name)
+    cache.view(stocks, 1250)
+    third = cache.view(stocks, 1301)
+    fourth = cache.view({**stocks}, 1200)
+
+    # Then
+    assert dict(second) == dict(first)
+    assert third[traded_stock.name] is not first[traded_stock.name]
+    assert third[traded_stock.name].volume_weighted_stock_price == 4
+    assert third[preferred_stock.name] is not first[preferred_stock.name]
+    assert fourth[traded_stock.name] is not third[traded_stock.name]
+
+
+def test_all_share_index(traded_stock, preferred_stock):
+    """Views give the all share index of the viewed stocks."""
+    # Given
+    preferred_stock.record_trade(TradeType.BUY, 1, 14, 1100)
+    view = ViewCache().view(
+        {
+            traded_stock.name: traded_stock,
+            preferred_stock.name: preferred_stock,
+        },
+        1200,
+    )
+
+    # When / Then
+    assert view.all_share_index == pytest.approx(7)
+    assert view.all_share_index == pytest.approx(7)